@@ -0,0 +1,504 @@
+"""
+This modules gathers the benchmarks used to measure the performance of the application's stages. Benchmarks are run
+from the application's working directory (where the *config.ini* file is located) and report their measures as JSON.
+Run `python -m ddog.bench --help` for usage.
+"""
+import argparse
+import configparser
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import ddog.constants as csts
+import ddog.output
+import ddog.processing
+import ddog.profiling
+import ddog.source
+
+DISTRIBUTIONS = ('poisson', 'geometric', 'uniform')
+SINK_EXTENSIONS = {csts.TEXT_SINK_NAME: 'txt', csts.CSV_SINK_NAME: 'csv', csts.JSONL_SINK_NAME: 'jsonl',
+                   csts.PARQUET_SINK_NAME: 'parquet'}
+
+
+def measure(func, setup=None):
+    """ Measures the wall time of a call to `func` and the peak memory allocated by the current process during such a
+    call. Since tracing memory allocations significantly slows them down, `func` is called twice: first to measure its
+    wall time, then to trace its memory allocations.
+
+    Args:
+        func (function): Function to be measured. Called without any argument.
+        setup (function): Function called without any argument before each call to `func` (Ex: to clear caches).
+
+    Returns:
+        (object, dict): The value returned by the first call to `func` and a dictionary of measures ('wall_time' in
+        seconds and 'peak_memory' in bytes).
+    """
+    if setup is not None:
+        setup()
+    start = time.perf_counter()
+    result = func()
+    wall_time = time.perf_counter() - start
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {'wall_time': wall_time, 'peak_memory': peak_memory}
+
+
+def measure_stage(func, setup=None):
+    """ Measures the wall time, the CPU time and the peak resident set size of a single call to `func` (Cf.
+    `ddog.profiling.StageRecorder`), as well as the peak resident set size of the terminated child processes (Ex: the
+    workers of a process pool), which `tracemalloc` cannot see. Unlike `measure`, allocations are not traced so that
+    long-running stages are only run once and measured at full speed.
+
+    Args:
+        func (function): Function to be measured. Called without any argument.
+        setup (function): Function called without any argument before the call to `func` (Ex: to clear caches).
+
+    Returns:
+        (object, dict): The value returned by `func` and a dictionary of measures ('wall_time' and 'cpu_time' in
+        seconds, 'peak_rss' and 'children_peak_rss' in bytes, the latter being the largest peak of any child process
+        terminated since the benchmark started).
+    """
+    if setup is not None:
+        setup()
+    with ddog.profiling.stage(name='benchmark') as record:
+        result = func()
+    measures = {measure: record[measure] for measure in ('wall_time', 'cpu_time', 'peak_rss')}
+    return result, dict(measures, children_peak_rss=ddog.profiling.get_max_rss(children=True))
+
+
+def generate_files(config, tmp_dir_path, min_year, max_year, players, teams, teams_per_player,
+                   distribution='poisson', seed=0):
+    """ Generates synthetic baseball-statistics files (one per year) in `tmp_dir_path` and records them in its
+    manifest, so that the application and the benchmarks can run on them offline. Each player has a number of team
+    stints drawn from `distribution` (with mean `teams_per_player`), each stint being spent with a random team over one
+    to three consecutive years from a random career start year. One record is generated per player, team and year. A
+    tenth of the teams have no league.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        tmp_dir_path (str): Directory where the files are generated.
+        min_year (int): Year of the first file to generate.
+        max_year (int): Year of the last file to generate.
+        players (int): Number of players.
+        teams (int): Number of teams.
+        teams_per_player (float): Mean number of team stints per player (at least 1).
+        distribution (str): Distribution of the number of team stints per player. One of `DISTRIBUTIONS`.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        int: Total number of generated records.
+    """
+    rng = np.random.RandomState(seed)
+    if distribution == 'poisson':
+        stint_counts = 1 + rng.poisson(teams_per_player - 1, size=players)
+    elif distribution == 'geometric':
+        stint_counts = rng.geometric(1 / teams_per_player, size=players)
+    else:
+        stint_counts = rng.randint(1, int(round(2 * teams_per_player)), size=players)
+
+    stint_players = np.repeat(np.arange(players), stint_counts)
+    stint_teams = rng.randint(teams, size=len(stint_players))
+    stint_lengths = rng.randint(1, 4, size=len(stint_players))
+    career_starts = rng.randint(min_year, max_year + 1, size=players)
+    stint_offsets = np.cumsum(stint_lengths) - stint_lengths  # Years spent before each stint, over all the players
+    first_stints = np.concatenate([[0], np.cumsum(stint_counts)[:-1]])
+    stint_starts = career_starts[stint_players] + stint_offsets - np.repeat(stint_offsets[first_stints], stint_counts)
+
+    rows = np.repeat(np.arange(len(stint_players)), stint_lengths)
+    years = stint_starts[rows] + np.arange(len(rows)) - np.repeat(np.cumsum(stint_lengths) - stint_lengths,
+                                                                  stint_lengths)
+    kept = years <= max_year
+    rows, years = rows[kept], years[kept]
+    team_codes = stint_teams[rows]
+    df = pd.DataFrame(data={'year': years,
+                            'team': np.char.add('T', np.char.zfill(team_codes.astype(str), 3)),
+                            'league': np.where(team_codes % 10 == 9, '', np.where(team_codes % 2, 'AL', 'NL')),
+                            'player-id': np.char.add('p', np.char.zfill(stint_players[rows].astype(str), 7)),
+                            'games': rng.randint(1, 163, size=len(rows))})
+
+    formatted_name = config[csts.DEFAULT_CONF_SECTION][csts.CONF_TMP_FILE_FMT_NAME]
+    manifest_file_name = config[csts.DEFAULT_CONF_SECTION][csts.CONF_MANIFEST_FILE_NAME]
+    manifest = ddog.source.DownloadManifest(path=os.path.join(tmp_dir_path, manifest_file_name))
+    for year, year_df in df.groupby('year'):
+        file_name = formatted_name.format(year=int(year))
+        content = year_df.to_csv(header=False, index=False).encode()
+        with open(os.path.join(tmp_dir_path, file_name), 'wb') as file_obj:
+            file_obj.write(content)
+        manifest.record(year=int(year), file_name=file_name, size=len(content),
+                        sha256=hashlib.sha256(content).hexdigest())
+    return len(df)
+
+
+def legacy_load(file_names):
+    """ Reference implementation of the loading stage of version 0.0.1: files are parsed serially into object columns
+    and concatenated pairwise (`DataFrame.append` being gone from recent pandas versions, `pandas.concat` is used in
+    the same pairwise fashion).
+
+    Args:
+        file_names (list[str]): Paths of the baseball-statistics files to be loaded.
+
+    Returns:
+        pandas.DataFrame: DataFrame into which the 'team', 'league' and 'player-id' columns of the files were loaded.
+    """
+    dataframes = [pd.read_csv(file_name, header=None, usecols=[1, 2, 3], names=ddog.source.COLUMN_NAMES)
+                  for file_name in file_names]
+    return functools.reduce(lambda x, y: pd.concat([x, y]), dataframes)
+
+
+def bench_loader(config, tmp_dir_path, min_year, max_year):
+    """ Compares the loading of the baseball-statistics files of the requested year range using the legacy serial
+    path and the `ddog.source.BaseballFilesLoader` path, first with an empty parsed cache (cold run) then with an up
+    to date one (warm run). Since files are parsed by worker processes, the peak resident set sizes of the process and
+    of its children are reported. The files are loaded from a scratch copy of `tmp_dir_path`, so that loading neither
+    touches its manifest nor evicts its files.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        tmp_dir_path (str): Directory where the baseball-statistics files have already been downloaded.
+        min_year (int): Year of the first file to load.
+        max_year (int): Year of the last file to load.
+
+    Returns:
+        list[dict]: One dictionary of measures per loading path.
+
+    Raises:
+        ValueError: If some files of the requested year range are missing from `tmp_dir_path`.
+    """
+    loader = ddog.source.BaseballFilesLoader(tmp_dir_path=tmp_dir_path, config=config, min_year=min_year,
+                                             max_year=max_year)
+    missing_years = loader._get_missing_years()
+    if missing_years:
+        raise ValueError('{:d} files are missing from {}. Run the application with the --keep flag first'
+                         .format(len(missing_years), tmp_dir_path))
+
+    years = range(min_year, max_year + 1)
+    results = list()
+    with tempfile.TemporaryDirectory(dir=tmp_dir_path) as scratch_dir_path:
+        scratch_loader = ddog.source.BaseballFilesLoader(tmp_dir_path=scratch_dir_path, config=config,
+                                                         min_year=min_year, max_year=max_year)
+        for year in years:
+            entry = {field: value for field, value in loader.manifest.get(year=year).items()
+                     if field not in ('last_used', 'mtime_ns')}
+            shutil.copy2(loader._get_file_names(year=year)[0], os.path.join(scratch_dir_path, entry['file_name']))
+            scratch_loader.manifest.record(year=year, **entry)
+        file_names, cache_file_names = zip(*[scratch_loader._get_file_names(year=year) for year in years])
+
+        def clear_parsed_cache():
+            for cache_file_name in cache_file_names:
+                try:
+                    os.remove(cache_file_name)
+                except FileNotFoundError:
+                    pass
+
+        for variant, func, setup in (('legacy', functools.partial(legacy_load, file_names=file_names), None),
+                                     ('cold-cache', scratch_loader.load, clear_parsed_cache),
+                                     ('warm-cache', scratch_loader.load, None)):
+            df, measures = measure_stage(func=func, setup=setup)
+            results.append(dict(measures, benchmark='loader', variant=variant, files=len(file_names), rows=len(df),
+                                frame_memory=int(df.memory_usage(deep=True).sum())))
+    return results
+
+
+def bench_codecs(config, tmp_dir_path, min_year, max_year):
+    """ Compares the storage codecs of the baseball-statistics files (Cf. `ddog.source.open_compressed_writer`): the
+    files of the requested year range are stored with each codec in a scratch directory, then loaded with an empty
+    parsed cache so that every file is read and decompressed. The zstd codec is skipped if the `zstandard` package is
+    not installed.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        tmp_dir_path (str): Directory where the baseball-statistics files have already been downloaded.
+        min_year (int): Year of the first file to load.
+        max_year (int): Year of the last file to load.
+
+    Returns:
+        list[dict]: One dictionary of measures per codec.
+
+    Raises:
+        ValueError: If some files of the requested year range are missing from `tmp_dir_path`.
+    """
+    loader = ddog.source.BaseballFilesLoader(tmp_dir_path=tmp_dir_path, config=config, min_year=min_year,
+                                             max_year=max_year)
+    missing_years = loader._get_missing_years()
+    if missing_years:
+        raise ValueError('{:d} files are missing from {}. Run the application with the --keep flag first'
+                         .format(len(missing_years), tmp_dir_path))
+
+    results = list()
+    for codec in (csts.NO_CODEC_NAME, csts.GZIP_CODEC_NAME, csts.ZSTD_CODEC_NAME):
+        if codec == csts.ZSTD_CODEC_NAME:
+            try:
+                ddog.source.import_zstandard()
+            except ImportError as error:
+                logging.warning('Skipping the {} codec: {}'.format(codec, error))
+                continue
+
+        with tempfile.TemporaryDirectory(dir=tmp_dir_path) as codec_dir_path:
+            codec_loader = ddog.source.BaseballFilesLoader(tmp_dir_path=codec_dir_path, config=config,
+                                                           min_year=min_year, max_year=max_year)
+            start = time.perf_counter()
+            for year in range(min_year, max_year + 1):
+                file_name = loader._get_file_names(year=year)[0]
+                stored_file_name = os.path.join(codec_dir_path, loader.tmp_file_formatted_name.format(year=year)
+                                                + ddog.source.CODEC_EXTENSIONS.get(codec, ''))
+                with ddog.source.open_stored_file(file_name=file_name) as input_file_obj, \
+                        open(stored_file_name, 'wb') as file_obj, \
+                        ddog.source.open_compressed_writer(file_obj=file_obj, codec=codec) as writer:
+                    shutil.copyfileobj(input_file_obj, writer)
+                codec_loader.manifest.record(year=year, file_name=os.path.basename(stored_file_name),
+                                             size=os.path.getsize(stored_file_name), codec=codec)
+            compress_time = time.perf_counter() - start
+            disk_size = sum(entry['size'] for entry in codec_loader.manifest.entries.values())
+
+            def clear_parsed_cache():
+                for year in range(min_year, max_year + 1):
+                    try:
+                        os.remove(codec_loader._get_file_names(year=year)[1])
+                    except FileNotFoundError:
+                        pass
+
+            df, measures = measure_stage(func=codec_loader.load, setup=clear_parsed_cache)
+        results.append(dict(measures, benchmark='codecs', codec=codec, files=max_year - min_year + 1, rows=len(df),
+                            disk_size=disk_size, compress_time=compress_time))
+    return results
+
+
+def legacy_player_teams(df):
+    """ Reference implementation of the pre-aggregation stage of the counting engines up to commit 'user-013': records
+    are deduplicated and grouped by player into lists of team ID strings, which the NumPy and Apriori engines then
+    dictionary-encode back into integer team codes.
+
+    Args:
+        df (pandas.DataFrame): DataFrame with 'team', 'league' and 'player-id' columns.
+
+    Returns:
+        (numpy.ndarray, numpy.ndarray, numpy.ndarray): Cf. `ddog.processing.encode_player_teams`.
+    """
+    df = df.drop_duplicates().copy()
+    df['team-id'] = ddog.processing.build_team_ids(df=df)
+    df = df.groupby('player-id', as_index=False, observed=True) \
+        .agg(team_count=('team-id', 'count'), teams=('team-id', list))
+    return ddog.processing.encode_team_lists(player_teams=df[df.team_count >= 3].teams)
+
+
+def replicate_players(df, factor):
+    """ Builds a synthetic DataFrame `factor` times larger than `df` by replicating its records, each replica standing
+    for distinct players.
+
+    Args:
+        df (pandas.DataFrame): DataFrame with 'team', 'league' and 'player-id' columns.
+        factor (int): Number of replicas.
+
+    Returns:
+        pandas.DataFrame: DataFrame with categorical 'team', 'league' and 'player-id' columns.
+    """
+    player_codes, player_ids = pd.factorize(df['player-id'])
+    replicas = pd.concat([df[['team', 'league']]] * factor, ignore_index=True)
+    codes = np.concatenate([np.where(player_codes >= 0, player_codes + replica * len(player_ids), -1)
+                            for replica in range(factor)])
+    categories = ['{}-{:d}'.format(player_id, replica) for replica in range(factor) for player_id in player_ids]
+    replicas['player-id'] = pd.Categorical.from_codes(codes, categories=categories)
+    return replicas
+
+
+def bench_preaggregation(config, tmp_dir_path, min_year, max_year, factor):
+    """ Compares the pre-aggregation of the records of the requested year range into integer-coded team lists (one
+    per player, in CSR layout) using the legacy `groupby` path and the `ddog.processing.encode_player_teams` path, on
+    the loaded records and on a synthetic dataset `factor` times larger.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        tmp_dir_path (str): Directory where the baseball-statistics files have already been downloaded.
+        min_year (int): Year of the first file to load.
+        max_year (int): Year of the last file to load.
+        factor (int): Size of the synthetic dataset relative to the loaded one.
+
+    Returns:
+        list[dict]: One dictionary of measures per dataset and pre-aggregation path.
+    """
+    loader = ddog.source.BaseballFilesLoader(tmp_dir_path=tmp_dir_path, config=config, min_year=min_year,
+                                             max_year=max_year)
+    df = loader.load()
+    results = list()
+    for dataset, dataset_df in (('full', df), ('x{:d}'.format(factor), replicate_players(df=df, factor=factor))):
+        for variant, func in (('legacy', functools.partial(legacy_player_teams, df=dataset_df)),
+                              ('encoded', functools.partial(ddog.processing.encode_player_teams, df=dataset_df))):
+            (offsets, team_codes, _), measures = measure(func=func)
+            results.append(dict(measures, benchmark='preaggregation', dataset=dataset, variant=variant,
+                                rows=len(dataset_df), players=len(offsets) - 1, player_teams=len(team_codes)))
+    return results
+
+
+def run_application(args):
+    """ Runs the application (*main.py* of the working directory) in a child process and measures it.
+
+    Args:
+        args (list[str]): Command line arguments of the application.
+
+    Returns:
+        dict: Dictionary of measures ('wall_time' in seconds and 'peak_rss' in bytes). The peak resident set size is
+        the largest one of the child processes terminated so far (Cf. `ddog.profiling.get_max_rss`), the application
+        being the largest of them.
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, 'main.py'] + args, stdout=subprocess.DEVNULL, check=True)
+    wall_time = time.perf_counter() - start
+    return {'wall_time': wall_time, 'peak_rss': ddog.profiling.get_max_rss(children=True)}
+
+
+def bench_pipeline(config, tmp_dir_path, min_year, max_year, engine, min_player_count, sink_format, workers=1):
+    """ Measures each stage of the application (loading with an empty parsed cache, pre-aggregation, counting and
+    writing) on the baseball-statistics files of the requested year range, then the application end-to-end in a child
+    process. Each stage reports its throughput in records per second.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        tmp_dir_path (str): Directory where the baseball-statistics files were downloaded or generated.
+        min_year (int): Year of the first file to load.
+        max_year (int): Year of the last file to load.
+        engine (str): Name of the counting engine.
+        min_player_count (int): Minimum player count of the outputted team triples.
+        sink_format (str): Format of the output file. One of `ddog.output.SINK_FORMATS`.
+        workers (int): Number of processes the team triples are counted by.
+
+    Returns:
+        list[dict]: One dictionary of measures per stage.
+
+    Raises:
+        ValueError: If some files of the requested year range are missing from `tmp_dir_path`.
+    """
+    loader = ddog.source.BaseballFilesLoader(tmp_dir_path=tmp_dir_path, config=config, min_year=min_year,
+                                             max_year=max_year)
+    missing_years = loader._get_missing_years()
+    if missing_years:
+        raise ValueError('{:d} files are missing from {}. Generate them first'.format(len(missing_years), tmp_dir_path))
+    for year in range(min_year, max_year + 1):
+        try:
+            os.remove(os.path.join(tmp_dir_path, loader.parsed_cache_formatted_name.format(year=year)))
+        except FileNotFoundError:
+            pass
+
+    counter = ddog.processing.TripleCounterFactory(engine=engine, min_player_count=min_player_count,
+                                                   workers=workers).build_counter()
+    output = os.path.join(tmp_dir_path, 'bench-results.{}'.format(SINK_EXTENSIONS[sink_format]))
+    sink = ddog.output.SinkFactory(output=output).build_sink()
+
+    stages = list()
+    df, measures = measure_stage(func=loader.load)
+    stages.append(dict(measures, stage='load'))
+    (offsets, team_codes, team_names), measures = measure_stage(
+        func=functools.partial(ddog.processing.encode_player_teams, df=df, min_team_count=counter.size))
+    stages.append(dict(measures, stage='pre-aggregation'))
+    triple_counts, measures = measure_stage(func=functools.partial(counter.count_encoded, offsets=offsets,
+                                                                   team_codes=team_codes, team_names=team_names))
+    stages.append(dict(measures, stage='count'))
+    _, measures = measure_stage(func=functools.partial(sink.write, triples=triple_counts))
+    stages.append(dict(measures, stage='sink'))
+    stages.append(dict(run_application(args=['--from', str(min_year), '--to', str(max_year), '--tmp', tmp_dir_path,
+                                             '--keep', '--no-result-cache', '--engine', engine,
+                                             '--workers', str(workers), '--players', str(min_player_count),
+                                             '--sink', output]),
+                       stage='end-to-end'))
+
+    return [dict(stage, benchmark='pipeline', engine=engine, sink=sink_format, rows=len(df), players=len(offsets) - 1,
+                 triples=len(triple_counts), throughput=len(df) / stage['wall_time']) for stage in stages]
+
+
+def main(argv):
+    """ Parses the benchmark command line arguments, runs the requested benchmark and prints its measures as JSON.
+
+    Args:
+        argv (list): List of command line arguments (program name excluded).
+    """
+    config = configparser.ConfigParser()
+    config.read('config.ini')
+    min_year = int(config[csts.DEFAULT_CONF_SECTION][csts.CONF_MIN_YEAR])
+    max_year = int(config[csts.DEFAULT_CONF_SECTION][csts.CONF_MAX_YEAR])
+
+    parser = argparse.ArgumentParser(prog='python -m ddog.bench')
+    subparsers = parser.add_subparsers(dest='benchmark')
+    subparsers.required = True
+
+    loader_parser = subparsers.add_parser('loader', help='Compare the legacy and current CSV loading paths')
+    loader_parser.add_argument('--from', dest='min_year', type=int, default=min_year, metavar='YYYY')
+    loader_parser.add_argument('--to', dest='max_year', type=int, default=max_year, metavar='YYYY')
+    loader_parser.add_argument('--tmp', default='./tmp', help='Directory where the files were downloaded')
+
+    codecs_parser = subparsers.add_parser('codecs', help='Compare the footprint and load time of the storage codecs')
+    codecs_parser.add_argument('--from', dest='min_year', type=int, default=min_year, metavar='YYYY')
+    codecs_parser.add_argument('--to', dest='max_year', type=int, default=max_year, metavar='YYYY')
+    codecs_parser.add_argument('--tmp', default='./tmp', help='Directory where the files were downloaded')
+
+    preaggregation_parser = subparsers.add_parser('preaggregation',
+                                                  help='Compare the legacy and encoded per-player team pre-aggregation')
+    preaggregation_parser.add_argument('--from', dest='min_year', type=int, default=min_year, metavar='YYYY')
+    preaggregation_parser.add_argument('--to', dest='max_year', type=int, default=max_year, metavar='YYYY')
+    preaggregation_parser.add_argument('--tmp', default='./tmp', help='Directory where the files were downloaded')
+    preaggregation_parser.add_argument('--factor', type=int, default=10,
+                                       help='Size of the synthetic dataset relative to the loaded one')
+
+    generate_parser = subparsers.add_parser('generate', help='Generate synthetic baseball-statistics files')
+    pipeline_parser = subparsers.add_parser('pipeline', help='Measure the application per stage and end-to-end')
+    for subparser in (generate_parser, pipeline_parser):
+        subparser.add_argument('--from', dest='min_year', type=int, default=min_year, metavar='YYYY')
+        subparser.add_argument('--to', dest='max_year', type=int, default=max_year, metavar='YYYY')
+        subparser.add_argument('--tmp', default='./tmp', help='Directory where the files are (or will be) stored')
+    generate_parser.add_argument('--players', type=int, default=20000, help='Number of players')
+    generate_parser.add_argument('--teams', type=int, default=150, help='Number of teams')
+    generate_parser.add_argument('--teams-per-player', dest='teams_per_player', type=float, default=4,
+                                 help='Mean number of team stints per player')
+    generate_parser.add_argument('--distribution', choices=DISTRIBUTIONS, default=DISTRIBUTIONS[0],
+                                 help='Distribution of the number of team stints per player')
+    generate_parser.add_argument('--seed', type=int, default=0, help='Seed of the random generator')
+    pipeline_parser.add_argument('--engine', default=csts.NUMPY_ENGINE_NAME,
+                                 choices=[csts.PYTHON_ENGINE_NAME, csts.NUMPY_ENGINE_NAME, csts.SPARSE_ENGINE_NAME,
+                                          csts.SKETCH_ENGINE_NAME, csts.APRIORI_ENGINE_NAME])
+    pipeline_parser.add_argument('--workers', type=int, default=1, help='Number of counting processes')
+    pipeline_parser.add_argument('--players', type=int, default=50, help='Minimum number of players per triple')
+    pipeline_parser.add_argument('--sink', choices=ddog.output.SINK_FORMATS, default=csts.CSV_SINK_NAME,
+                                 help='Format of the output file')
+
+    args = parser.parse_args(args=argv)
+    if args.benchmark == 'loader':
+        results = bench_loader(config=config, tmp_dir_path=args.tmp, min_year=args.min_year, max_year=args.max_year)
+    elif args.benchmark == 'codecs':
+        results = bench_codecs(config=config, tmp_dir_path=args.tmp, min_year=args.min_year, max_year=args.max_year)
+    elif args.benchmark == 'preaggregation':
+        results = bench_preaggregation(config=config, tmp_dir_path=args.tmp, min_year=args.min_year,
+                                       max_year=args.max_year, factor=args.factor)
+    elif args.benchmark == 'generate':
+        os.makedirs(args.tmp, exist_ok=True)
+        rows, measures = measure_stage(func=functools.partial(
+            generate_files, config=config, tmp_dir_path=args.tmp, min_year=args.min_year, max_year=args.max_year,
+            players=args.players, teams=args.teams, teams_per_player=args.teams_per_player,
+            distribution=args.distribution, seed=args.seed))
+        results = [dict(measures, benchmark='generate', rows=rows, players=args.players, teams=args.teams,
+                        teams_per_player=args.teams_per_player, distribution=args.distribution)]
+    elif args.benchmark == 'pipeline':
+        results = bench_pipeline(config=config, tmp_dir_path=args.tmp, min_year=args.min_year, max_year=args.max_year,
+                                 engine=args.engine, min_player_count=args.players, sink_format=args.sink,
+                                 workers=args.workers)
+
+    print(json.dumps(results, indent=1))
+
+
+if __name__ == '__main__':
+    main(argv=sys.argv[1:])
@@ -0,0 +1,184 @@
+"""
+This modules gathers all the classes and functions dedicated to the caching of the results of runs, so that repeated
+runs over the same input files are answered without loading the files or counting anything.
+"""
+import hashlib
+import json
+import logging
+import os
+import zipfile
+
+import numpy as np
+
+import ddog.processing
+import ddog.source
+
+RESULT_CACHE_VERSION = 1
+RESULT_CACHE_EXTENSION = '.npz'
+
+
+def get_result_key(min_year, max_year, size, checksums):
+    """ Builds the content-addressed key of the results of a run: the SHA-256 digest of its parameters and of the
+    checksums of the input files of its year range. The counting engine is left out since all the engines return the
+    same results.
+
+    Args:
+        min_year (int): Year of the first input file.
+        max_year (int): Year of the last input file.
+        size (int): Number of teams per combination.
+        checksums (dict): Dictionary mapping years to the SHA-256 checksum of their file (when known).
+
+    Returns:
+        str: Hexadecimal key of the results, `None` if the checksum of a file of the year range is unknown.
+    """
+    range_checksums = [checksums.get(year) for year in range(min_year, max_year + 1)]
+    if None in range_checksums:
+        return None
+    content = json.dumps({'version': RESULT_CACHE_VERSION, 'from': min_year, 'to': max_year, 'size': size,
+                          'checksums': range_checksums})
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class ResultCache:
+    """ Content-addressed cache of the team combination counts of runs (Cf. `get_result_key`), stored in a directory on
+    the local file system as one NumPy .npz file per key. Each entry holds the team IDs, the combinations as arrays of
+    team codes and the player counts, with the smallest integer types fitting them, together with the minimum player
+    count they were counted with: an entry answers any run with a greater or equal minimum player count, its counts
+    being filtered. Entries are evicted in least-recently-used order (the modification time of an entry being updated
+    whenever it is used) once their total size exceeds `max_size`.
+
+    Attributes:
+        path (str): Path of the cache directory on the local file system.
+        max_size (int): Maximum total size (in bytes) of the entries, 0 meaning no limit.
+    """
+    def __init__(self, path, max_size=0):
+        """ Initializes the `ResultCache` object. Creates the cache directory if it does not exist yet.
+
+        Args:
+            path (str): Cf. class docstring.
+            max_size (int): Cf. class docstring.
+        """
+        self.path = path
+        self.max_size = max_size
+        os.makedirs(path, exist_ok=True)
+
+    def _get_entry_path(self, key):
+        """ Returns the path of the entry file of a key.
+
+        Args:
+            key (str): Key of the results.
+
+        Returns:
+            str: Path of the entry file on the local file system.
+        """
+        return os.path.join(self.path, key + RESULT_CACHE_EXTENSION)
+
+    def get(self, key, min_player_count):
+        """ Returns the cached team combinations of a key reaching a minimum player count, and marks the entry as just
+        used.
+
+        Args:
+            key (str): Key of the results.
+            min_player_count (int): Minimum player count of the combinations to be returned.
+
+        Returns:
+            ddog.processing.CombinationCounts: Counts of the team combinations whose player count is greater or equal to
+            `min_player_count` (an empty list if there is none), `None` if the cache holds no entry for the key
+            counted with a lower or equal minimum player count.
+        """
+        entry_path = self._get_entry_path(key=key)
+        try:
+            with np.load(entry_path, allow_pickle=False) as entry:
+                if int(entry['min-player-count']) > min_player_count:
+                    logging.info('Cached results were counted with a higher minimum player count')
+                    return None
+                counts = entry['counts'].astype(np.int64)
+                selected = counts >= min_player_count
+                combinations = entry['combinations'][selected].astype(np.int64)
+                team_names = entry['team-names'].astype(object)
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            logging.warning('Ignoring corrupted result cache file {path:}'.format(path=entry_path))
+            return None
+
+        os.utime(entry_path)
+        logging.info('Read {count:d} team combinations from the result cache'.format(count=int(selected.sum())))
+        if not selected.any():
+            return list()
+        return ddog.processing.CombinationCounts(team_names=team_names, combinations=combinations,
+                                                 counts=counts[selected])
+
+    def _get_min_player_count(self, key):
+        """ Returns the minimum player count the cached team combinations of a key were counted with.
+
+        Args:
+            key (str): Key of the results.
+
+        Returns:
+            int: The minimum player count of the entry, `None` if the cache holds no (valid) entry for the key.
+        """
+        try:
+            with np.load(self._get_entry_path(key=key), allow_pickle=False) as entry:
+                return int(entry['min-player-count'])
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+
+    def put(self, key, min_player_count, combinations, size):
+        """ Atomically (over)writes the entry of a key, unless the cache already holds the results of the key counted
+        with a lower or equal minimum player count, then evicts the least recently used entries if the cache exceeds
+        its maximum size.
+
+        Args:
+            key (str): Key of the results.
+            min_player_count (int): Minimum player count the combinations were counted with.
+            combinations (Iterable[(frozenset, int)]): Either a list of (team combination, player count) tuples or a
+                `ddog.processing.CombinationCounts` object.
+            size (int): Number of teams per combination.
+        """
+        cached_min_player_count = self._get_min_player_count(key=key)
+        if cached_min_player_count is not None and cached_min_player_count <= min_player_count:
+            os.utime(self._get_entry_path(key=key))
+            return
+
+        if isinstance(combinations, list):
+            team_names = np.array(sorted({team for combination, _ in combinations for team in combination}), dtype=str)
+            team_codes = {team_name: code for code, team_name in enumerate(team_names)}
+            combination_codes = np.array([sorted(team_codes[team] for team in combination)
+                                          for combination, _ in combinations], dtype=np.int64).reshape(-1, size)
+            counts = np.array([count for _, count in combinations], dtype=np.int64)
+        else:
+            team_names = np.asarray(combinations.team_names).astype(str)
+            combination_codes, counts = combinations.combinations, combinations.counts
+
+        entry_path = self._get_entry_path(key=key)
+        with ddog.source.open_atomic_file(path=entry_path) as file_obj:
+            np.savez(file_obj, combinations=combination_codes.astype(np.min_scalar_type(max(len(team_names) - 1, 0))),
+                     counts=counts.astype(np.min_scalar_type(int(counts.max()) if len(counts) else 0)),
+                     **{'team-names': team_names, 'min-player-count': np.int64(min_player_count)})
+        logging.info('Wrote {count:d} team combinations to the result cache'.format(count=len(counts)))
+        self._evict(kept_path=entry_path)
+
+    def _evict(self, kept_path):
+        """ Removes the least recently used entries until the total size of the entries fits within `max_size`.
+
+        Args:
+            kept_path (str): Path of an entry file never to be removed (Ex: the one just written).
+        """
+        if not self.max_size:
+            return
+        with os.scandir(self.path) as dir_entries:
+            entries = sorted((dir_entry.stat().st_mtime_ns, dir_entry.stat().st_size, dir_entry.path)
+                             for dir_entry in dir_entries if dir_entry.name.endswith(RESULT_CACHE_EXTENSION))
+        cache_size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, entry_path in entries:
+            if cache_size <= self.max_size:
+                break
+            if entry_path == kept_path:
+                continue
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            cache_size -= entry_size
+            logging.info('Evicted {path:} from the result cache'.format(path=entry_path))
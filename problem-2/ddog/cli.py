@@ -2,8 +2,15 @@
 This modules gathers all the classes and functions dedicated to the parsing and validation of command-line arguments.
 """
 import argparse
+import csv
+import importlib.util
+import json
+import os
 
 import ddog.constants as csts
+import ddog.output
+
+JOB_ARGS = (csts.CLI_MIN_YEAR_ARG, csts.CLI_MAX_YEAR_ARG, csts.CLI_MIN_PLAYERS_ARG, csts.CLI_SINK_ARG, csts.CLI_TOP_ARG)
 
 
 def positive_integer(string):
@@ -27,12 +34,91 @@ def positive_integer(string):
     return value
 
 
+def strictly_positive_integer(string):
+    """ This functions casts an input string `string` as a strictly positive integer.
+
+    Args:
+        string (str): String to be cast as a strictly positive integer.
+
+    Returns:
+        int: The result of the casting of input `string` as an integer.
+
+    Raises:
+        argparse.ArgumentTypeError: If input argument `string` cannot be cast as a strictly positive integer.
+    """
+    value = positive_integer(string=string)
+    if value == 0:
+        raise argparse.ArgumentTypeError('"{}" is not a strictly positive integer'.format(string))
+    return value
+
+
+def probability(string):
+    """ This functions casts an input string `string` as a probability strictly between 0 and 1.
+
+    Args:
+        string (str): String to be cast as a probability.
+
+    Returns:
+        float: The result of the casting of input `string` as a float.
+
+    Raises:
+        argparse.ArgumentTypeError: If input argument `string` cannot be cast as a float strictly between 0 and 1.
+    """
+    try:
+        value = float(string)
+        if not 0 < value < 1:
+            raise ValueError
+    except ValueError:
+        raise argparse.ArgumentTypeError('"{}" is not a number strictly between 0 and 1'.format(string))
+    return value
+
+
+def bounded_year(min_year, max_year):
+    """ This functions builds a function casting an input string as a year of the `min_year`-`max_year` range.
+
+    Args:
+        min_year (int): First valid year.
+        max_year (int): Last valid year.
+
+    Returns:
+        function: Function casting a string as an integer, raising an `argparse.ArgumentTypeError` if the string cannot
+        be cast as a year of the range.
+    """
+    def cast(string):
+        try:
+            value = int(string)
+        except ValueError:
+            value = None
+        if value is None or not min_year <= value <= max_year:
+            raise argparse.ArgumentTypeError('"{}" is not a year between {:d} and {:d}'.format(string, min_year,
+                                                                                             max_year))
+        return value
+
+    return cast
+
+
+def require_package(name, feature):
+    """ This functions checks that an optional package is installed, without importing it so that validating the
+    command line arguments remains cheap.
+
+    Args:
+        name (str): Name of the package.
+        feature (str): Description of the feature requiring the package, starting the error message.
+
+    Raises:
+        ImportError: If the package is not installed.
+    """
+    if importlib.util.find_spec(name) is None:
+        raise ImportError('{feature:} requires the {name:} package'.format(feature=feature, name=name))
+
+
 class CliArgParser:
     """ This class encapsulates all the logic dedicated to argument parsing and validation.
 
     Attributes:
         min_year_arg_name (str): Name of the CLI flag used to pass the year of the first report to use.
         max_year_arg_name (str): Name of the CLI flag used to pass the year of the last report to use.
+        year (function): Function casting a string as a year of the range allowed by the configuration.
         parser (argparse.ArgumentParser): Parser object used to parse a list of command line arguments.
     """
     def __init__(self, config):
@@ -46,20 +132,20 @@ class CliArgParser:
 
         min_year = int(config[csts.DEFAULT_CONF_SECTION][csts.CONF_MIN_YEAR])
         max_year = int(config[csts.DEFAULT_CONF_SECTION][csts.CONF_MAX_YEAR])
+        download_workers = int(config[csts.DEFAULT_CONF_SECTION][csts.CONF_DOWNLOAD_WORKERS])
+        self.year = bounded_year(min_year=min_year, max_year=max_year)
 
         parser = argparse.ArgumentParser()
 
         parser.add_argument('--{flag_name:}'.format(flag_name=self.min_year_arg_name),
                             metavar='YYYY',
                             default=min_year,
-                            type=int,
-                            choices=range(min_year, max_year+1),
+                            type=self.year,
                             help='Year of the first baseball statistical report to include (Default: %(default)s)')
         parser.add_argument('--{flag_name:}'.format(flag_name=self.max_year_arg_name),
                             metavar='YYYY',
                             default=max_year,
-                            type=int,
-                            choices=range(min_year, max_year+1),
+                            type=self.year,
                             help='Year of the last baseball statistical report to include (Default: %(default)s)')
         parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_TMP_DIR_ARG),
                             default='./tmp',
@@ -73,13 +159,137 @@ class CliArgParser:
         parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_SINK_ARG),
                             default=csts.CONSOLE_SINK_NAME,
                             help='Output sink for the computed list of triples. Either "%(default)s" (default) to '
-                                 'print to the standard output or a local path to an output text file in an '
-                                 'already-existing directory (Ex: /path/to/dir/results.txt).')
+                                 'print to the standard output or a local path to an output file in an '
+                                 'already-existing directory. The file format is given by its URI scheme or else by '
+                                 'its extension: text (Ex: /path/to/dir/results.txt), CSV (.csv), JSON Lines (.jsonl, '
+                                 '.ndjson) or Parquet (.parquet, Ex: parquet:///path/to/dir/results).')
         parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_KEEP_FILES_ARG),
                             default=False,
                             action='store_true',
                             help='Whether the temporary directory and its content should be kept after running '
                                  '(Default: Content is dropped)')
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_DOWNLOAD_WORKERS_ARG),
+                            dest=csts.CLI_DOWNLOAD_WORKERS_ARG,
+                            default=download_workers,
+                            type=strictly_positive_integer,
+                            help='Number of baseball-statistics files downloaded concurrently (Default: %(default)s)')
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_REFRESH_ARG),
+                            default=False,
+                            action='store_true',
+                            help='Whether the files already present in the temporary directory should be revalidated '
+                                 'against the source with conditional requests (Default: Present files are used as is)')
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_NO_RESULT_CACHE_ARG),
+                            dest=csts.CLI_NO_RESULT_CACHE_ARG,
+                            default=False,
+                            action='store_true',
+                            help='Whether the results should be counted without reading or writing the result cache '
+                                 'of the temporary directory kept with --{keep:} (Default: Results are cached)'
+                                 .format(keep=csts.CLI_KEEP_FILES_ARG))
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_ENGINE_ARG),
+                            default=csts.PYTHON_ENGINE_NAME,
+                            choices=[csts.PYTHON_ENGINE_NAME, csts.NUMPY_ENGINE_NAME, csts.SPARSE_ENGINE_NAME,
+                                     csts.SKETCH_ENGINE_NAME, csts.APRIORI_ENGINE_NAME],
+                            help='Engine used to count the team triples: "{python:}" (pure Python loop), "{numpy:}" '
+                                 '(vectorized over integer-encoded teams), "{sparse:}" (sparse player x team '
+                                 'incidence matrix products, requires scipy), "{sketch:}" (count-min sketch selecting '
+                                 'the candidate triples counted exactly, in bounded memory) or "{apriori:}" '
+                                 '(level-wise frequent-itemset algorithm, supporting any combination size) '
+                                 '(Default: %(default)s)'
+                                 .format(python=csts.PYTHON_ENGINE_NAME, numpy=csts.NUMPY_ENGINE_NAME,
+                                         sparse=csts.SPARSE_ENGINE_NAME, sketch=csts.SKETCH_ENGINE_NAME,
+                                         apriori=csts.APRIORI_ENGINE_NAME))
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_SKETCH_ERROR_ARG),
+                            dest=csts.CLI_SKETCH_ERROR_ARG,
+                            default=csts.DEFAULT_SKETCH_ERROR,
+                            type=probability,
+                            metavar='EPSILON',
+                            help='Maximum overestimation of the player counts by the sketch of the "{sketch:}" engine, '
+                                 'relative to the total number of triples of all the players. Sets the number of '
+                                 'counters of the sketch to about e / EPSILON per row (Default: %(default)s)'
+                                 .format(sketch=csts.SKETCH_ENGINE_NAME))
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_SKETCH_DELTA_ARG),
+                            dest=csts.CLI_SKETCH_DELTA_ARG,
+                            default=csts.DEFAULT_SKETCH_DELTA,
+                            type=probability,
+                            metavar='DELTA',
+                            help='Probability of a player count being overestimated by more than the error bound by '
+                                 'the sketch of the "{sketch:}" engine. Sets the number of rows of the sketch to '
+                                 'ln(1 / DELTA) (Default: %(default)s)'.format(sketch=csts.SKETCH_ENGINE_NAME))
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_WORKERS_ARG),
+                            default=1,
+                            type=strictly_positive_integer,
+                            help='Number of processes the team triples are counted by (Default: %(default)s)')
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_PRUNE_ARG),
+                            default=False,
+                            action='store_true',
+                            help='Whether the teams which cannot belong to any returned triple (because they do not '
+                                 'form a pair with the minimum number of players with two other teams of a player) '
+                                 'should be pruned before counting. Not supported by the "{apriori:}" engine '
+                                 '(Default: No pruning)'.format(apriori=csts.APRIORI_ENGINE_NAME))
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_SIZE_ARG),
+                            default=3,
+                            type=strictly_positive_integer,
+                            help='Number of teams per counted team combination. Sizes other than 3 require the '
+                                 '"{apriori:}" engine (Default: %(default)s)'.format(apriori=csts.APRIORI_ENGINE_NAME))
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_INCREMENTAL_ARG),
+                            default=False,
+                            action='store_true',
+                            help='Whether the team triples should be counted incrementally from the counts persisted '
+                                 'in the temporary directory by a previous run, only the added years being processed. '
+                                 'Requires --keep (Default: Counted from scratch)')
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_SERVE_ARG),
+                            default=None,
+                            help='Instead of computing the team triples, index the players of each team over the '
+                                 'requested year range, keep the index in memory and answer team combination (Ex: '
+                                 '"BOS-AL|NYA-AL|CHA-AL 1990-2010") and team triple (Ex: "TRIPLES 1990-2010 50") '
+                                 'queries, one per line. Either "{stdin:}" to read queries from the standard input, a '
+                                 'URL to listen to HTTP requests on (Ex: "{http:}127.0.0.1:8080") or a path to a Unix '
+                                 'domain socket file to be created (Default: No serving)'
+                                 .format(stdin=csts.STDIN_SERVE_NAME, http=csts.HTTP_SERVE_PREFIX))
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_SWEEP_ARG),
+                            default=None,
+                            type=strictly_positive_integer,
+                            metavar='YEARS',
+                            help='Length of the rolling year windows the team triples should be counted over in a '
+                                 'single pass, from the team index of the requested year range (Default: The whole '
+                                 'range is counted at once)')
+
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_STREAM_ARG),
+                            default=False,
+                            action='store_true',
+                            help='Whether each file should be parsed as soon as its download completes and folded into '
+                                 'the team set of each player, instead of loading all the files at once. Bounds the '
+                                 'memory used by the number of players rather than by the number of records '
+                                 '(Default: Files are loaded at once)')
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_TOP_ARG),
+                            default=None,
+                            type=strictly_positive_integer,
+                            metavar='K',
+                            help='Maximum number of team triples to output, the ones with the highest player counts '
+                                 '(Default: All the triples reaching the minimum number of players)')
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_SUMMARY_ARG),
+                            default=None,
+                            metavar='PATH',
+                            help='Path to a JSON file where the summary of the run (wall time, CPU time, peak memory '
+                                 'and record counts of each stage) should be written. The summary is logged in any '
+                                 'case (Default: Only logged)')
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_PROFILE_ARG),
+                            default=None,
+                            metavar='PATH',
+                            help='Path to a file where the profile of the run (cProfile statistics) should be written, '
+                                 'together with a text report of the most time-consuming functions and of the largest '
+                                 'memory allocation sites (traced with tracemalloc, which slows the run down) to '
+                                 'PATH.txt (Default: No profiling)')
+        parser.add_argument('--{flag_name:}'.format(flag_name=csts.CLI_JOBS_ARG),
+                            default=None,
+                            metavar='PATH',
+                            help='Path to a JSON (.json, list of objects) or CSV (.csv, with a header) jobs file of '
+                                 'parameter sets ("{params:}" keys or columns, defaulting to the values of the '
+                                 'corresponding flags). The files of the union of the year ranges of the jobs are '
+                                 'loaded and indexed once and the team triples of each job written to its own sink. '
+                                 'Cannot be combined with --{serve:} or --{sweep:} (Default: A single job given by '
+                                 'the flags)'.format(params='", "'.join(JOB_ARGS), serve=csts.CLI_SERVE_ARG,
+                                                     sweep=csts.CLI_SWEEP_ARG))
 
         self.parser = parser
 
@@ -93,12 +303,113 @@ class CliArgParser:
             dict: The input arguments dictionary if no exception was raised.
 
         Raises:
-            ValueError: If parsed starting year is higher than parsed finishing year.
+            ValueError: If parsed starting year is higher than parsed finishing year or if a combination size other
+            than 3 is requested from an engine (or in incremental, sweeping or batch mode) which does not support it,
+            or if the sweeping window is longer than the requested year range, or if streaming is combined with
+            incremental counting, or if pruning is requested from the Apriori engine, or if incremental counting is
+            requested without keeping the temporary directory, or if several of the serving, sweeping and batch modes
+            are requested, or if flags the requested mode ignores are set (Ex: an engine when counting incrementally or
+            over the team index), or if the output sink has an unsupported format.
+            ImportError: If the optional package required by the engine or by the output sink is not installed.
         """
         if args[self.min_year_arg_name] > args[self.max_year_arg_name]:
             raise ValueError('Starting year must be lower or equal than finishing year')
+        if args[csts.CLI_SIZE_ARG] != 3 and args[csts.CLI_ENGINE_ARG] != csts.APRIORI_ENGINE_NAME:
+            raise ValueError('Combination sizes other than 3 require the "{}" engine'
+                             .format(csts.APRIORI_ENGINE_NAME))
+        if args[csts.CLI_SIZE_ARG] != 3 \
+                and (args[csts.CLI_INCREMENTAL_ARG] or args[csts.CLI_SWEEP_ARG] or args[csts.CLI_JOBS_ARG]):
+            raise ValueError('Only team triples can be counted incrementally, over rolling windows or in batch')
+        if args[csts.CLI_SWEEP_ARG] and \
+                args[csts.CLI_SWEEP_ARG] > args[self.max_year_arg_name] - args[self.min_year_arg_name] + 1:
+            raise ValueError('Rolling windows must not be longer than the requested year range')
+        if args[csts.CLI_STREAM_ARG] and args[csts.CLI_INCREMENTAL_ARG]:
+            raise ValueError('Files cannot be streamed when counting incrementally')
+        if args[csts.CLI_PRUNE_ARG] and args[csts.CLI_ENGINE_ARG] == csts.APRIORI_ENGINE_NAME:
+            raise ValueError('The "{engine:}" engine already prunes its candidates level by level (--{prune:} flag)'
+                             .format(engine=csts.APRIORI_ENGINE_NAME, prune=csts.CLI_PRUNE_ARG))
+        modes = [csts.CLI_SERVE_ARG, csts.CLI_SWEEP_ARG, csts.CLI_JOBS_ARG]
+        if sum(args[mode] is not None for mode in modes) > 1:
+            raise ValueError('The {} flags are mutually exclusive'.format(', '.join('--' + mode for mode in modes)))
+        # The engine flags are only read when counting from scratch, neither from the incremental state nor from the
+        # team index of the serving, sweeping and batch modes
+        engine_flags = [flag for flag, is_set in ((csts.CLI_ENGINE_ARG,
+                                                   args[csts.CLI_ENGINE_ARG] != csts.PYTHON_ENGINE_NAME),
+                                                  (csts.CLI_WORKERS_ARG, args[csts.CLI_WORKERS_ARG] != 1),
+                                                  (csts.CLI_PRUNE_ARG, args[csts.CLI_PRUNE_ARG])) if is_set]
+        index_modes = [mode for mode in modes if args[mode] is not None]
+        ignored_flags = engine_flags + [flag for flag in (csts.CLI_INCREMENTAL_ARG, csts.CLI_STREAM_ARG) if args[flag]]
+        if index_modes and ignored_flags:
+            raise ValueError('The --{mode:} flag cannot be combined with {flags:}'
+                             .format(mode=index_modes[0], flags=', '.join('--' + flag for flag in ignored_flags)))
+        if args[csts.CLI_INCREMENTAL_ARG] and engine_flags:
+            raise ValueError('The --{mode:} flag cannot be combined with {flags:}'
+                             .format(mode=csts.CLI_INCREMENTAL_ARG,
+                                     flags=', '.join('--' + flag for flag in engine_flags)))
+        if args[csts.CLI_ENGINE_ARG] == csts.SPARSE_ENGINE_NAME:
+            require_package(name='scipy', feature='Counting with the "{}" engine'.format(csts.SPARSE_ENGINE_NAME))
+        if args[csts.CLI_INCREMENTAL_ARG] and not args[csts.CLI_KEEP_FILES_ARG]:
+            raise ValueError('Counting incrementally requires the temporary directory to be kept (--{keep:} flag)'
+                             .format(keep=csts.CLI_KEEP_FILES_ARG))
+        if args[csts.CLI_SINK_ARG] != csts.CONSOLE_SINK_NAME:
+            sink_format = ddog.output.parse_output(output=args[csts.CLI_SINK_ARG])[0]
+            if sink_format not in ddog.output.SINK_FORMATS:
+                raise ValueError('Unsupported output format. Supported formats: {}'
+                                 .format(', '.join(ddog.output.SINK_FORMATS)))
+            if sink_format == csts.PARQUET_SINK_NAME:
+                require_package(name='pyarrow', feature='Writing Parquet files')
         return args
 
+    def read_jobs(self, path, args):
+        """ Reads and validates a jobs file: each job is a set of parameters ("from", "to", "players", "sink" and
+        "top"), cast and validated as the corresponding command line arguments, the missing ones defaulting to their
+        parsed values.
+
+        Args:
+            path (str): Path of the jobs file, either a JSON file (.json extension) holding a list of objects or a CSV
+                file (.csv extension) with a header.
+            args (dict): Dictionary mapping the parsed CLI argument names and values.
+
+        Returns:
+            list[dict]: List of the jobs, each one mapping the parameter names to their values.
+
+        Raises:
+            ValueError: If the jobs file has an unsupported extension, is empty, or if a job has an unknown parameter or
+            an invalid value.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        with open(path, newline='') as file_obj:
+            if extension == '.json':
+                raw_jobs = json.load(file_obj)
+            elif extension == '.csv':
+                raw_jobs = list(csv.DictReader(file_obj))
+            else:
+                raise ValueError('Unsupported jobs file extension "{}". Supported extensions: .json, .csv'
+                                 .format(extension))
+        if not isinstance(raw_jobs, list) or not raw_jobs:
+            raise ValueError('The jobs file must hold a non-empty list of jobs')
+
+        casts = {self.min_year_arg_name: self.year, self.max_year_arg_name: self.year,
+                 csts.CLI_MIN_PLAYERS_ARG: positive_integer, csts.CLI_SINK_ARG: str,
+                 csts.CLI_TOP_ARG: strictly_positive_integer}
+        jobs = list()
+        for number, raw_job in enumerate(raw_jobs, start=1):
+            try:
+                if not isinstance(raw_job, dict):
+                    raise ValueError('not a set of parameters')
+                unknown = set(raw_job).difference(JOB_ARGS)
+                if unknown:
+                    raise ValueError('unknown parameters {}'.format(', '.join(sorted(map(str, unknown)))))
+                job = {name: args[name] for name in JOB_ARGS}
+                job.update({name: casts[name](str(value)) for name, value in raw_job.items()
+                            if value not in (None, '')})
+                self._validate_args(args=dict(args, **job))
+            except (argparse.ArgumentTypeError, ValueError) as error:
+                raise ValueError('Invalid job #{number:d} of {path:}: {error:}'.format(number=number, path=path,
+                                                                                     error=error))
+            jobs.append(job)
+        return jobs
+
     def parse_args(self, args):
         """ Parses and validate a list of command line arguments.
 
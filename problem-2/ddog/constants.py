@@ -3,9 +3,23 @@ DEFAULT_CONF_SECTION = 'DEFAULT'
 CONF_LOG_LVL = 'LoggingLevel'
 CONF_TMP_FILE_REGEX = 'TmpFileRegex'
 CONF_TMP_FILE_FMT_NAME = 'TmpFileFormattedName'
+CONF_PARSED_CACHE_FMT_NAME = 'ParsedCacheFormattedName'
 CONF_FMT_SOURCE_URL = 'FormattedSourceURL'
 CONF_MIN_YEAR = 'MinYear'
 CONF_MAX_YEAR = 'MaxYear'
+CONF_DOWNLOAD_WORKERS = 'DownloadWorkers'
+CONF_DOWNLOAD_MAX_RETRIES = 'DownloadMaxRetries'
+CONF_DOWNLOAD_BACKOFF_FACTOR = 'DownloadBackoffFactor'
+CONF_DOWNLOAD_TIMEOUT = 'DownloadTimeout'
+CONF_DOWNLOAD_CHUNK_SIZE = 'DownloadChunkSize'
+CONF_MANIFEST_FILE_NAME = 'ManifestFileName'
+CONF_MAX_CACHE_SIZE = 'MaxCacheSize'
+CONF_LOAD_WORKERS = 'LoadWorkers'
+CONF_STATE_FILE_NAME = 'StateFileName'
+CONF_INDEX_FILE_NAME = 'IndexFileName'
+CONF_RESULT_CACHE_DIR_NAME = 'ResultCacheDirName'
+CONF_MAX_RESULT_CACHE_SIZE = 'MaxResultCacheSize'
+CONF_STORAGE_CODEC = 'StorageCodec'
 
 # Command-line interface flag names
 CLI_MIN_YEAR_ARG = 'from'
@@ -14,6 +28,40 @@ CLI_TMP_DIR_ARG = 'tmp'
 CLI_MIN_PLAYERS_ARG = 'players'
 CLI_SINK_ARG = 'sink'
 CLI_KEEP_FILES_ARG = 'keep'
+CLI_DOWNLOAD_WORKERS_ARG = 'download-workers'
+CLI_REFRESH_ARG = 'refresh'
+CLI_NO_RESULT_CACHE_ARG = 'no-result-cache'
+CLI_ENGINE_ARG = 'engine'
+CLI_WORKERS_ARG = 'workers'
+CLI_PRUNE_ARG = 'prune'
+CLI_SIZE_ARG = 'size'
+CLI_INCREMENTAL_ARG = 'incremental'
+CLI_SERVE_ARG = 'serve'
+CLI_SWEEP_ARG = 'sweep'
+CLI_STREAM_ARG = 'stream'
+CLI_TOP_ARG = 'top'
+CLI_SUMMARY_ARG = 'summary'
+CLI_PROFILE_ARG = 'profile'
+CLI_JOBS_ARG = 'jobs'
+CLI_SKETCH_ERROR_ARG = 'sketch-error'
+CLI_SKETCH_DELTA_ARG = 'sketch-delta'
 
 # Other constants
-CONSOLE_SINK_NAME = 'console'
\ No newline at end of file
+CONSOLE_SINK_NAME = 'console'
+TEXT_SINK_NAME = 'text'
+CSV_SINK_NAME = 'csv'
+JSONL_SINK_NAME = 'jsonl'
+PARQUET_SINK_NAME = 'parquet'
+STDIN_SERVE_NAME = 'stdin'
+HTTP_SERVE_PREFIX = 'http://'
+PYTHON_ENGINE_NAME = 'python'
+NUMPY_ENGINE_NAME = 'numpy'
+SPARSE_ENGINE_NAME = 'sparse'
+SKETCH_ENGINE_NAME = 'sketch'
+APRIORI_ENGINE_NAME = 'apriori'
+NO_CODEC_NAME = 'none'
+GZIP_CODEC_NAME = 'gzip'
+ZSTD_CODEC_NAME = 'zstd'
+DEFAULT_SKETCH_ERROR = 1e-5
+DEFAULT_SKETCH_DELTA = 0.01
+RETRIABLE_HTTP_CODES = frozenset([429, 500, 502, 503, 504])
@@ -0,0 +1,642 @@
+"""
+This modules gathers all the classes and functions dedicated to the indexing of the players of each team, which allows
+to count the players of any team combination (over any year range) without recomputing all the team triples, and to
+the serving of such counts.
+"""
+import http.server
+import logging
+import os
+import socketserver
+import threading
+import time
+import urllib.parse
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+import ddog.output
+import ddog.processing
+import ddog.source
+
+POPCOUNT_TABLE = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.int64)
+TRIPLES_QUERY = 'TRIPLES'
+
+
+class TeamIndex:
+    """ Inverted index mapping each team to the players who played for it. Players are encoded as integers and the
+    index holds:
+    * for each team, a packed bitmap of its players over the whole indexed year range, so that the players of a team
+    combination are counted by intersecting (bitwise AND) the bitmaps of its teams and counting the set bits,
+    * for each (team, year) cell, the sorted list (posting list) of the players of the team that year, stored in a
+    compressed sparse row fashion, from which the bitmaps of any year sub-range are built on demand.
+
+    Attributes:
+        team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+        min_year (int): First indexed year.
+        max_year (int): Last indexed year.
+        player_count (int): Number of indexed players.
+        bitmaps (numpy.ndarray): 2D array of shape (number of teams, number of bytes) of the packed player bitmaps of
+        each team over the whole indexed year range.
+        offsets (numpy.ndarray): Array of the offsets of the posting list of each (team, year) cell in `postings`.
+        postings (numpy.ndarray): Array of the concatenated posting lists, sorted by team, year and player.
+        checksums (dict): Dictionary mapping the indexed years to the SHA-256 checksum of their file when known.
+    """
+    def __init__(self, team_names, min_year, max_year, player_count, bitmaps, offsets, postings, checksums=None):
+        """ Initializes the `TeamIndex` object.
+
+        Args:
+            team_names (numpy.ndarray): Cf. class docstring.
+            min_year (int): Cf. class docstring.
+            max_year (int): Cf. class docstring.
+            player_count (int): Cf. class docstring.
+            bitmaps (numpy.ndarray): Cf. class docstring.
+            offsets (numpy.ndarray): Cf. class docstring.
+            postings (numpy.ndarray): Cf. class docstring.
+            checksums (dict): Cf. class docstring.
+        """
+        self.team_names = team_names
+        self.min_year = min_year
+        self.max_year = max_year
+        self.player_count = player_count
+        self.bitmaps = bitmaps
+        self.offsets = offsets
+        self.postings = postings
+        self.checksums = checksums or dict()
+        self._team_codes = {team_name: code for code, team_name in enumerate(team_names)}
+
+    @classmethod
+    def build(cls, df, min_year, max_year, checksums=None):
+        """ Builds the index of a DataFrame of player records.
+
+        Args:
+            df (pandas.DataFrame): DataFrame with 'team', 'league', 'player-id' and 'year' columns (Cf.
+                `ddog.source.BaseballFilesLoader.load`).
+            min_year (int): First year of the records.
+            max_year (int): Last year of the records.
+            checksums (dict): Dictionary mapping years to the SHA-256 checksum of their file (when known).
+
+        Returns:
+            TeamIndex: The index of the records.
+        """
+        df = df.drop_duplicates()
+        team_codes, team_names = pd.factorize(np.asarray(ddog.processing.build_team_ids(df=df), dtype=object))
+        player_codes, player_ids = pd.factorize(np.asarray(df['player-id'].astype(str), dtype=object))
+        n_teams, n_years = len(team_names), max_year - min_year + 1
+
+        players = np.zeros((n_teams, len(player_ids)), dtype=bool)
+        players[team_codes, player_codes] = True
+
+        cells = team_codes.astype(np.int64) * n_years + (df.year.values.astype(np.int64) - min_year)
+        order = np.lexsort((player_codes, cells))
+        offsets = np.searchsorted(cells[order], np.arange(n_teams * n_years + 1)).astype(np.int64)
+
+        logging.info('Indexed {players:d} players of {teams:d} teams over {min_year:d}-{max_year:d}'
+                     .format(players=len(player_ids), teams=n_teams, min_year=min_year, max_year=max_year))
+        return cls(team_names=np.asarray(team_names, dtype=object), min_year=min_year, max_year=max_year,
+                   player_count=len(player_ids), bitmaps=np.packbits(players, axis=1), offsets=offsets,
+                   postings=player_codes[order].astype(np.int32),
+                   checksums={year: checksum for year, checksum in (checksums or dict()).items()
+                              if min_year <= year <= max_year and checksum is not None})
+
+    @classmethod
+    def read(cls, path):
+        """ Reads an index file.
+
+        Args:
+            path (str): Path of the index (NumPy .npz) file on the local file system.
+
+        Returns:
+            TeamIndex: The index, `None` if the file does not exist or cannot be decoded.
+        """
+        try:
+            with np.load(path, allow_pickle=False) as index:
+                return cls(team_names=index['team-names'].astype(object), min_year=int(index['years'][0]),
+                           max_year=int(index['years'][1]), player_count=int(index['player-count']),
+                           bitmaps=index['bitmaps'], offsets=index['offsets'], postings=index['postings'],
+                           checksums={int(year): str(checksum)
+                                      for year, checksum in zip(index['checksum-years'], index['checksums'])})
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, ValueError, IndexError, zipfile.BadZipFile):
+            logging.warning('Ignoring corrupted index file {path:}'.format(path=path))
+            return None
+
+    def save(self, path):
+        """ Atomically (over)writes the index file.
+
+        Args:
+            path (str): Path of the index (NumPy .npz) file on the local file system.
+        """
+        checksum_years = sorted(self.checksums)
+        with ddog.source.open_atomic_file(path=path) as file_obj:
+            np.savez(file_obj, years=np.array([self.min_year, self.max_year], dtype=np.int64),
+                     bitmaps=self.bitmaps, offsets=self.offsets, postings=self.postings,
+                     **{'team-names': self.team_names.astype(str), 'player-count': np.int64(self.player_count),
+                        'checksum-years': np.array(checksum_years, dtype=np.int64),
+                        'checksums': np.array([self.checksums[year] for year in checksum_years], dtype=str)})
+
+    def matches(self, min_year, max_year, checksums):
+        """ Whether the index covers exactly a year range and none of the files of the range changed since indexing.
+
+        Args:
+            min_year (int): First year of the range.
+            max_year (int): Last year of the range.
+            checksums (dict): Dictionary mapping years to the SHA-256 checksum of their current file, `None` if its
+                content is unknown (Cf. `ddog.source.DownloadManifest.get_checksums`). The files of the years left out
+                (Ex: evicted) are considered unchanged.
+
+        Returns:
+            bool: `True` if the index is up to date with the year range.
+        """
+        return (self.min_year, self.max_year) == (min_year, max_year) \
+            and all(checksums.get(year, checksum) == checksum for year, checksum in self.checksums.items())
+
+    def _get_bitmap(self, code, min_year, max_year):
+        """ Builds the unpacked player bitmap of a team over a year sub-range from its posting lists.
+
+        Args:
+            code (int): Team code.
+            min_year (int): First year of the sub-range.
+            max_year (int): Last year of the sub-range.
+
+        Returns:
+            numpy.ndarray: Boolean array flagging the players of the team over the sub-range.
+        """
+        n_years = self.max_year - self.min_year + 1
+        start = self.offsets[code * n_years + min_year - self.min_year]
+        stop = self.offsets[code * n_years + max_year - self.min_year + 1]
+        bitmap = np.zeros(self.player_count, dtype=bool)
+        bitmap[self.postings[start:stop]] = True
+        return bitmap
+
+    def count(self, teams, min_year=None, max_year=None):
+        """ Counts the players who played for all the teams of a team combination over a year range.
+
+        Args:
+            teams (Iterable[str]): Team IDs of the combination (Ex: ['BOS-AL', 'NYA-AL', 'CHA-AL']).
+            min_year (int): First year of the range (Default: first indexed year).
+            max_year (int): Last year of the range (Default: last indexed year).
+
+        Returns:
+            int: The number of players who played for all the teams of the combination over the year range.
+
+        Raises:
+            ValueError: If a team is unknown or if the year range is not included in the indexed one.
+        """
+        min_year = self.min_year if min_year is None else min_year
+        max_year = self.max_year if max_year is None else max_year
+        if not self.min_year <= min_year <= max_year <= self.max_year:
+            raise ValueError('Year range {}-{} is not included in the indexed {}-{} range'
+                             .format(min_year, max_year, self.min_year, self.max_year))
+        try:
+            codes = [self._team_codes[team] for team in teams]
+        except KeyError as error:
+            raise ValueError('Unknown team {}'.format(error.args[0]))
+        if not codes:
+            raise ValueError('No team was given')
+
+        if (min_year, max_year) == (self.min_year, self.max_year):
+            return int(POPCOUNT_TABLE[np.bitwise_and.reduce(self.bitmaps[codes], axis=0)].sum())
+
+        bitmap = self._get_bitmap(code=codes[0], min_year=min_year, max_year=max_year)
+        for code in codes[1:]:
+            bitmap &= self._get_bitmap(code=code, min_year=min_year, max_year=max_year)
+        return int(np.count_nonzero(bitmap))
+
+
+class YearRangeTripleCounter:
+    """ This class encapsulates the counting of the team triples of a sequence of year ranges from the per-year posting
+    lists of a `TeamIndex`, without reading any CSV file again. The counter maintains, for its current year range
+    (window), the number of years each player played for each team and the counts of all the team triples (whatever
+    their player count). Moving the window to another range only processes the players who joined or left a team:
+    the triples containing the teams they left are subtracted and the ones containing the teams they joined added.
+    Sweeping over overlapping ranges (Ex: rolling 10-year windows) thus costs proportionally to the changes between
+    consecutive ranges rather than to their length.
+
+    Attributes:
+        index (TeamIndex): Index the per-year memberships are read from.
+        min_player_count (int): Minimum player count a given team triple must have in order to be returned.
+        min_year (int): First year of the current window (`None` before the first move).
+        max_year (int): Last year of the current window (`None` before the first move).
+        year_counts (numpy.ndarray): 2D array of shape (number of players, number of teams) of the number of years of
+        the window each player played for each team.
+        keys (numpy.ndarray): Sorted array of the packed keys of the team triples of the window.
+        counts (numpy.ndarray): Array of the player counts of the team triples of the window.
+    """
+    def __init__(self, index, min_player_count):
+        """ Initializes the `YearRangeTripleCounter` object with an empty window.
+
+        Args:
+            index (TeamIndex): Cf. class docstring.
+            min_player_count (int): Cf. class docstring.
+        """
+        self.index = index
+        self.min_player_count = min_player_count
+        self.min_year, self.max_year = None, None
+        self.year_counts = np.zeros((index.player_count, len(index.team_names)), dtype=np.int16)
+        self.keys, self.counts = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        # Regroups the (team, year) posting lists by year
+        n_years = index.max_year - index.min_year + 1
+        cells = np.repeat(np.arange(len(index.offsets) - 1), np.diff(index.offsets))
+        order = np.argsort(cells % n_years, kind='stable')
+        self._teams, self._players = (cells // n_years)[order], index.postings[order].astype(np.int64)
+        self._year_offsets = np.searchsorted((cells % n_years)[order], np.arange(n_years + 1))
+
+    def _get_year_slice(self, year):
+        """ Returns the slice of the memberships of a year.
+
+        Args:
+            year (int): Indexed year.
+
+        Returns:
+            slice: Slice of the (player, team) memberships of `year`.
+        """
+        position = year - self.index.min_year
+        return slice(int(self._year_offsets[position]), int(self._year_offsets[position + 1]))
+
+    def _update_years(self, years, step):
+        """ Adds (or removes) the memberships of some years to (from) the window's year counts.
+
+        Args:
+            years (Iterable[int]): Years to be added or removed.
+            step (int): 1 to add the years, -1 to remove them.
+        """
+        for year in years:
+            year_slice = self._get_year_slice(year=year)
+            self.year_counts[self._players[year_slice], self._teams[year_slice]] += step
+
+    def move(self, min_year, max_year):
+        """ Moves the window to a year range and updates the triple counts accordingly.
+
+        Args:
+            min_year (int): First year of the range.
+            max_year (int): Last year of the range.
+
+        Raises:
+            ValueError: If the year range is not included in the indexed one.
+        """
+        if not self.index.min_year <= min_year <= max_year <= self.index.max_year:
+            raise ValueError('Year range {}-{} is not included in the indexed {}-{} range'
+                             .format(min_year, max_year, self.index.min_year, self.index.max_year))
+        current_years = set() if self.min_year is None else set(range(self.min_year, self.max_year + 1))
+        added_years = sorted(set(range(min_year, max_year + 1)) - current_years)
+        removed_years = sorted(current_years - set(range(min_year, max_year + 1)))
+
+        touched = np.unique(np.concatenate([np.zeros(0, dtype=np.int64)] + [
+            self._players[self._get_year_slice(year=year)] for year in added_years + removed_years]))
+        old_bits = self.year_counts[touched] > 0
+        self._update_years(years=added_years, step=1)
+        self._update_years(years=removed_years, step=-1)
+        new_bits = self.year_counts[touched] > 0
+
+        changed = (old_bits != new_bits).any(axis=1)
+        old_bits, new_bits = old_bits[changed], new_bits[changed]
+        n_teams = len(self.index.team_names)
+        removed_keys, removed_counts = ddog.processing.count_marked_triples(
+            member_bits=old_bits, marked_bits=old_bits & ~new_bits, n_teams=n_teams)
+        added_keys, added_counts = ddog.processing.count_marked_triples(
+            member_bits=new_bits, marked_bits=new_bits & ~old_bits, n_teams=n_teams)
+        delta_keys, delta_counts = ddog.processing.NumpyTripleCounter._reduce_counts(
+            keys=np.concatenate([added_keys, removed_keys]), counts=np.concatenate([added_counts, -removed_counts]))
+        self.keys, self.counts = ddog.processing.merge_counts(keys=self.keys, counts=self.counts,
+                                                              delta_keys=delta_keys, delta_counts=delta_counts)
+        self.min_year, self.max_year = min_year, max_year
+        logging.debug('Moved to {min_year:d}-{max_year:d}: {players:d} players changed'
+                      .format(min_year=min_year, max_year=max_year, players=int(changed.sum())))
+
+    def get_triples(self):
+        """ Lists the team triples of the window with the required minimum number of players.
+
+        Returns:
+            CombinationCounts: Counts of the team triples whose player count is greater or equal to the value of the
+            `min_player_count` attribute (an empty list if there is none).
+        """
+        selected = self.counts >= self.min_player_count
+        if not selected.any():
+            return list()
+        return ddog.processing.CombinationCounts.from_triple_keys(keys=self.keys[selected],
+                                                                  counts=self.counts[selected],
+                                                                  team_names=self.index.team_names)
+
+    def sweep(self, ranges):
+        """ Counts the team triples of each year range of a sequence.
+
+        Args:
+            ranges (Iterable[(int, int)]): Sequence of (first year, last year) ranges, ideally ordered so that
+                consecutive ranges overlap.
+
+        Yields:
+            ((int, int), CombinationCounts): The year range and the counts of its team triples.
+        """
+        for min_year, max_year in ranges:
+            self.move(min_year=min_year, max_year=max_year)
+            yield (min_year, max_year), self.get_triples()
+
+
+class IndexService:
+    """ This class keeps a team index and a `YearRangeTripleCounter` over it resident in memory, so that a long-running
+    server answers team combination and team triple queries without loading any file again. The index is reloaded when
+    the files it was built from change: before answering a query, the signature of the data directory (Ex: the sizes
+    and modification times of its files) is compared with the one taken after the last load, at most once every
+    `check_interval` seconds.
+
+    Attributes:
+        load (function): Function (without arguments) returning an up to date `TeamIndex`.
+        get_signature (function): Function (without arguments) returning a comparable signature of the data directory.
+        min_player_count (int): Default minimum player count of the returned team triples.
+        check_interval (float): Minimum number of seconds between two checks of the signature of the data directory.
+        index (TeamIndex): Current index.
+        counter (YearRangeTripleCounter): Triple counter of the current index, its window being left on the year range
+        of the last triple query so that queries over close ranges only process the changes between them.
+    """
+    def __init__(self, load, get_signature, min_player_count, check_interval=1.0):
+        """ Initializes the `IndexService` object and loads the index.
+
+        Args:
+            load (function): Cf. class docstring.
+            get_signature (function): Cf. class docstring.
+            min_player_count (int): Cf. class docstring.
+            check_interval (float): Cf. class docstring.
+        """
+        self.load = load
+        self.get_signature = get_signature
+        self.min_player_count = min_player_count
+        self.check_interval = check_interval
+        self.index, self.counter = None, None
+        self._signature, self._checked = None, 0
+        self._lock = threading.Lock()
+        self._reload()
+
+    def _reload(self):
+        """ Loads the index and builds its triple counter. Must be called with the lock held (or at initialization).
+        """
+        self.index = self.load()
+        self.counter = YearRangeTripleCounter(index=self.index, min_player_count=self.min_player_count)
+        self._signature, self._checked = self.get_signature(), time.monotonic()
+        logging.info('Loaded team index over {min_year:d}-{max_year:d}'
+                     .format(min_year=self.index.min_year, max_year=self.index.max_year))
+
+    def _check(self):
+        """ Reloads the index if the signature of the data directory changed since the last load. Must be called with
+        the lock held.
+        """
+        if time.monotonic() - self._checked < self.check_interval:
+            return
+        self._checked = time.monotonic()
+        if self.get_signature() != self._signature:
+            logging.info('Data directory changed, reloading the team index')
+            self._reload()
+
+    def count(self, teams, min_year=None, max_year=None):
+        """ Counts the players who played for all the teams of a team combination over a year range (Cf.
+        `TeamIndex.count`).
+
+        Args:
+            teams (Iterable[str]): Team IDs of the combination.
+            min_year (int): First year of the range (Default: first indexed year).
+            max_year (int): Last year of the range (Default: last indexed year).
+
+        Returns:
+            int: The number of players who played for all the teams of the combination over the year range.
+
+        Raises:
+            ValueError: If a team is unknown or if the year range is not included in the indexed one.
+        """
+        with self._lock:
+            self._check()
+            return self.index.count(teams=teams, min_year=min_year, max_year=max_year)
+
+    def get_triples(self, min_year=None, max_year=None, min_player_count=None):
+        """ Lists the team triples of a year range with a minimum number of players.
+
+        Args:
+            min_year (int): First year of the range (Default: first indexed year).
+            max_year (int): Last year of the range (Default: last indexed year).
+            min_player_count (int): Minimum player count of the returned team triples (Default: the
+                `min_player_count` attribute).
+
+        Returns:
+            ddog.processing.CombinationCounts: Counts of the team triples of the range reaching the minimum player
+            count (an empty list if there is none).
+
+        Raises:
+            ValueError: If the year range is not included in the indexed one.
+        """
+        with self._lock:
+            self._check()
+            self.counter.move(min_year=self.index.min_year if min_year is None else min_year,
+                              max_year=self.index.max_year if max_year is None else max_year)
+            self.counter.min_player_count = self.min_player_count if min_player_count is None else min_player_count
+            return self.counter.get_triples()
+
+
+def parse_year_range(field):
+    """ Parses a year or a year range (Ex: '1990' or '1990-2010').
+
+    Args:
+        field (str): Year or year range.
+
+    Returns:
+        (int, int): First and last years of the range.
+
+    Raises:
+        ValueError: If `field` is not a year or a year range.
+    """
+    years = field.split('-')
+    if len(years) not in (1, 2):
+        raise ValueError('Invalid year range {}'.format(field))
+    return int(years[0]), int(years[-1])
+
+
+def answer_triples(index, fields):
+    """ Answers a team triple query, made of the 'TRIPLES' keyword optionally followed by a year or a year range, a
+    minimum player count and a maximum number of triples (Ex: 'TRIPLES 1990-2010 50 10').
+
+    Args:
+        index (IndexService): Index service to be queried.
+        fields (list[str]): Fields of the query following the 'TRIPLES' keyword.
+
+    Returns:
+        str: The answer: one line per team triple formatted as the lines of the output sinks (by decreasing player
+        count), followed by an empty line.
+
+    Raises:
+        ValueError: If the query is invalid.
+    """
+    if len(fields) > 3:
+        raise ValueError('Expected "TRIPLES [YYYY[-YYYY] [PLAYERS [TOP]]]"')
+    min_year, max_year = parse_year_range(field=fields[0]) if fields else (None, None)
+    numbers = [int(field) for field in fields[1:]]
+    min_player_count, top = numbers + [None] * (2 - len(numbers))
+    if (min_player_count is not None and min_player_count < 0) or (top is not None and top <= 0):
+        raise ValueError('Invalid minimum player count or number of triples')
+    triple_counts = index.get_triples(min_year=min_year, max_year=max_year, min_player_count=min_player_count)
+    lines = ddog.output.iter_formatted_combinations(combinations=triple_counts, top=top) if len(triple_counts) else []
+    return ''.join(line + '\n' for line in lines)
+
+
+def answer(index, query):
+    """ Answers a textual query. A query is made of the '|'-separated team IDs of a team combination, optionally
+    followed by a year or a year range (Ex: 'BOS-AL|NYA-AL|CHA-AL 1990-2010'), or is a team triple query (Cf.
+    `answer_triples`) if the index is an `IndexService`.
+
+    Args:
+        index (TeamIndex or IndexService): Index to be queried.
+        query (str): Query.
+
+    Returns:
+        str: The answer, formatted as the lines of the output sinks (Ex: 'BOS-AL|CHA-AL|NYA-AL, 42') or starting with
+        'ERROR: ' if the query is invalid.
+    """
+    try:
+        fields = query.split()
+        if fields and fields[0].upper() == TRIPLES_QUERY and isinstance(index, IndexService):
+            return answer_triples(index=index, fields=fields[1:])
+        if len(fields) not in (1, 2):
+            raise ValueError('Expected "TEAM|TEAM|... [YYYY[-YYYY]]"')
+        teams = sorted(set(fields[0].split('|')))
+        min_year = max_year = None
+        if len(fields) == 2:
+            min_year, max_year = parse_year_range(field=fields[1])
+        count = index.count(teams=teams, min_year=min_year, max_year=max_year)
+    except ValueError as error:
+        return 'ERROR: {}'.format(error)
+    return '{teams:}, {count:d}'.format(teams='|'.join(teams), count=count)
+
+
+def serve_stream(index, input_stream, output_stream):
+    """ Answers the queries read from a text stream, one per line, until the end of the stream.
+
+    Args:
+        index (TeamIndex or IndexService): Index to be queried.
+        input_stream (Iterable[str]): Text stream (Ex: `sys.stdin`) the queries are read from.
+        output_stream (file): Text stream (Ex: `sys.stdout`) the answers are written to.
+    """
+    for line in input_stream:
+        if line.strip():
+            output_stream.write(answer(index=index, query=line) + '\n')
+            output_stream.flush()
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+    """ Handles a connection to a `QueryServer`: each line received is answered with a line.
+    """
+    def handle(self):
+        """ Answers the queries received through the connection until the client closes it.
+        """
+        for line in self.rfile:
+            query = line.decode('utf-8', errors='replace')
+            if query.strip():
+                self.wfile.write((answer(index=self.server.index, query=query) + '\n').encode('utf-8'))
+                self.wfile.flush()
+
+
+class QueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ Server answering the queries received through a Unix domain socket, one thread per connection.
+
+    Attributes:
+        index (TeamIndex or IndexService): Index to be queried.
+    """
+    daemon_threads = True
+
+    def __init__(self, path, index):
+        """ Initializes the `QueryServer` object and binds it to the socket file `path`.
+
+        Args:
+            path (str): Path of the socket file on the local file system.
+            index (TeamIndex or IndexService): Cf. class docstring.
+        """
+        self.index = index
+        super().__init__(path, QueryHandler)
+
+
+def serve_socket(index, path):
+    """ Answers the queries received through a Unix domain socket until interrupted (Ex: Ctrl+C).
+
+    Args:
+        index (TeamIndex or IndexService): Index to be queried.
+        path (str): Path of the socket file on the local file system. Removed when the server stops.
+    """
+    with QueryServer(path=path, index=index) as server:
+        logging.info('Serving queries on {path:}'.format(path=path))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info('Stopped serving queries')
+        finally:
+            os.remove(path)
+
+
+class HttpQueryHandler(http.server.BaseHTTPRequestHandler):
+    """ Handles the HTTP requests to an `HttpQueryServer`:
+    * `GET /triples?from=YYYY&to=YYYY&players=N&top=K` lists the team triples of a year range (all parameters being
+    optional, Cf. `answer_triples`),
+    * `GET /count?teams=TEAM|TEAM|...&from=YYYY&to=YYYY` counts the players of a team combination (Cf. `answer`).
+    Answers are returned as plain text, invalid requests with a 400 status code.
+    """
+    def do_GET(self):
+        """ Answers a GET request.
+        """
+        url = urllib.parse.urlsplit(self.path)
+        params = {name: values[-1] for name, values in urllib.parse.parse_qs(url.query).items()}
+        index = self.server.index.index
+        years = '{}-{}'.format(params.get('from', index.min_year), params.get('to', index.max_year))
+        if url.path == '/triples':
+            query = ' '.join([TRIPLES_QUERY, years, params.get('players', str(self.server.index.min_player_count)),
+                              params.get('top', '')])
+        elif url.path == '/count':
+            query = ' '.join([params.get('teams', ''), years])
+        else:
+            self.send_error(http.HTTPStatus.NOT_FOUND)
+            return
+        response = answer(index=self.server.index, query=query)
+        status = http.HTTPStatus.BAD_REQUEST if response.startswith('ERROR: ') else http.HTTPStatus.OK
+        body = (response if response.endswith('\n') else response + '\n').encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """ Logs the requests at the debug level instead of writing them to the standard error.
+        """
+        logging.debug('{} - {}'.format(self.address_string(), format % args))
+
+
+class HttpQueryServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """ Server answering the queries received as HTTP requests, one thread per connection.
+
+    Attributes:
+        index (IndexService): Index service to be queried.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, index):
+        """ Initializes the `HttpQueryServer` object and binds it to `address`.
+
+        Args:
+            address ((str, int)): Host and port the server listens on.
+            index (IndexService): Cf. class docstring.
+        """
+        self.index = index
+        super().__init__(address, HttpQueryHandler)
+
+
+def serve_http(index, url):
+    """ Answers the queries received as HTTP requests until interrupted (Ex: Ctrl+C).
+
+    Args:
+        index (IndexService): Index service to be queried.
+        url (str): URL the server listens on (Ex: 'http://127.0.0.1:8080').
+    """
+    url = urllib.parse.urlsplit(url)
+    with HttpQueryServer(address=(url.hostname or '127.0.0.1', url.port or 80), index=index) as server:
+        logging.info('Serving queries on http://{host:}:{port:d}'.format(host=server.server_address[0],
+                                                                         port=server.server_address[1]))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info('Stopped serving queries')
@@ -2,11 +2,133 @@
 This modules gathers all the classes and functions dedicated to the outputting of the computed triples.
 """
 import abc
+import csv
+import heapq
+import json
 import logging
+import os
+import re
 
 import ddog.constants as csts
+import ddog.profiling
 
 HEADER = 'Team triple         Count\n-------------------------'
+COMBINATION_NAMES = {2: 'pair', 3: 'triple'}
+FORMAT_BATCH_SIZE = 2 ** 16
+SINK_FORMATS = (csts.TEXT_SINK_NAME, csts.CSV_SINK_NAME, csts.JSONL_SINK_NAME, csts.PARQUET_SINK_NAME)
+SINK_EXTENSIONS = {'.csv': csts.CSV_SINK_NAME, '.jsonl': csts.JSONL_SINK_NAME, '.ndjson': csts.JSONL_SINK_NAME,
+                   '.parquet': csts.PARQUET_SINK_NAME}
+
+
+def build_header(size=3):
+    """ Builds the header of the outputted list of team combinations.
+
+    Args:
+        size (int): Number of teams per combination.
+
+    Returns:
+        str: The header, `HEADER` for team triples.
+    """
+    name = COMBINATION_NAMES.get(size, '{:d}-tuple'.format(size))
+    return '{label:<20}Count\n{line:}'.format(label='Team {}'.format(name), line='-' * 25)
+
+
+def build_window_output(output, min_year, max_year):
+    """ Builds the output of the results of a year window: the years of the window are inserted before the extension
+    of output file paths (Ex: 'results.txt' becomes 'results-1990-1999.txt'), the console output being left unchanged.
+
+    Args:
+        output (str): Either `csts.CONSOLE_SINK_NAME` or a path on the local file system.
+        min_year (int): First year of the window.
+        max_year (int): Last year of the window.
+
+    Returns:
+        str: The output of the results of the window.
+    """
+    if output == csts.CONSOLE_SINK_NAME:
+        return output
+    root, extension = os.path.splitext(output)
+    return '{root:}-{min_year:d}-{max_year:d}{extension:}'.format(root=root, min_year=min_year, max_year=max_year,
+                                                                  extension=extension)
+
+
+def iter_combination_batches(combinations, top=None, batch_size=FORMAT_BATCH_SIZE):
+    """ Generates batches of team combinations in decreasing player count order, the teams of each combination being
+    sorted by name. When the combinations are held as arrays (`ddog.processing.CombinationCounts` object), only the
+    `top` ones are selected with a partial sort (`numpy.argpartition`) and team names are only gathered for the
+    combination batch being generated, so that no Python object is built for more combinations than the ones being
+    written.
+
+    Args:
+        combinations (Iterable[(frozenset, int)]): Either a list of (team combination, player count) tuples or a
+            `ddog.processing.CombinationCounts` object.
+        top (int): Maximum number of combinations to generate, the ones with the highest player counts. All the
+            combinations are generated if `None`.
+        batch_size (int): Maximum number of combinations per batch.
+
+    Yields:
+        (list[list[str]], list[int]): List of the sorted team IDs of each combination of the batch and list of their
+        player counts.
+    """
+    if isinstance(combinations, list):
+        if top is not None and top < len(combinations):
+            sorted_combinations = heapq.nlargest(top, combinations, key=lambda x: x[1])
+        else:
+            sorted_combinations = sorted(combinations, key=lambda x: x[1], reverse=True)
+        for start in range(0, len(sorted_combinations), batch_size):
+            batch = sorted_combinations[start:start + batch_size]
+            yield [sorted(combination) for combination, _ in batch], [count for _, count in batch]
+        return
+
+    import numpy as np  # Only needed for arrays of combinations: keeps importing the module (Ex: by the CLI) cheap
+
+    counts = combinations.counts
+    selected = np.arange(len(counts))
+    if top is not None and top < len(counts):
+        selected = np.argpartition(-counts, top - 1)[:top]
+    order = selected[np.argsort(-counts[selected], kind='stable')]
+
+    # Teams are sorted by name within each combination through their (integer) rank in the sorted team names
+    sorted_team_names = np.sort(combinations.team_names)
+    ranks = np.argsort(np.argsort(combinations.team_names))
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        yield sorted_team_names[np.sort(ranks[combinations.combinations[batch]], axis=1)].tolist(), \
+            counts[batch].tolist()
+
+
+def iter_formatted_combinations(combinations, top=None):
+    """ Generates the formatted lines of team combinations in decreasing player count order (Cf.
+    `iter_combination_batches`).
+
+    Args:
+        combinations (Iterable[(frozenset, int)]): Either a list of (team combination, player count) tuples or a
+            `ddog.processing.CombinationCounts` object.
+        top (int): Maximum number of combinations to generate, the ones with the highest player counts. All the
+            combinations are generated if `None`.
+
+    Yields:
+        str: Formatted (team combination, player count) line.
+    """
+    for rows, counts in iter_combination_batches(combinations=combinations, top=top):
+        for row, count in zip(rows, counts):
+            yield '{combination:}, {count:d}'.format(combination='|'.join(row), count=count)
+
+
+def parse_output(output):
+    """ Parses the format and the path of a local output file. The format is either given as a URI scheme (Ex:
+    'csv:///path/to/results') or deduced from the file extension (Cf. `SINK_EXTENSIONS`), defaulting to the text format.
+
+    Args:
+        output (str): Local output file, possibly prefixed by a URI scheme.
+
+    Returns:
+        (str, str): Format of the output (Ex: `csts.CSV_SINK_NAME`) and path of the output file.
+    """
+    match = re.fullmatch(r'([a-z][a-z0-9+.-]*)://(.+)', output)
+    if match:
+        return match.group(1), match.group(2)
+    return SINK_EXTENSIONS.get(os.path.splitext(output)[1].lower(), csts.TEXT_SINK_NAME), output
 
 
 class SinkFactory:
@@ -15,14 +137,21 @@ class SinkFactory:
     Attributes:
         output (str): Describes the destination for the computed results. Parsed from the command line argument
         `csts.CONSOLE_SINK_NAME`. Either `csts.CONSOLE_SINK_NAME` or a path on the local file system.
+        size (int): Number of teams per outputted combination.
+        top (int): Maximum number of outputted combinations (the ones with the highest player counts), `None` meaning
+        no limit.
     """
-    def __init__(self, output):
+    def __init__(self, output, size=3, top=None):
         """ Initializes the `SinkFactory` object.
 
         Args:
             output (str): Cf. class docstring.
+            size (int): Cf. class docstring.
+            top (int): Cf. class docstring.
         """
         self.output = output
+        self.size = size
+        self.top = top
 
     def build_sink(self):
         """ Builds and returns the appropriate `Sink` object based on the `output` instance attribute.
@@ -30,29 +159,57 @@ class SinkFactory:
         Returns:
              Sink: The `Sink` object that encapsulates the specific writing logic associated with the chosen
              destination.
+
+        Raises:
+            ValueError: If the output's URI scheme is not a supported format.
         """
         if self.output == csts.CONSOLE_SINK_NAME:
-            return ConsoleSink()
-        else:
-            return LocalFileSystemSink(path=self.output)
+            return ConsoleSink(size=self.size, top=self.top)
+
+        sink_format, path = parse_output(output=self.output)
+        if sink_format not in SINK_FORMATS:
+            raise ValueError('Unsupported output format "{}". Supported formats: {}'
+                             .format(sink_format, ', '.join(SINK_FORMATS)))
+        sink_class = {csts.TEXT_SINK_NAME: LocalFileSystemSink, csts.CSV_SINK_NAME: CsvSink,
+                      csts.JSONL_SINK_NAME: JsonLinesSink, csts.PARQUET_SINK_NAME: ParquetSink}[sink_format]
+        return sink_class(path=path, size=self.size, top=self.top)
 
 
 class Sink(abc.ABC):
     """ Abstract base class that defines the interface contract each `Sink` class must implement.
+
+    Attributes:
+        size (int): Number of teams per outputted combination.
+        header (str): Header of the outputted list of team combinations.
+        top (int): Maximum number of outputted combinations (the ones with the highest player counts), `None` meaning
+        no limit.
     """
+    def __init__(self, size=3, top=None):
+        """ Initializes the `Sink` object.
+
+        Args:
+            size (int): Cf. class docstring.
+            top (int): Cf. class docstring.
+        """
+        self.size = size
+        self.header = build_header(size=size)
+        self.top = top
+
     def write(self, triples):
         """ Abstract method the implementation of which must contain the logic needed to write a list of triples to a
         given destination.
 
         Args:
-            triples (list[(frozenset, int)]): List of (baseball team triple, player count) tuples.
+            triples (Iterable[(frozenset, int)]): List of (baseball team triple, player count) tuples or
+                `ddog.processing.CombinationCounts` object.
         """
         pass
 
 
 def preprocess_triples(func):
     """ Decorator function. Decorates `Sink.write` methods. Gather all the logic dedicated to the formatting of baseball
-    team triples.
+    team triples: the decorated method is passed a generator of formatted lines (Cf. `iter_formatted_combinations`)
+    limited to the `top` attribute of the sink.
 
     Args:
         func (function): Function/method to be decorated. Must have a `self` and a `triples` argument.
@@ -61,14 +218,36 @@ def preprocess_triples(func):
         function: The decorated `func` function.
     """
     def wrapper(self, triples):
-        if triples:
-            sorted_triples = sorted(triples, key=lambda x: x[1], reverse=True)
-            formatted_triples = ['{triple:}, {count:d}'.format(triple='|'.join(sorted(triple)), count=count)
-                                 for triple, count in sorted_triples]
-            func(self, formatted_triples)
-        else:
-            logging.warning('No triple fulfilled the minimum count over the requested range')
-            logging.warning('No results were written to the requested output sink')
+        with ddog.profiling.stage(name='sink'):
+            if len(triples):
+                func(self, iter_formatted_combinations(combinations=triples, top=self.top))
+                ddog.profiling.count(combinations=min(len(triples), self.top or len(triples)))
+            else:
+                logging.warning('No triple fulfilled the minimum count over the requested range')
+                logging.warning('No results were written to the requested output sink')
+
+    return wrapper
+
+
+def batch_triples(func):
+    """ Decorator function. Decorates the `Sink.write` methods of machine-readable sinks: the decorated method is passed
+    a generator of batches of (sorted team IDs, player count) rows (Cf. `iter_combination_batches`) limited to the `top`
+    attribute of the sink.
+
+    Args:
+        func (function): Function/method to be decorated. Must have a `self` and a `triples` argument.
+
+    Returns:
+        function: The decorated `func` function.
+    """
+    def wrapper(self, triples):
+        with ddog.profiling.stage(name='sink'):
+            if len(triples):
+                func(self, iter_combination_batches(combinations=triples, top=self.top))
+                ddog.profiling.count(combinations=min(len(triples), self.top or len(triples)))
+            else:
+                logging.warning('No triple fulfilled the minimum count over the requested range')
+                logging.warning('No results were written to the requested output sink')
 
     return wrapper
 
@@ -81,9 +260,9 @@ class ConsoleSink(Sink):
         """ Concrete implementation of `Sink.write` that allows to write baseball triples to the standard output.
 
         Args:
-            triples (list[str]): List of formatted (baseball team triple, player count) tuples.
+            triples (Iterable[str]): Formatted (baseball team triple, player count) lines.
         """
-        print(HEADER)
+        print(self.header)
         for triple in triples:
             print(triple)
 
@@ -94,13 +273,18 @@ class LocalFileSystemSink(Sink):
 
     Attributes:
           path (str): Path of the target text file. The directory structure must exist.
+          header (str): Header of the outputted list of team combinations.
+          top (int): Maximum number of outputted combinations, `None` meaning no limit.
     """
-    def __init__(self, path):
+    def __init__(self, path, size=3, top=None):
         """ Initializes the `LocalFileSystemSink` object.
 
         Args:
             path (str): Cf. class docstring.
+            size (int): Number of teams per outputted combination.
+            top (int): Cf. class docstring.
         """
+        super().__init__(size=size, top=top)
         self.path = path
 
     @preprocess_triples
@@ -109,8 +293,81 @@ class LocalFileSystemSink(Sink):
         file system.
 
         Args:
-            triples (list[str]): List of formatted (baseball team triple, player count) tuples.
+            triples (Iterable[str]): Formatted (baseball team triple, player count) lines.
+        """
+        with open(self.path, 'w') as file_obj:
+            logging.info('Writing results to {path:}'.format(path=self.path))
+            file_obj.write(self.header)
+            for triple in triples:
+                file_obj.write('\n' + triple)
+
+
+class CsvSink(LocalFileSystemSink):
+    """ Concrete implementation of `Sink` that allows to write baseball triples into a CSV file on the local file
+    system, with one column per team ('team-1', 'team-2', ...) and a 'count' column.
+    """
+    @batch_triples
+    def write(self, triples):
+        """ Concrete implementation of `Sink.write` that allows to write baseball triples into a CSV file on the local
+        file system, one batch of rows at a time.
+
+        Args:
+            triples (Iterable[(list[list[str]], list[int])]): Batches of (sorted team IDs, player count) rows.
+        """
+        with open(self.path, 'w', newline='') as file_obj:
+            logging.info('Writing results to {path:}'.format(path=self.path))
+            writer = csv.writer(file_obj)
+            writer.writerow(['team-{:d}'.format(position) for position in range(1, self.size + 1)] + ['count'])
+            for rows, counts in triples:
+                writer.writerows(row + [count] for row, count in zip(rows, counts))
+
+
+class JsonLinesSink(LocalFileSystemSink):
+    """ Concrete implementation of `Sink` that allows to write baseball triples into a JSON Lines file on the local
+    file system, one `{"teams": [...], "count": ...}` object per line.
+    """
+    @batch_triples
+    def write(self, triples):
+        """ Concrete implementation of `Sink.write` that allows to write baseball triples into a JSON Lines file on the
+        local file system, one batch of lines at a time.
+
+        Args:
+            triples (Iterable[(list[list[str]], list[int])]): Batches of (sorted team IDs, player count) rows.
         """
         with open(self.path, 'w') as file_obj:
             logging.info('Writing results to {path:}'.format(path=self.path))
-            file_obj.write('\n'.join([HEADER] + triples))
+            for rows, counts in triples:
+                file_obj.writelines(json.dumps({'teams': row, 'count': count}) + '\n'
+                                    for row, count in zip(rows, counts))
+
+
+class ParquetSink(LocalFileSystemSink):
+    """ Concrete implementation of `Sink` that allows to write baseball triples into a Parquet file on the local file
+    system, with one string column per team ('team-1', 'team-2', ...) and an integer 'count' column. Each batch of
+    rows is written as a row group. Requires the optional `pyarrow` package.
+    """
+    @batch_triples
+    def write(self, triples):
+        """ Concrete implementation of `Sink.write` that allows to write baseball triples into a Parquet file on the
+        local file system, one row group per batch of rows.
+
+        Args:
+            triples (Iterable[(list[list[str]], list[int])]): Batches of (sorted team IDs, player count) rows.
+
+        Raises:
+            ImportError: If the `pyarrow` package is not installed.
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as error:
+            raise ImportError('Writing Parquet files requires the pyarrow package') from error
+
+        names = ['team-{:d}'.format(position) for position in range(1, self.size + 1)] + ['count']
+        schema = pyarrow.schema([(name, pyarrow.string()) for name in names[:-1]] + [(names[-1], pyarrow.int64())])
+        logging.info('Writing results to {path:}'.format(path=self.path))
+        with pyarrow.parquet.ParquetWriter(self.path, schema=schema) as writer:
+            for rows, counts in triples:
+                columns = [pyarrow.array(column, type=pyarrow.string()) for column in zip(*rows)]
+                writer.write_table(pyarrow.Table.from_arrays(columns + [pyarrow.array(counts, type=pyarrow.int64())],
+                                                             schema=schema))
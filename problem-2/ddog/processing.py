@@ -1,53 +1,1308 @@
 """
 This modules gathers all the classes and functions dedicated to the processing of metrics on baseball data.
 """
+import collections
+import concurrent.futures
 import itertools
+import logging
+import zipfile
 
 import numpy as np
+import pandas as pd
+
+import ddog.constants as csts
+import ddog.profiling
+import ddog.source
+
+BATCH_SIZE = 2 ** 22
+
+
+class TripleCounterFactory:
+    """This factory class builds and returns the appropriate `TripleCounter` object based on its `engine` attribute.
+
+    Attributes:
+        engine (str): Name of the counting engine. Parsed from the command line argument `csts.CLI_ENGINE_ARG`. Either
+        `csts.PYTHON_ENGINE_NAME`, `csts.NUMPY_ENGINE_NAME`, `csts.SPARSE_ENGINE_NAME`, `csts.SKETCH_ENGINE_NAME` or
+        `csts.APRIORI_ENGINE_NAME`.
+        min_player_count (int): Minimum player count a given team triple must have in order to be returned.
+        workers (int): Number of processes the triples are counted by.
+        prune (bool): Whether the teams which cannot belong to any returned triple should be pruned before counting.
+        size (int): Number of teams per combination. Only the `csts.APRIORI_ENGINE_NAME` engine supports sizes other
+        than 3.
+        sketch_error (float): Error bound of the sketch of the `csts.SKETCH_ENGINE_NAME` engine (Cf.
+        `SketchTripleCounter.error`).
+        sketch_delta (float): Failure probability of the sketch of the `csts.SKETCH_ENGINE_NAME` engine (Cf.
+        `SketchTripleCounter.delta`).
+    """
+    def __init__(self, engine, min_player_count, workers=1, prune=False, size=3, sketch_error=csts.DEFAULT_SKETCH_ERROR,
+                 sketch_delta=csts.DEFAULT_SKETCH_DELTA):
+        """ Initializes the `TripleCounterFactory` object.
+
+        Args:
+            engine (str): Cf. class docstring.
+            min_player_count (int): Cf. class docstring.
+            workers (int): Cf. class docstring.
+            prune (bool): Cf. class docstring.
+            size (int): Cf. class docstring.
+            sketch_error (float): Cf. class docstring.
+            sketch_delta (float): Cf. class docstring.
+        """
+        self.engine = engine
+        self.min_player_count = min_player_count
+        self.workers = workers
+        self.prune = prune
+        self.size = size
+        self.sketch_error = sketch_error
+        self.sketch_delta = sketch_delta
+
+    def build_counter(self):
+        """ Builds and returns the appropriate `TripleCounter` object based on the `engine` instance attribute.
+
+        Returns:
+             TripleCounter: The `TripleCounter` object that encapsulates the counting logic of the chosen engine.
+        """
+        if self.engine == csts.APRIORI_ENGINE_NAME:
+            return ComboCounter(size=self.size, min_player_count=self.min_player_count, workers=self.workers)
+        elif self.engine == csts.NUMPY_ENGINE_NAME:
+            return NumpyTripleCounter(min_player_count=self.min_player_count, workers=self.workers, prune=self.prune)
+        elif self.engine == csts.SKETCH_ENGINE_NAME:
+            return SketchTripleCounter(min_player_count=self.min_player_count, workers=self.workers, prune=self.prune,
+                                       error=self.sketch_error, delta=self.sketch_delta)
+        elif self.engine == csts.SPARSE_ENGINE_NAME:
+            return SparseTripleCounter(min_player_count=self.min_player_count, workers=self.workers, prune=self.prune)
+        else:
+            return TripleCounter(min_player_count=self.min_player_count, workers=self.workers, prune=self.prune)
+
+
+def iter_combinations(team_counts, size, batch_size=BATCH_SIZE):
+    """ Generates all the `size`-combinations of the teams of each player, as positions in the array of the
+    concatenated teams of all the players. The combinations of all the players who played for the same number of teams
+    are generated at once, by batches of at most (about) `batch_size` combinations.
+
+    Args:
+        team_counts (numpy.ndarray): Array of the number of teams of each player.
+        size (int): Size of the combinations.
+        batch_size (int): Maximum number of combinations per batch (unless a single player exceeds it).
+
+    Yields:
+        numpy.ndarray: 2D array of shape (number of combinations, `size`) of team positions. Positions are sorted
+        within each combination.
+    """
+    offsets = np.concatenate([[0], np.cumsum(team_counts)[:-1]]).astype(np.int64)
+    for team_count in np.unique(team_counts):
+        if team_count < size:
+            continue
+        combinations = np.array(list(itertools.combinations(range(team_count), size)), dtype=np.int64)
+        player_offsets = offsets[team_counts == team_count]
+        step = max(1, batch_size // len(combinations))
+        for start in range(0, len(player_offsets), step):
+            yield (player_offsets[start:start + step, np.newaxis, np.newaxis] + combinations).reshape(-1, size)
+
+
+def build_team_ids(df):
+    """ Builds the team ID of each record, made of the team trigram and of the league name if any (Ex: 'BOS-AL').
+
+    Args:
+        df (pandas.DataFrame): DataFrame with 'team' and 'league' columns.
+
+    Returns:
+        numpy.ndarray: Array of the team IDs of the records.
+    """
+    team, league = df.team.astype(str), df.league.astype(str)  # Categorical columns do not support concatenation
+    return np.where(df.league.isna(), team, team + '-' + league)
+
+
+def encode_team_ids(team_codes, teams, league_codes, leagues):
+    """ Encodes the team ID (Cf. `build_team_ids`) of each record from its dictionary-encoded team and league. Team IDs
+    are only built for the distinct (team, league) pairs, not for each record.
+
+    Args:
+        team_codes (numpy.ndarray): Array of the (non-negative) team codes of the records.
+        teams (numpy.ndarray): Array of the team trigrams, indexed by team code.
+        league_codes (numpy.ndarray): Array of the league codes of the records, missing leagues being encoded as -1.
+        leagues (numpy.ndarray): Array of the league names, indexed by league code.
+
+    Returns:
+        (numpy.ndarray, numpy.ndarray): Array of the team ID codes of the records and array of the team IDs, indexed by
+        team ID code.
+    """
+    pair_keys = team_codes.astype(np.int64) * (len(leagues) + 1) + league_codes + 1
+    present = np.bincount(pair_keys, minlength=len(teams) * (len(leagues) + 1)) > 0
+    pairs = np.flatnonzero(present)
+    pair_teams, pair_leagues = pairs // (len(leagues) + 1), pairs % (len(leagues) + 1) - 1
+    team_names = np.array([team if league < 0 else '{}-{}'.format(team, leagues[league])
+                           for team, league in zip(np.asarray(teams)[pair_teams], pair_leagues)], dtype=object)
+    return (np.cumsum(present) - 1)[pair_keys], team_names
+
+
+def encode_player_teams(df, min_team_count=3):
+    """ Lists for each unique player the teams the player played for as CSR-style arrays of integer team codes. Columns
+    are factorized once, no string is built per record and no list per player: the (player, team) pairs are
+    deduplicated by sorting their packed codes. Players who played for less than `min_team_count` teams are discarded,
+    and so are the records with a missing team or player ID.
+
+    Args:
+        df (pandas.DataFrame): DataFrame that gathers the raw data of all input baseball statistics files.
+        min_team_count (int): Minimum number of teams a player must have played for in order to be listed.
+
+    Returns:
+        (numpy.ndarray, numpy.ndarray, numpy.ndarray): Array of the offsets of the teams of each listed player (one more
+        than the number of players) in the array of the concatenated team codes (sorted within each player), this array
+        and the array of the team IDs, indexed by team code.
+    """
+    team_codes, teams = pd.factorize(df['team'])
+    league_codes, leagues = pd.factorize(df['league'])
+    player_codes, player_ids = pd.factorize(df['player-id'])
+    valid = (team_codes >= 0) & (player_codes >= 0)
+    team_codes, team_names = encode_team_ids(team_codes=team_codes[valid], teams=np.asarray(teams, dtype=object),
+                                             league_codes=league_codes[valid],
+                                             leagues=np.asarray(leagues, dtype=object))
+
+    keys = np.sort(player_codes[valid].astype(np.int64) * len(team_names) + team_codes)
+    keys = keys[np.diff(keys, prepend=-1) != 0]
+    players, team_codes = keys // len(team_names), keys % len(team_names)
+    team_counts = np.bincount(players, minlength=len(player_ids))
+    listed = team_counts >= min_team_count
+    offsets = np.concatenate([[0], np.cumsum(team_counts[listed])]).astype(np.int64)
+    return offsets, team_codes[listed[players]], team_names
+
+
+def encode_team_lists(player_teams):
+    """ Converts lists of team IDs (one list per player) to CSR-style arrays of integer team codes.
+
+    Args:
+        player_teams (pandas.Series): Series of lists of unique team IDs (one list per player).
+
+    Returns:
+        (numpy.ndarray, numpy.ndarray, numpy.ndarray): Cf. `encode_player_teams`.
+    """
+    team_counts = np.array([len(teams) for teams in player_teams], dtype=np.int64)
+    team_codes, team_names = pd.factorize(np.array(list(itertools.chain.from_iterable(player_teams)), dtype=object))
+    player_codes = np.repeat(np.arange(len(team_counts)), team_counts)
+    team_codes = team_codes[np.lexsort((team_codes, player_codes))].astype(np.int64)
+    return np.concatenate([[0], np.cumsum(team_counts)]).astype(np.int64), team_codes, \
+        np.asarray(team_names, dtype=object)
+
+
+def decode_player_teams(offsets, team_codes, team_names):
+    """ Converts CSR-style arrays of integer team codes (Cf. `encode_player_teams`) to lists of team IDs.
+
+    Args:
+        offsets (numpy.ndarray): Array of the offsets of the teams of each player in `team_codes`.
+        team_codes (numpy.ndarray): Array of the concatenated team codes of the players.
+        team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+
+    Returns:
+        list[list]: List of lists of unique team IDs (one list per player).
+    """
+    if len(offsets) < 2:
+        return list()
+    return [teams.tolist() for teams in np.split(team_names[team_codes], offsets[1:-1])]
+
+
+def encode_values(values, names):
+    """ Encodes values as their position in an array of names, unknown values being appended to the names.
+
+    Args:
+        values (numpy.ndarray): Array of the values to be encoded.
+        names (numpy.ndarray): Array of the already known names.
+
+    Returns:
+        (numpy.ndarray, numpy.ndarray): Array of the codes of `values` and array of the (extended) names.
+    """
+    codes = pd.Index(names).get_indexer(values).astype(np.int64)
+    unknown = codes < 0
+    unknown_codes, unknown_values = pd.factorize(values[unknown])
+    codes[unknown] = len(names) + unknown_codes
+    return codes, np.concatenate([names, np.asarray(unknown_values, dtype=object)])
+
+
+def count_marked_triples(member_bits, marked_bits, n_teams, batch_size=BATCH_SIZE):
+    """ Counts, over a set of players, the team triples of each player which contain at least one of its marked teams
+    (Ex: the teams a player was added to).
+
+    Args:
+        member_bits (numpy.ndarray): 2D boolean array of shape (number of players, number of teams or more) flagging
+            the teams of each player.
+        marked_bits (numpy.ndarray): 2D boolean array of the same shape flagging the marked teams of each player (a
+            subset of its teams).
+        n_teams (int): Total number of teams, used to pack the triples into keys (Cf. `NumpyTripleCounter`).
+        batch_size (int): Maximum number of triples generated per batch.
+
+    Returns:
+        (numpy.ndarray, numpy.ndarray): Arrays of unique (sorted) packed triple keys and of their player counts.
+    """
+    players, codes = np.nonzero(member_bits)
+    unmarked = ~marked_bits[players, codes].astype(bool)
+    batches = [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))]
+    for positions in iter_combinations(team_counts=np.bincount(players, minlength=len(member_bits)), size=3,
+                                       batch_size=batch_size):
+        if unmarked.any():  # Otherwise (Ex: players counted for the first time), all the triples are kept
+            positions = positions[~unmarked[positions].all(axis=1)]
+        triples = codes[positions]
+        keys = (triples[:, 0] * n_teams + triples[:, 1]) * n_teams + triples[:, 2]
+        batches.append(np.unique(keys, return_counts=True))
+    return NumpyTripleCounter._reduce_counts(keys=np.concatenate([keys for keys, _ in batches]),
+                                             counts=np.concatenate([counts for _, counts in batches]))
+
+
+def merge_counts(keys, counts, delta_keys, delta_counts):
+    """ Merges (sums) sorted counts with sorted (possibly negative) delta counts. Keys the count of which drops to zero
+    are removed.
+
+    Args:
+        keys (numpy.ndarray): Sorted array of unique keys.
+        counts (numpy.ndarray): Array of the counts of `keys`.
+        delta_keys (numpy.ndarray): Sorted array of unique keys.
+        delta_counts (numpy.ndarray): Array of the counts to be added to the ones of `delta_keys`.
+
+    Returns:
+        (numpy.ndarray, numpy.ndarray): Sorted array of the merged keys and array of their counts.
+    """
+    indexes = np.searchsorted(keys, delta_keys)
+    found = indexes < len(keys)
+    found[found] = keys[indexes[found]] == delta_keys[found]
+    counts = counts.copy()
+    counts[indexes[found]] += delta_counts[found]
+    keys = np.insert(keys, indexes[~found], delta_keys[~found])
+    counts = np.insert(counts, indexes[~found], delta_counts[~found])
+    non_zero = counts != 0
+    return keys[non_zero], counts[non_zero]
+
+
+def split_shards(weights, shard_count):
+    """ Splits a sequence of items into contiguous shards of balanced total weight.
+
+    Args:
+        weights (numpy.ndarray): Array of the (non-negative) weights of the items.
+        shard_count (int): Maximum number of shards.
+
+    Returns:
+        list[slice]: List of non-empty and contiguous slices covering all the items.
+    """
+    if not len(weights):
+        return list()
+    cumulated_weights = np.cumsum(weights)
+    targets = cumulated_weights[-1] * np.arange(1, shard_count) / shard_count
+    bounds = np.unique(np.concatenate([[0], np.searchsorted(cumulated_weights, targets, side='right'),
+                                       [len(weights)]]))
+    return [slice(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+class CombinationCounts:
+    """ This class holds the player counts of team combinations as arrays of integer team codes, so that large numbers
+    of combinations can be selected, sorted and formatted (See `ddog.output`) without building a Python object per
+    combination. Iterating over it generates the same (team combination, player count) tuples as the lists returned by
+    the counting engines.
+
+    Attributes:
+        team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+        combinations (numpy.ndarray): 2D array of shape (number of combinations, combination size) of team codes.
+        counts (numpy.ndarray): Array of the player counts of the combinations.
+    """
+    def __init__(self, team_names, combinations, counts):
+        """ Initializes the `CombinationCounts` object.
+
+        Args:
+            team_names (numpy.ndarray): Cf. class docstring.
+            combinations (numpy.ndarray): Cf. class docstring.
+            counts (numpy.ndarray): Cf. class docstring.
+        """
+        self.team_names = team_names
+        self.combinations = combinations
+        self.counts = counts
+
+    @classmethod
+    def from_triple_keys(cls, keys, counts, team_names):
+        """ Builds a `CombinationCounts` object from packed team triple keys (Cf. `NumpyTripleCounter`).
+
+        Args:
+            keys (numpy.ndarray): Array of the packed keys of the team triples.
+            counts (numpy.ndarray): Array of the player counts of the team triples.
+            team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+
+        Returns:
+            CombinationCounts: The counts of the team triples.
+        """
+        n_teams = len(team_names)
+        return cls(team_names=team_names, counts=counts,
+                   combinations=np.stack([keys // n_teams ** 2, keys // n_teams % n_teams, keys % n_teams], axis=1))
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __iter__(self):
+        for combination, count in zip(self.team_names[self.combinations].tolist(), self.counts.tolist()):
+            yield frozenset(combination), count
 
 
 class TripleCounter:
     """ This class encapsulates the logic dedicated to the computation of baseball team triples consisting of a
-    minimum number of players.
-    
-    Attributes: 
-        min_player_count (int): Minimum player count a given team triple must have in order to be returned.    
+    minimum number of players. When set with several workers, players are split into shards of balanced triple counts,
+    the triples of each shard are counted by a pool of processes and the partial counts merged. When pruning, the
+    teams which cannot belong to any returned triple are removed beforehand (See `_prune_encoded_teams`).
+
+    Attributes:
+        size (int): Number of teams per combination (always 3).
+        min_player_count (int): Minimum player count a given team triple must have in order to be returned.
+        workers (int): Number of processes the triples are counted by.
+        prune (bool): Whether the teams which cannot belong to any returned triple should be pruned before counting.
     """
-    def __init__(self, min_player_count):
+    size = 3
+
+    def __init__(self, min_player_count, workers=1, prune=False):
         """ Initializes the `TripleCounter` object.
-        
+
         Args:
-            min_player_count (int): Cf. class docstring. 
+            min_player_count (int): Cf. class docstring.
+            workers (int): Cf. class docstring.
+            prune (bool): Cf. class docstring.
         """
         self.min_player_count = min_player_count
+        self.workers = workers
+        self.prune = prune
+
+    def _map_shards(self, func, shards):
+        """ Applies `func` to each shard of `shards`, using a pool of `workers` processes if there are several.
+
+        Args:
+            func (function): Picklable function to be applied to each shard.
+            shards (list): List of shards (each of them being a tuple of positional arguments of `func`).
+
+        Returns:
+            list: List of the values returned by `func` for each shard.
+        """
+        if self.workers > 1 and len(shards) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+                return list(executor.map(func, *zip(*shards)))
+        return [func(*shard) for shard in shards]
+
+    @staticmethod
+    def _reduce_counts(keys, counts):
+        """ Sums the counts associated with identical keys.
+
+        Args:
+            keys (numpy.ndarray): Array of packed triple keys, possibly repeated.
+            counts (numpy.ndarray): Array of counts associated with `keys`.
+
+        Returns:
+            (numpy.ndarray, numpy.ndarray): Arrays of unique (sorted) keys and of their summed counts.
+        """
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        return unique_keys, np.bincount(inverse.ravel(), weights=counts, minlength=len(unique_keys)).astype(np.int64)
+
+    def _prune_encoded_teams(self, offsets, team_codes, n_teams):
+        """ Removes from the teams of each player the teams which cannot belong to any triple reaching the minimum
+        player count. A triple's player count cannot exceed the player count of any of its three team pairs: a team
+        can only belong to a returned triple of a player if it forms a frequent pair (a pair reaching the minimum player
+        count) with at least two other teams of the player. Since returned triples are left untouched for every player,
+        counting the triples of the pruned teams returns identical results.
+
+        Args:
+            offsets (numpy.ndarray): Array of the offsets of the teams of each player in `team_codes`.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players.
+            n_teams (int): Total number of teams.
+
+        Returns:
+            (numpy.ndarray, numpy.ndarray, numpy.ndarray): Offsets and team codes of the pruned teams, players left with
+            less than three teams being discarded, and boolean matrix flagging the frequent team pairs (indexed by team
+            codes), `None` if every pair is frequent.
+        """
+        team_counts = np.diff(offsets)
+        if not len(team_counts):
+            return offsets, team_codes, None
+
+        def pair_keys(positions):
+            return team_codes[positions[:, 0]] * n_teams + team_codes[positions[:, 1]]
+
+        pair_counts = np.zeros(n_teams ** 2, dtype=np.int64)
+        for positions in iter_combinations(team_counts=team_counts, size=2):
+            pair_counts += np.bincount(pair_keys(positions), minlength=n_teams ** 2)
+
+        frequent_partners = np.zeros(len(team_codes), dtype=np.int64)
+        for positions in iter_combinations(team_counts=team_counts, size=2):
+            frequent_positions = positions[pair_counts[pair_keys(positions)] >= self.min_player_count]
+            frequent_partners += np.bincount(frequent_positions.ravel(), minlength=len(team_codes))
+
+        frequent = (pair_counts >= self.min_player_count).reshape(n_teams, n_teams)
+        frequent |= frequent.T
+        if np.count_nonzero(frequent) == n_teams * (n_teams - 1):
+            frequent = None  # Every pair is frequent: no triple would be filtered out
+
+        kept = frequent_partners >= 2
+        kept_team_counts = np.add.reduceat(kept, offsets[:-1])
+        kept &= np.repeat(kept_team_counts >= 3, team_counts)
+        kept_team_counts = kept_team_counts[kept_team_counts >= 3]
+        logging.info('Pruning kept {kept:d} players out of {total:d} and {teams:d} player teams out of {total_teams:d}'
+                     .format(kept=len(kept_team_counts), total=len(team_counts), teams=int(kept_team_counts.sum()),
+                             total_teams=len(team_codes)))
+        return np.concatenate([[0], np.cumsum(kept_team_counts)]).astype(np.int64), team_codes[kept], frequent
+
+    @staticmethod
+    def _iter_candidate_triples(teams, frequent_pairs):
+        """ Generates the team triples of a player whose three team pairs are all frequent. The third team of a triple
+        is only looked for among the frequent partners of both of its first two teams.
+
+        Args:
+            teams (list): List of unique team IDs (or team codes) of the player.
+            frequent_pairs (set): Set of the frequent team pairs (`frozenset`).
+
+        Returns:
+            iterator: Iterator over the team triples (`tuple`).
+        """
+        partners = {team: {other for other in teams if frozenset((team, other)) in frequent_pairs} for team in teams}
+        if all(len(team_partners) == len(teams) - 1 for team_partners in partners.values()):
+            return itertools.combinations(teams, r=3)
+        return TripleCounter._iter_partner_triples(teams=teams, partners=partners)
+
+    @staticmethod
+    def _iter_partner_triples(teams, partners):
+        """ Generates the team triples of a player whose three teams are partners of one another.
+
+        Args:
+            teams (list): List of unique team IDs (or team codes) of the player.
+            partners (dict): Dictionary mapping each team of `teams` to the set of its frequent partners.
+
+        Yields:
+            tuple: Team triple.
+        """
+        for i, first_team in enumerate(teams):
+            for j in range(i + 1, len(teams)):
+                second_team = teams[j]
+                if second_team not in partners[first_team]:
+                    continue
+                for third_team in teams[j + 1:]:
+                    if third_team in partners[first_team] and third_team in partners[second_team]:
+                        yield first_team, second_team, third_team
+
+    @classmethod
+    def _count_shard(cls, team_counts, team_codes, n_teams, frequent_pairs=None):
+        """ Counts for each team triple the number of players of a shard who played for its three teams. Triples are
+        counted in a dictionary keyed by packed triple keys (Cf. `NumpyTripleCounter`) and returned as arrays, which are
+        cheaper to send back from a worker process than a dictionary of `frozenset` objects.
+
+        Args:
+            team_counts (numpy.ndarray): Array of the number of teams of each player of the shard.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players of the shard.
+            n_teams (int): Total number of teams.
+            frequent_pairs (set): Set of the frequent team pairs (`frozenset` of team codes). If provided, only the
+                triples whose three team pairs are frequent are counted.
+
+        Returns:
+            (numpy.ndarray, numpy.ndarray): Arrays of unique (sorted) packed triple keys and of their player counts.
+        """
+        team_triple_counter = dict()
+        for teams in np.split(team_codes, np.cumsum(team_counts)[:-1]):
+            teams = teams.tolist()
+            if frequent_pairs is None:
+                player_team_triples = itertools.combinations(teams, r=3)
+            else:
+                player_team_triples = cls._iter_candidate_triples(teams=teams, frequent_pairs=frequent_pairs)
+            for first_team, second_team, third_team in player_team_triples:
+                key = (first_team * n_teams + second_team) * n_teams + third_team
+                current_triple_count = team_triple_counter.get(key, 0)
+                team_triple_counter[key] = current_triple_count + 1
+        return cls._reduce_counts(keys=np.array(list(team_triple_counter.keys()), dtype=np.int64),
+                                  counts=np.array(list(team_triple_counter.values()), dtype=np.int64))
+
+    def _count_encoded_triples(self, offsets, team_codes, team_names, frequent=None):
+        """ Counts for each team triple the number of players who played for its three teams, from CSR-style arrays of
+        integer team codes.
+
+        Args:
+            offsets (numpy.ndarray): Array of the offsets of the teams of each player in `team_codes`.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players.
+            team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+            frequent (numpy.ndarray): Boolean matrix flagging the frequent team pairs (indexed by team codes). If
+                provided, only the triples whose three team pairs are frequent are counted.
+
+        Returns:
+            list[(frozenset, int)]: List of (team triple, player count) where each player count is greater or equal to
+            the value of the `min_player_count` attribute.
+        """
+        team_counts, n_teams = np.diff(offsets), len(team_names)
+        if not len(team_counts):
+            return list()
+
+        frequent_pairs = None
+        if frequent is not None:
+            first_codes, second_codes = np.nonzero(np.triu(frequent))
+            frequent_pairs = {frozenset(pair) for pair in zip(first_codes.tolist(), second_codes.tolist())}
+        shards = [(team_counts[shard], team_codes[offsets[shard.start]:offsets[shard.stop]], n_teams, frequent_pairs)
+                  for shard in split_shards(weights=team_counts ** 3, shard_count=self.workers)]
+        partial_counts = self._map_shards(func=self._count_shard, shards=shards)
+        keys, counts = self._reduce_counts(keys=np.concatenate([keys for keys, _ in partial_counts]),
+                                           counts=np.concatenate([counts for _, counts in partial_counts]))
+
+        selected = counts >= self.min_player_count
+        return list(CombinationCounts.from_triple_keys(keys=keys[selected], counts=counts[selected],
+                                                       team_names=team_names))
+
+    def count_encoded(self, offsets, team_codes, team_names):
+        """ List baseball team triples with the required minimum number of players from CSR-style arrays of integer
+        team codes (Cf. `encode_player_teams`), pruning teams beforehand if requested. Every engine counts through this
+        method, which can thus be measured on already pre-aggregated team lists.
+
+        Args:
+            offsets (numpy.ndarray): Array of the offsets of the teams of each player in `team_codes`.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players.
+            team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+
+        Returns:
+            list[(frozenset, int)]: List of (team triple, player count) where each player count is greater or equal to
+            the value of the `min_player_count` attribute.
+        """
+        frequent = None
+        if self.prune:
+            with ddog.profiling.stage(name='prune'):
+                offsets, team_codes, frequent = self._prune_encoded_teams(offsets=offsets, team_codes=team_codes,
+                                                                          n_teams=len(team_names))
+                ddog.profiling.count(players=len(offsets) - 1)
+        with ddog.profiling.stage(name='count'):
+            triple_counts = self._count_encoded_triples(offsets=offsets, team_codes=team_codes, team_names=team_names,
+                                                        frequent=frequent)
+            ddog.profiling.count(combinations=len(triple_counts))
+        return triple_counts
 
     def compute(self, df):
         """ List baseball team triples with the required minimum number of players based on the data available in the
         input DataFrame `df`.
-        
-        Args: 
+
+        Args:
             df (pandas.DataFrame): DataFrame that gathers the raw data of all input baseball statistics files.
 
-        Returns: 
+        Returns:
             list[(frozenset, int)]: List of (team triple, player count) where each player count is greater or equal to
             the value of the `min_player_count` attribute.
         """
-        df = df.drop_duplicates()\
-            .copy()  # We force the copy to avoid raising a SettingWithCopyWarning when creating the 'team-id' column
+        with ddog.profiling.stage(name='pre-aggregation'):
+            encoded_teams = encode_player_teams(df=df)
+            ddog.profiling.count(rows=len(df), players=len(encoded_teams[0]) - 1)
+        return self.count_encoded(*encoded_teams)
+
 
-        df['team-id'] = np.where(df.league.isna(), df.team, df.team + '-' + df.league)
+class NumpyTripleCounter(TripleCounter):
+    """ Concrete implementation of `TripleCounter` which counts team triples using vectorized NumPy operations. Team IDs
+    are dictionary-encoded as small integers so that each (sorted) team triple can be packed into a single 64-bit
+    integer key. The triples of all the players who played for the same number of teams are generated in a single batch
+    and the keys are counted by sorting them.
 
-        df = df.groupby('player-id', as_index=False) \
-            .agg(team_count=('team-id', 'count'), teams=('team-id', list))
+    Attributes:
+        min_player_count (int): Minimum player count a given team triple must have in order to be returned.
+        workers (int): Number of processes the triples are counted by.
+        prune (bool): Whether the teams which cannot belong to any returned triple should be pruned before counting.
+        batch_size (int): Maximum number of triples generated per batch, which bounds the memory footprint.
+    """
+    def __init__(self, min_player_count, workers=1, prune=False, batch_size=BATCH_SIZE):
+        """ Initializes the `NumpyTripleCounter` object.
 
-        df = df[df.team_count >= 3]
+        Args:
+            min_player_count (int): Cf. class docstring.
+            workers (int): Cf. class docstring.
+            prune (bool): Cf. class docstring.
+            batch_size (int): Cf. class docstring.
+        """
+        super().__init__(min_player_count=min_player_count, workers=workers, prune=prune)
+        self.batch_size = batch_size
 
-        team_triple_counter = dict()
-        for player_teams in df.teams:
-            player_team_triples = itertools.combinations(player_teams, r=3)
-            for team_triple in player_team_triples:
-                key = frozenset(team_triple)
-                current_triple_count = team_triple_counter.get(key, 0)
-                team_triple_counter[key] = current_triple_count + 1
+    def _iter_triple_keys(self, team_counts, team_codes, n_teams, frequent=None):
+        """ Generates the packed keys of the team triples of each player of a shard, by batches.
+
+        Args:
+            team_counts (numpy.ndarray): Array of the number of teams of each player of the shard.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players of the shard.
+            n_teams (int): Total number of teams.
+            frequent (numpy.ndarray): Boolean matrix flagging the frequent team pairs (indexed by team codes). If
+                provided, only the triples whose three team pairs are frequent are generated.
 
-        return [(triple, count) for triple, count in team_triple_counter.items() if count >= self.min_player_count]
+        Yields:
+            numpy.ndarray: Array of the packed keys of a batch of triples (one key per player and triple).
+        """
+        for positions in iter_combinations(team_counts=team_counts, size=3, batch_size=self.batch_size):
+            triples = team_codes[positions]
+            if frequent is not None:
+                triples = triples[frequent[triples[:, 0], triples[:, 1]] & frequent[triples[:, 0], triples[:, 2]]
+                                  & frequent[triples[:, 1], triples[:, 2]]]
+            yield (triples[:, 0] * n_teams + triples[:, 1]) * n_teams + triples[:, 2]
+
+    def _count_shard(self, team_counts, team_codes, n_teams, frequent=None):
+        """ Counts for each team triple the number of players of a shard who played for its three teams.
+
+        Args:
+            team_counts (numpy.ndarray): Array of the number of teams of each player of the shard.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players of the shard.
+            n_teams (int): Total number of teams.
+            frequent (numpy.ndarray): Boolean matrix flagging the frequent team pairs (indexed by team codes). If
+                provided, only the triples whose three team pairs are frequent are counted.
+
+        Returns:
+            (numpy.ndarray, numpy.ndarray): Arrays of unique (sorted) packed triple keys and of their player counts.
+        """
+        batches = [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))]
+        for keys in self._iter_triple_keys(team_counts=team_counts, team_codes=team_codes, n_teams=n_teams,
+                                           frequent=frequent):
+            batches.append(np.unique(keys, return_counts=True))
+
+        return self._reduce_counts(keys=np.concatenate([keys for keys, _ in batches]),
+                                   counts=np.concatenate([counts for _, counts in batches]))
+
+    def _count_encoded_triples(self, offsets, team_codes, team_names, frequent=None):
+        """ Counts for each team triple the number of players who played for its three teams, from CSR-style arrays of
+        integer team codes.
+
+        Args:
+            offsets (numpy.ndarray): Array of the offsets of the teams of each player in `team_codes`.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players.
+            team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+            frequent (numpy.ndarray): Boolean matrix flagging the frequent team pairs (indexed by team codes). If
+                provided, only the triples whose three team pairs are frequent are counted.
+
+        Returns:
+            CombinationCounts: Counts of the team triples whose player count is greater or equal to the value of the
+            `min_player_count` attribute (an empty list if there is none).
+        """
+        team_counts, n_teams = np.diff(offsets), len(team_names)
+        if not len(team_counts):
+            return list()
+
+        shards = [(team_counts[shard], team_codes[offsets[shard.start]:offsets[shard.stop]], n_teams, frequent)
+                  for shard in split_shards(weights=team_counts ** 3, shard_count=self.workers)]
+        partial_counts = self._map_shards(func=self._count_shard, shards=shards)
+        keys, counts = self._reduce_counts(keys=np.concatenate([keys for keys, _ in partial_counts]),
+                                           counts=np.concatenate([counts for _, counts in partial_counts]))
+
+        selected = counts >= self.min_player_count
+        if not selected.any():
+            return list()
+        return CombinationCounts.from_triple_keys(keys=keys[selected], counts=counts[selected], team_names=team_names)
+
+
+class SparseTripleCounter(TripleCounter):
+    """ Concrete implementation of `TripleCounter` which counts team triples with sparse matrix products (requires the
+    optional `scipy` package). Players and teams form a sparse player x team incidence matrix A. The player counts of
+    the triples whose smallest team code is the anchor team t are the entries above the diagonal of the product
+    A_t.T @ A_t, where A_t gathers the rows of A of the players of team t (i.e. the non-zero rows of diag(A[:, t]) @ A)
+    restricted to the teams coded above t. The teams forming a pair with the anchor team with less than
+    `min_player_count` players are dropped before multiplying, so that only candidate triples are counted.
+
+    Attributes:
+        min_player_count (int): Minimum player count a given team triple must have in order to be returned.
+        workers (int): Number of processes the triples are counted by.
+        prune (bool): Whether the teams which cannot belong to any returned triple should be pruned before counting.
+    """
+    def _count_shard(self, incidence, anchors):
+        """ Counts for each team triple whose smallest team is one of the anchor teams of a shard the number of players
+        who played for its three teams, only returning the triples with the required minimum number of players.
+
+        Args:
+            incidence (scipy.sparse.csr_matrix): Player x team incidence matrix.
+            anchors (numpy.ndarray): Array of the codes of the anchor teams of the shard.
+
+        Returns:
+            (numpy.ndarray, numpy.ndarray): Arrays of packed triple keys and of their player counts.
+        """
+        n_teams = incidence.shape[1]
+        columns = incidence.tocsc()
+        batches = [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))]
+        for anchor in anchors.tolist():
+            players = columns.indices[columns.indptr[anchor]:columns.indptr[anchor + 1]]
+            if len(players) < self.min_player_count:
+                continue
+            anchor_incidence = incidence[players][:, anchor + 1:]
+            partners = np.flatnonzero(np.asarray(anchor_incidence.sum(axis=0)).ravel() >= self.min_player_count)
+            if len(partners) < 2:
+                continue
+            anchor_incidence = anchor_incidence[:, partners]
+            pair_counts = (anchor_incidence.T @ anchor_incidence).tocoo()
+            selected = (pair_counts.row < pair_counts.col) & (pair_counts.data >= self.min_player_count)
+            second_teams = partners[pair_counts.row[selected]] + anchor + 1
+            third_teams = partners[pair_counts.col[selected]] + anchor + 1
+            batches.append(((anchor * n_teams + second_teams) * n_teams + third_teams,
+                            pair_counts.data[selected].astype(np.int64)))
+
+        return np.concatenate([keys for keys, _ in batches]), np.concatenate([counts for _, counts in batches])
+
+    def _count_encoded_triples(self, offsets, team_codes, team_names, frequent=None):
+        """ Counts for each team triple the number of players who played for its three teams, from CSR-style arrays of
+        integer team codes. The frequent team pairs are not needed since the infrequent pairs of each anchor team are
+        dropped before multiplying.
+
+        Args:
+            offsets (numpy.ndarray): Array of the offsets of the teams of each player in `team_codes`.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players.
+            team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+            frequent (numpy.ndarray): Unused, Cf. `TripleCounter._count_encoded_triples`.
+
+        Returns:
+            CombinationCounts: Counts of the team triples whose player count is greater or equal to the value of the
+            `min_player_count` attribute (an empty list if there is none).
+
+        Raises:
+            ImportError: If the `scipy` package is not installed.
+        """
+        try:
+            import scipy.sparse
+        except ImportError as error:
+            raise ImportError('Counting with the "{}" engine requires the scipy package'
+                              .format(csts.SPARSE_ENGINE_NAME)) from error
+
+        n_players, n_teams = len(offsets) - 1, len(team_names)
+        if not n_players:
+            return list()
+
+        incidence = scipy.sparse.csr_matrix((np.ones(len(team_codes), dtype=np.int32), team_codes, offsets),
+                                            shape=(n_players, n_teams))
+        team_counts = np.diff(offsets)
+        anchor_weights = np.bincount(team_codes, weights=np.repeat(team_counts ** 2, team_counts), minlength=n_teams)
+        shards = [(incidence, np.arange(n_teams)[shard])
+                  for shard in split_shards(weights=anchor_weights, shard_count=self.workers)]
+        partial_counts = self._map_shards(func=self._count_shard, shards=shards)
+        keys = np.concatenate([keys for keys, _ in partial_counts])
+        counts = np.concatenate([counts for _, counts in partial_counts])
+        if not len(keys):
+            return list()
+
+        order = np.argsort(keys)
+        return CombinationCounts.from_triple_keys(keys=keys[order], counts=counts[order], team_names=team_names)
+
+
+class SketchTripleCounter(NumpyTripleCounter):
+    """ Concrete implementation of `TripleCounter` which counts the team triples of very large inputs in bounded memory.
+    A first pass adds the packed keys (Cf. `NumpyTripleCounter`) of the triples of every player to a count-min sketch:
+    `depth` rows of `width` counters, each row indexing the counters by its own (multiply-shift) hash of the keys. The
+    estimated player count of a triple, the minimum of its counters, never underestimates its actual player count and
+    overestimates it by at most `error` times the total number of triples of all the players with a probability of at
+    least 1 - `delta`. A second pass then counts exactly the candidate triples, whose estimated player count reaches
+    the minimum player count. The returned counts are thus exact and no triple reaching the minimum player count is
+    missed: the error bounds only set the memory of the sketch against the number of false candidates.
+
+    Attributes:
+        min_player_count (int): Minimum player count a given team triple must have in order to be returned.
+        workers (int): Number of processes the triples are counted by.
+        prune (bool): Whether the teams which cannot belong to any returned triple should be pruned before counting.
+        batch_size (int): Maximum number of triples generated per batch, which bounds the memory footprint.
+        error (float): Maximum overestimation of the player counts, relative to the total number of triples.
+        delta (float): Probability of the overestimation of a player count exceeding the `error` bound.
+        width (int): Number of counters per row of the sketch (the power of 2 above e / `error`).
+        depth (int): Number of rows of the sketch (ln(1 / `delta`) rounded up).
+    """
+    def __init__(self, min_player_count, workers=1, prune=False, batch_size=BATCH_SIZE,
+                 error=csts.DEFAULT_SKETCH_ERROR, delta=csts.DEFAULT_SKETCH_DELTA, seed=0):
+        """ Initializes the `SketchTripleCounter` object.
+
+        Args:
+            min_player_count (int): Cf. class docstring.
+            workers (int): Cf. class docstring.
+            prune (bool): Cf. class docstring.
+            batch_size (int): Cf. class docstring.
+            error (float): Cf. class docstring.
+            delta (float): Cf. class docstring.
+            seed (int): Seed of the random generator drawing the hash functions of the sketch.
+        """
+        super().__init__(min_player_count=min_player_count, workers=workers, prune=prune, batch_size=batch_size)
+        self.error = error
+        self.delta = delta
+        self._shift = 64 - max(1, int(np.ceil(np.log2(np.e / error))))
+        self.width = 2 ** (64 - self._shift)
+        self.depth = max(1, int(np.ceil(np.log(1 / delta))))
+        rng = np.random.RandomState(seed)
+        self._multipliers = rng.randint(2 ** 64, size=self.depth, dtype=np.uint64) | np.uint64(1)
+        self._increments = rng.randint(2 ** 64, size=self.depth, dtype=np.uint64)
+
+    def _hash(self, keys, row):
+        """ Hashes packed triple keys into the counters of a row of the sketch.
+
+        Args:
+            keys (numpy.ndarray): Array of (non-negative) packed triple keys.
+            row (int): Index of the row of the sketch.
+
+        Returns:
+            numpy.ndarray: Array of the indexes of the counters of the keys in the row.
+        """
+        hashes = self._multipliers[row] * keys.view(np.uint64) + self._increments[row]  # Wraps around modulo 2 ** 64
+        return (hashes >> np.uint64(self._shift)).view(np.int64)
+
+    def _sketch_shard(self, team_counts, team_codes, n_teams, frequent=None):
+        """ Adds the triples of each player of a shard to a count-min sketch.
+
+        Args:
+            team_counts (numpy.ndarray): Array of the number of teams of each player of the shard.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players of the shard.
+            n_teams (int): Total number of teams.
+            frequent (numpy.ndarray): Boolean matrix flagging the frequent team pairs (indexed by team codes). If
+                provided, only the triples whose three team pairs are frequent are added.
+
+        Returns:
+            numpy.ndarray: 2D array of shape (`depth`, `width`) of the counters of the sketch.
+        """
+        sketch = np.zeros((self.depth, self.width), dtype=np.int64)
+        for keys in self._iter_triple_keys(team_counts=team_counts, team_codes=team_codes, n_teams=n_teams,
+                                           frequent=frequent):
+            for row in range(self.depth):
+                sketch[row] += np.bincount(self._hash(keys=keys, row=row), minlength=self.width)
+        return sketch
+
+    def _count_candidates_shard(self, team_counts, team_codes, n_teams, frequent, sketch):
+        """ Counts for each candidate team triple (whose estimated player count reaches the minimum player count) the
+        number of players of a shard who played for its three teams.
+
+        Args:
+            team_counts (numpy.ndarray): Array of the number of teams of each player of the shard.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players of the shard.
+            n_teams (int): Total number of teams.
+            frequent (numpy.ndarray): Boolean matrix flagging the frequent team pairs (indexed by team codes), `None`
+                if every pair is frequent.
+            sketch (numpy.ndarray): 2D array of shape (`depth`, `width`) of the counters of the sketch of all the
+                players.
+
+        Returns:
+            (numpy.ndarray, numpy.ndarray): Arrays of unique (sorted) packed candidate triple keys and of their player
+            counts.
+        """
+        batches = [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))]
+        pending = 0
+        for keys in self._iter_triple_keys(team_counts=team_counts, team_codes=team_codes, n_teams=n_teams,
+                                           frequent=frequent):
+            for row in range(self.depth):  # Each row only estimates the keys no previous row ruled out
+                keys = keys[sketch[row][self._hash(keys=keys, row=row)] >= self.min_player_count]
+            batches.append(np.unique(keys, return_counts=True))
+            pending += len(batches[-1][0])
+            if pending > max(len(batches[0][0]), self.batch_size):  # Reduced once the batches outgrow the candidates
+                batches, pending = [self._reduce_counts(keys=np.concatenate([keys for keys, _ in batches]),
+                                                        counts=np.concatenate([counts for _, counts in batches]))], 0
+        return self._reduce_counts(keys=np.concatenate([keys for keys, _ in batches]),
+                                   counts=np.concatenate([counts for _, counts in batches]))
+
+    def _count_encoded_triples(self, offsets, team_codes, team_names, frequent=None):
+        """ Counts for each team triple the number of players who played for its three teams, from CSR-style arrays of
+        integer team codes, with a count-min sketch pass selecting the candidate triples and an exact pass counting
+        them.
+
+        Args:
+            offsets (numpy.ndarray): Array of the offsets of the teams of each player in `team_codes`.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players.
+            team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+            frequent (numpy.ndarray): Boolean matrix flagging the frequent team pairs (indexed by team codes). If
+                provided, only the triples whose three team pairs are frequent are counted.
+
+        Returns:
+            CombinationCounts: Counts of the team triples whose player count is greater or equal to the value of the
+            `min_player_count` attribute (an empty list if there is none).
+        """
+        team_counts, n_teams = np.diff(offsets), len(team_names)
+        if not len(team_counts):
+            return list()
+
+        shards = [(team_counts[shard], team_codes[offsets[shard.start]:offsets[shard.stop]], n_teams, frequent)
+                  for shard in split_shards(weights=team_counts ** 3, shard_count=self.workers)]
+        sketch = sum(self._map_shards(func=self._sketch_shard, shards=shards))
+        total = int(sketch[0].sum())
+        logging.info('Sketched {total:d} triples with {depth:d}x{width:d} counters: player counts overestimated by at '
+                     'most {bound:.0f} with probability {probability:.2%}'
+                     .format(total=total, depth=self.depth, width=self.width, bound=self.error * total,
+                             probability=1 - self.delta))
+
+        partial_counts = self._map_shards(func=self._count_candidates_shard,
+                                          shards=[shard + (sketch,) for shard in shards])
+        keys, counts = self._reduce_counts(keys=np.concatenate([keys for keys, _ in partial_counts]),
+                                           counts=np.concatenate([counts for _, counts in partial_counts]))
+        logging.info('Counted {candidates:d} candidate triples'.format(candidates=len(keys)))
+        ddog.profiling.count(triples=total, candidates=len(keys))
+
+        selected = counts >= self.min_player_count
+        if not selected.any():
+            return list()
+        return CombinationCounts.from_triple_keys(keys=keys[selected], counts=counts[selected], team_names=team_names)
+
+
+class ComboCounter(TripleCounter):
+    """ Concrete implementation of `TripleCounter` which counts the team combinations of any size (team pairs, triples,
+    4-tuples...) with the level-wise Apriori frequent-itemset algorithm. Team IDs are dictionary-encoded as integers.
+    The candidate combinations of size j of a player are generated by joining the frequent combinations of size j - 1
+    of the player which share their j - 2 first teams, and are only counted if all their other subsets of size j - 1 are
+    frequent as well. The cost thus grows with the number of frequent combinations rather than with the number of raw
+    combinations.
+
+    Attributes:
+        size (int): Number of teams per combination.
+        min_player_count (int): Minimum player count a given team combination must have in order to be returned.
+        workers (int): Number of processes the combinations of each level are counted by.
+    """
+    def __init__(self, size, min_player_count, workers=1):
+        """ Initializes the `ComboCounter` object.
+
+        Args:
+            size (int): Cf. class docstring.
+            min_player_count (int): Cf. class docstring.
+            workers (int): Cf. class docstring.
+        """
+        super().__init__(min_player_count=min_player_count, workers=workers)
+        self.size = size
+
+    @staticmethod
+    def _count_level_shard(player_itemsets, frequent_itemsets):
+        """ Generates and counts the candidate combinations of the next level for the players of a shard.
+
+        Args:
+            player_itemsets (list[list[tuple]]): For each player, sorted list of the frequent combinations (sorted
+                tuples of team codes) of the current level the player played for.
+            frequent_itemsets (set): Set of all the frequent combinations of the current level.
+
+        Returns:
+            (dict, list[list[tuple]]): Dictionary mapping the candidate combinations of the next level to their player
+            count, and for each player the sorted list of its candidate combinations.
+        """
+        candidate_counts = dict()
+        player_candidates = list()
+        for itemsets in player_itemsets:
+            candidates = list()
+            for prefix, group in itertools.groupby(itemsets, key=lambda itemset: itemset[:-1]):
+                last_items = [itemset[-1] for itemset in group]
+                for first_last_item, second_last_item in itertools.combinations(last_items, r=2):
+                    candidate = prefix + (first_last_item, second_last_item)
+                    # The two subsets which do not contain the whole prefix are the joined itemsets themselves
+                    if all(candidate[:i] + candidate[i + 1:] in frequent_itemsets for i in range(len(prefix))):
+                        candidates.append(candidate)
+                        candidate_counts[candidate] = candidate_counts.get(candidate, 0) + 1
+            player_candidates.append(candidates)
+        return candidate_counts, player_candidates
+
+    def _count_combinations(self, offsets, team_codes, team_names):
+        """ Counts for each frequent team combination the number of players who played for all its teams.
+
+        Args:
+            offsets (numpy.ndarray): Array of the offsets of the teams of each player in `team_codes`.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players.
+            team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+
+        Returns:
+            list[(frozenset, int)]: List of (team combination, player count) where each player count is greater or
+            equal to the value of the `min_player_count` attribute.
+        """
+        team_counts, n_teams = np.diff(offsets), len(team_names)
+        if not len(team_counts):
+            return list()
+        player_codes = np.repeat(np.arange(len(team_counts)), team_counts)
+
+        # The two first levels are counted at once with vectorized operations
+        team_player_counts = np.bincount(team_codes, minlength=n_teams)
+        itemset_counts = {(code,): int(team_player_counts[code])
+                          for code in np.flatnonzero(team_player_counts >= self.min_player_count)}
+        if self.size == 1:
+            return [(frozenset(team_names[list(itemset)]), count) for itemset, count in itemset_counts.items()]
+
+        kept = team_player_counts[team_codes] >= self.min_player_count
+        team_codes, player_codes = team_codes[kept], player_codes[kept]
+        team_counts = np.bincount(player_codes, minlength=len(team_counts))
+        pair_counts = np.zeros(n_teams ** 2, dtype=np.int64)
+        for positions in iter_combinations(team_counts=team_counts, size=2):
+            pair_counts += np.bincount(team_codes[positions[:, 0]] * n_teams + team_codes[positions[:, 1]],
+                                       minlength=n_teams ** 2)
+
+        frequent_keys, frequent_players = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+        for positions in iter_combinations(team_counts=team_counts, size=2):
+            keys = team_codes[positions[:, 0]] * n_teams + team_codes[positions[:, 1]]
+            frequent = pair_counts[keys] >= self.min_player_count
+            frequent_keys.append(keys[frequent])
+            frequent_players.append(player_codes[positions[frequent, 0]])
+        keys, players = np.concatenate(frequent_keys), np.concatenate(frequent_players)
+        order = np.lexsort((keys, players))
+        keys, players = keys[order], players[order]
+        pairs = list(zip((keys // n_teams).tolist(), (keys % n_teams).tolist()))
+        bounds = np.searchsorted(players, np.arange(len(team_counts) + 1)).tolist()
+        player_itemsets = [pairs[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+        itemset_counts = {(int(key // n_teams), int(key % n_teams)): int(pair_counts[key])
+                          for key in np.flatnonzero(pair_counts >= self.min_player_count)}
+        logging.info('{frequent:d} frequent team combinations of size 2'.format(frequent=len(itemset_counts)))
+
+        for level in range(3, self.size + 1):
+            player_itemsets = [itemsets for itemsets in player_itemsets if len(itemsets) >= 2]
+            itemset_sizes = np.array([len(itemsets) for itemsets in player_itemsets], dtype=np.int64)
+            shards = [(player_itemsets[shard], set(itemset_counts))
+                      for shard in split_shards(weights=itemset_sizes ** 2, shard_count=self.workers)]
+
+            candidate_counts = collections.Counter()
+            player_candidates = list()
+            for partial_counts, partial_candidates in self._map_shards(func=self._count_level_shard, shards=shards):
+                candidate_counts.update(partial_counts)
+                player_candidates.extend(partial_candidates)
+
+            itemset_counts = {candidate: count for candidate, count in candidate_counts.items()
+                              if count >= self.min_player_count}
+            player_itemsets = [[candidate for candidate in candidates if candidate in itemset_counts]
+                               for candidates in player_candidates]
+            logging.info('{frequent:d} frequent team combinations of size {level:d} out of {candidates:d} candidates'
+                         .format(frequent=len(itemset_counts), level=level, candidates=len(candidate_counts)))
+
+        return [(frozenset(team_names[list(itemset)]), count) for itemset, count in itemset_counts.items()]
+
+    def count_encoded(self, offsets, team_codes, team_names):
+        """ List baseball team combinations of `size` teams with the required minimum number of players from CSR-style
+        arrays of integer team codes (Cf. `encode_player_teams`).
+
+        Args:
+            offsets (numpy.ndarray): Array of the offsets of the teams of each player in `team_codes`.
+            team_codes (numpy.ndarray): Array of the concatenated (sorted) team codes of the players.
+            team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+
+        Returns:
+            list[(frozenset, int)]: List of (team combination, player count) where each player count is greater or
+            equal to the value of the `min_player_count` attribute.
+        """
+        with ddog.profiling.stage(name='count'):
+            combination_counts = self._count_combinations(offsets=offsets, team_codes=team_codes, team_names=team_names)
+            ddog.profiling.count(combinations=len(combination_counts))
+        return combination_counts
+
+    def compute(self, df):
+        """ List baseball team combinations of `size` teams with the required minimum number of players based on the
+        data available in the input DataFrame `df`.
+
+        Args:
+            df (pandas.DataFrame): DataFrame that gathers the raw data of all input baseball statistics files.
+
+        Returns:
+            list[(frozenset, int)]: List of (team combination, player count) where each player count is greater or
+            equal to the value of the `min_player_count` attribute.
+        """
+        with ddog.profiling.stage(name='pre-aggregation'):
+            encoded_teams = encode_player_teams(df=df, min_team_count=self.size)
+            ddog.profiling.count(rows=len(df), players=len(encoded_teams[0]) - 1)
+        return self.count_encoded(*encoded_teams)
+
+
+class TripleCountState:
+    """ This class encapsulates the incremental computation of the team triple counts over a growing range of years.
+    The team set of each player only grows when years are added: the state keeps, for each player, the bitset of the
+    (dictionary-encoded) teams the player played for, together with the counts of all the team triples (whatever their
+    player count). Adding years then only requires to count, for the players whose team set changed, the triples which
+    contain at least one of their new teams. The state is persisted in a NumPy .npz file between runs.
+
+    Attributes:
+        path (str): Path of the state file on the local file system.
+        min_year (int): Year of the first file the counts cover (`None` if the state is empty).
+        max_year (int): Year of the last file the counts cover (`None` if the state is empty).
+        checksums (dict): Dictionary mapping the covered years to the SHA-256 checksum of their file when known.
+        team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+        player_ids (numpy.ndarray): Array of the player IDs, indexed by player code.
+        bitsets (numpy.ndarray): 2D array of shape (number of players, number of 64-bit words) of the team bitsets of
+        each player.
+        keys (numpy.ndarray): Sorted array of the packed keys of the counted team triples (Cf. `NumpyTripleCounter`).
+        counts (numpy.ndarray): Array of the player counts of the team triples.
+    """
+    def __init__(self, path):
+        """ Initializes the `TripleCountState` object. Reads the state file if it already exists.
+
+        Args:
+            path (str): Cf. class docstring.
+        """
+        self.path = path
+        self._reset()
+        self._read()
+
+    def _reset(self):
+        """ Empties the state.
+        """
+        self.min_year, self.max_year, self.checksums = None, None, dict()
+        self.team_names, self.player_ids = np.zeros(0, dtype=object), np.zeros(0, dtype=object)
+        self.bitsets = np.zeros((0, 0), dtype=np.uint64)
+        self.keys, self.counts = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    def _read(self):
+        """ Reads the state file, leaving the state empty if the file does not exist or cannot be decoded.
+        """
+        try:
+            with np.load(self.path, allow_pickle=False) as state:
+                years, checksum_years, checksums = state['years'], state['checksum-years'], state['checksums']
+                self.team_names = state['team-names'].astype(object)
+                self.player_ids = state['player-ids'].astype(object)
+                self.bitsets, self.keys, self.counts = state['bitsets'], state['keys'], state['counts']
+            self.min_year, self.max_year = int(years[0]), int(years[1])
+            self.checksums = {int(year): str(checksum) for year, checksum in zip(checksum_years, checksums)}
+        except FileNotFoundError:
+            pass
+        except (OSError, KeyError, ValueError, IndexError, zipfile.BadZipFile):
+            logging.warning('Ignoring corrupted triple count state file {path:}'.format(path=self.path))
+            self._reset()
+
+    def save(self):
+        """ Atomically (over)writes the state file.
+        """
+        if self.min_year is None:
+            return
+        checksum_years = sorted(self.checksums)
+        with ddog.source.open_atomic_file(path=self.path) as file_obj:
+            np.savez(file_obj, years=np.array([self.min_year, self.max_year], dtype=np.int64),
+                     **{'checksum-years': np.array(checksum_years, dtype=np.int64),
+                        'checksums': np.array([self.checksums[year] for year in checksum_years], dtype=str),
+                        'team-names': self.team_names.astype(str), 'player-ids': self.player_ids.astype(str),
+                        'bitsets': self.bitsets, 'keys': self.keys, 'counts': self.counts})
+        logging.info('Saved the counts of {triples:d} team triples over {min_year:d}-{max_year:d} to {path:}'
+                     .format(triples=len(self.keys), min_year=self.min_year, max_year=self.max_year, path=self.path))
+
+    def get_missing_ranges(self, min_year, max_year, checksums):
+        """ Lists the year ranges which must be added to the state for it to cover the requested year range. The state
+        is emptied if it covers years outside of the requested range (team sets cannot shrink) or if the file of a
+        covered year changed since it was counted.
+
+        Args:
+            min_year (int): Year of the first requested file.
+            max_year (int): Year of the last requested file.
+            checksums (dict): Dictionary mapping years to the SHA-256 checksum of their current file, `None` if its
+                content is unknown (Cf. `ddog.source.DownloadManifest.get_checksums`). The files of the years left out
+                (Ex: evicted) are considered unchanged.
+
+        Returns:
+            list[(int, int)]: List of (first year, last year) ranges to be added with the `update` method.
+        """
+        if self.min_year is None:
+            return [(min_year, max_year)]
+
+        changed_years = [year for year, checksum in self.checksums.items() if checksums.get(year, checksum) != checksum]
+        if min_year > self.min_year or max_year < self.max_year or changed_years:
+            logging.info('Triple count state covering {min_year:d}-{max_year:d} cannot be reused: counting from scratch'
+                         .format(min_year=self.min_year, max_year=self.max_year))
+            self._reset()
+            return [(min_year, max_year)]
+
+        ranges = list()
+        if min_year < self.min_year:
+            ranges.append((min_year, self.min_year - 1))
+        if max_year > self.max_year:
+            ranges.append((self.max_year + 1, max_year))
+        return ranges
+
+    def update(self, df, min_year, max_year, checksums):
+        """ Adds the records of a year range adjacent to the covered one to the state.
+
+        Args:
+            df (pandas.DataFrame): DataFrame that gathers the raw data of the baseball statistics files of the range.
+            min_year (int): Year of the first file of the range.
+            max_year (int): Year of the last file of the range.
+            checksums (dict): Dictionary mapping years to the SHA-256 checksum of their file (when known).
+        """
+        ddog.profiling.count(rows=len(df))
+        df = df.drop_duplicates()
+        team_codes, team_names = encode_values(values=np.asarray(build_team_ids(df=df), dtype=object),
+                                               names=self.team_names)
+        player_codes, player_ids = encode_values(values=np.asarray(df['player-id'].astype(str), dtype=object),
+                                                 names=self.player_ids)
+
+        # Grows the bitsets and re-packs the triple keys (the order of which is preserved) for the new number of teams
+        n_teams, old_n_teams = len(team_names), len(self.team_names)
+        old_bitsets = np.zeros((len(player_ids), (n_teams + 63) // 64), dtype=np.uint64)
+        old_bitsets[:self.bitsets.shape[0], :self.bitsets.shape[1]] = self.bitsets
+        bitsets = old_bitsets.copy()
+        np.bitwise_or.at(bitsets, (player_codes, team_codes // 64),
+                         np.left_shift(np.uint64(1), (team_codes % 64).astype(np.uint64)))
+        if old_n_teams:
+            keys = self.keys
+            self.keys = ((keys // old_n_teams ** 2 * n_teams) + keys // old_n_teams % old_n_teams) * n_teams \
+                + keys % old_n_teams
+
+        # Counts the triples of the players whose team set changed which contain at least one of their new teams
+        changed = np.flatnonzero((bitsets != old_bitsets).any(axis=1))
+        new_bits = np.unpackbits(bitsets[changed].astype('<u8').view(np.uint8), axis=1, bitorder='little')
+        old_bits = np.unpackbits(old_bitsets[changed].astype('<u8').view(np.uint8), axis=1, bitorder='little')
+        delta_keys, delta_counts = count_marked_triples(member_bits=new_bits, marked_bits=new_bits & ~old_bits,
+                                                        n_teams=n_teams)
+        self.keys, self.counts = merge_counts(keys=self.keys, counts=self.counts, delta_keys=delta_keys,
+                                              delta_counts=delta_counts)
+
+        self.team_names, self.player_ids, self.bitsets = team_names, player_ids, bitsets
+        self.min_year = min_year if self.min_year is None else min(self.min_year, min_year)
+        self.max_year = max_year if self.max_year is None else max(self.max_year, max_year)
+        self.checksums.update({year: checksums[year] for year in range(min_year, max_year + 1)
+                               if checksums.get(year) is not None})
+        logging.info('Added {min_year:d}-{max_year:d} to the triple count state: {players:d} players changed and '
+                     '{triples:d} triple counts updated'.format(min_year=min_year, max_year=max_year,
+                                                                 players=len(changed), triples=len(delta_keys)))
+
+    def get_triples(self, min_player_count):
+        """ Lists the team triples of the state with the required minimum number of players.
+
+        Args:
+            min_player_count (int): Minimum player count a given team triple must have in order to be returned.
+
+        Returns:
+            CombinationCounts: Counts of the team triples whose player count is greater or equal to
+            `min_player_count` (an empty list if there is none).
+        """
+        selected = self.counts >= min_player_count
+        if not selected.any():
+            return list()
+        return CombinationCounts.from_triple_keys(keys=self.keys[selected], counts=self.counts[selected],
+                                                  team_names=self.team_names)
+
+
+class PlayerTeamsAccumulator:
+    """ This class encapsulates the folding of baseball-statistics files, one at a time, into the set of teams each
+    player played for. Each player's team set is held as a bitset of (dictionary-encoded) teams, so that the memory
+    used by the accumulator is bounded by the number of distinct players and teams rather than by the number of
+    records: the records of a file can be discarded as soon as they were added.
+
+    Attributes:
+        team_names (numpy.ndarray): Array of the team IDs, indexed by team code.
+        player_ids (numpy.ndarray): Array of the player IDs, indexed by player code.
+        bitsets (numpy.ndarray): 2D array of shape (number of players, number of 64-bit words) of the team bitsets of
+        each player.
+    """
+    def __init__(self):
+        """ Initializes an empty `PlayerTeamsAccumulator` object.
+        """
+        self.team_names, self.player_ids = np.zeros(0, dtype=object), np.zeros(0, dtype=object)
+        self.bitsets = np.zeros((0, 0), dtype=np.uint64)
+
+    def add(self, encoded_columns):
+        """ Adds the records of a baseball-statistics file to the team sets of its players. Records with a missing team
+        or player ID are ignored.
+
+        Args:
+            encoded_columns (dict): Dictionary mapping the 'team', 'league' and 'player-id' columns to (codes,
+                categories) tuples, as returned by `ddog.source.read_encoded_file`.
+        """
+        (team_codes, teams), (league_codes, leagues), (player_codes, players) = \
+            encoded_columns['team'], encoded_columns['league'], encoded_columns['player-id']
+        valid = (team_codes >= 0) & (player_codes >= 0)
+        team_codes, league_codes, player_codes = team_codes[valid], league_codes[valid], player_codes[valid]
+        ddog.profiling.count(rows=len(team_codes))
+
+        # Team IDs are only built for the distinct (team, league) pairs of the file, not for each record
+        pairs, pair_codes = np.unique(team_codes.astype(np.int64) * (len(leagues) + 1) + league_codes + 1,
+                                      return_inverse=True)
+        pair_teams, pair_leagues = pairs // (len(leagues) + 1), pairs % (len(leagues) + 1) - 1
+        pair_names = np.array([team if league < 0 else '{}-{}'.format(team, leagues[league])
+                               for team, league in zip(teams[pair_teams], pair_leagues)], dtype=object)
+        pair_codes_map, self.team_names = encode_values(values=pair_names, names=self.team_names)
+        player_codes_map, self.player_ids = encode_values(values=np.asarray(players, dtype=object),
+                                                          names=self.player_ids)
+        team_codes, player_codes = pair_codes_map[pair_codes.ravel()], player_codes_map[player_codes]
+
+        shape = (len(self.player_ids), (len(self.team_names) + 63) // 64)
+        if shape != self.bitsets.shape:
+            bitsets = np.zeros(shape, dtype=np.uint64)
+            bitsets[:self.bitsets.shape[0], :self.bitsets.shape[1]] = self.bitsets
+            self.bitsets = bitsets
+        np.bitwise_or.at(self.bitsets, (player_codes, team_codes // 64),
+                         np.left_shift(np.uint64(1), (team_codes % 64).astype(np.uint64)))
+
+    def get_encoded_teams(self, min_team_count=3):
+        """ Lists for each player who played for at least `min_team_count` teams the teams the player played for, as
+        CSR-style arrays of integer team codes (Cf. `encode_player_teams`) read from the bitsets without building any
+        per-player Python object.
+
+        Args:
+            min_team_count (int): Minimum number of teams a player must have played for in order to be listed.
+
+        Returns:
+            (numpy.ndarray, numpy.ndarray, numpy.ndarray): Array of the offsets of the teams of each listed player in
+            the second array, array of the concatenated (sorted) team codes of the listed players and array of the team
+            IDs, indexed by team code.
+        """
+        bits = np.unpackbits(self.bitsets.astype('<u8').view(np.uint8), axis=1, bitorder='little')
+        team_counts = bits.sum(axis=1, dtype=np.int64)
+        _, team_codes = np.nonzero(bits[team_counts >= min_team_count])
+        team_counts = team_counts[team_counts >= min_team_count]
+        return np.concatenate([[0], np.cumsum(team_counts)]).astype(np.int64), team_codes.astype(np.int64), \
+            self.team_names
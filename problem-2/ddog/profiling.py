@@ -0,0 +1,234 @@
+"""
+This modules gathers all the classes and functions dedicated to the instrumentation of the application's stages (wall
+time, CPU time, peak memory and record counters) and to its profiling.
+"""
+import contextlib
+import json
+import logging
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Unix only: resident set sizes are then not measured (Ex: on Windows)
+    resource = None
+
+PROFILE_TOP_FUNCTIONS = 30
+PROFILE_TOP_ALLOCATIONS = 20
+
+
+def reset_peak_rss():
+    """ Resets the peak resident set size (RSS) of the current process to its current RSS, so that the peak RSS of the
+    next stage can be measured. Best effort, only supported on Linux: the peak RSS is left unchanged on other platforms
+    or if the reset is not permitted.
+    """
+    if not sys.platform.startswith('linux'):
+        return
+    try:
+        with open('/proc/self/clear_refs', 'w') as file_obj:
+            file_obj.write('5')
+    except OSError:
+        pass
+
+
+def get_max_rss(children=False):
+    """ Returns the maximum resident set size of the current process (or of its terminated children) since it started.
+
+    Args:
+        children (bool): Whether the maximum resident set size of the terminated children should be returned instead.
+
+    Returns:
+        int: Maximum resident set size in bytes, `None` if it cannot be measured on the platform.
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024  # Kilobytes except on macOS
+
+
+def get_peak_rss():
+    """ Returns the peak resident set size of the current process since it started or since the last call to
+    `reset_peak_rss`. Falls back to the peak memory traced by `tracemalloc` (if tracing) on platforms where resident
+    set sizes cannot be measured.
+
+    Returns:
+        int: Peak resident set size in bytes, `None` if it cannot be measured.
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/self/status') as file_obj:
+                for line in file_obj:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    max_rss = get_max_rss()
+    if max_rss is None and tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[1]
+    return max_rss
+
+
+class StageRecorder:
+    """ This class records the wall time, CPU time, peak resident set size and counters (Ex: rows, triples) of the
+    stages of a run. Stages can be nested, the name of a nested stage being prefixed by the names of its enclosing
+    stages (Ex: "load/download"). The peak memory of a stage includes the one of its nested stages. When memory
+    allocations are traced (Cf. `profile`), the snapshot of the traced allocations at the end of the stage holding the
+    most memory is kept.
+
+    Attributes:
+        stages (list[dict]): Records of the stages, in the order in which they were entered.
+        snapshot (tracemalloc.Snapshot): Snapshot of the traced allocations holding the most memory, `None` if memory
+            allocations were not traced.
+    """
+    def __init__(self):
+        """ Initializes the `StageRecorder` object.
+        """
+        self.stages = list()
+        self.snapshot = None
+        self._snapshot_size = 0
+        self._open_stages = list()
+
+    def _update_peak_rss(self, peak_rss):
+        """ Folds a peak resident set size measured before a reset into the records of the stages still running.
+
+        Args:
+            peak_rss (int): Peak resident set size in bytes, `None` if it could not be measured.
+        """
+        if peak_rss is None:
+            return
+        for record in self._open_stages:
+            record['peak_rss'] = peak_rss if record['peak_rss'] is None else max(record['peak_rss'], peak_rss)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """ Context manager recording a stage of the run.
+
+        Args:
+            name (str): Name of the stage.
+
+        Yields:
+            dict: Record of the stage, completed on exit with its 'wall_time' and 'cpu_time' (in seconds) and
+            'peak_rss' (in bytes, `None` if it cannot be measured on the platform).
+        """
+        self._update_peak_rss(peak_rss=get_peak_rss())
+        if self._open_stages:
+            name = '{}/{}'.format(self._open_stages[-1]['stage'], name)
+        record = {'stage': name, 'wall_time': 0.0, 'cpu_time': 0.0, 'peak_rss': None}
+        self.stages.append(record)
+        self._open_stages.append(record)
+
+        reset_peak_rss()
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_time'] = time.perf_counter() - start
+            record['cpu_time'] = time.process_time() - cpu_start
+            self._update_peak_rss(peak_rss=get_peak_rss())
+            self._open_stages.pop()
+            if tracemalloc.is_tracing() and tracemalloc.get_traced_memory()[0] > self._snapshot_size:
+                self._snapshot_size = tracemalloc.get_traced_memory()[0]
+                self.snapshot = tracemalloc.take_snapshot()
+            logging.debug('Stage {name:} completed in {elapsed:.2f}s'.format(name=name, elapsed=record['wall_time']))
+
+    def count(self, **counters):
+        """ Adds counters (Ex: `rows=1000`) to the record of the innermost running stage. Counters are ignored if no
+        stage is running.
+
+        Args:
+            **counters (int): Values to be added to the counters of the stage, by counter name.
+        """
+        if self._open_stages:
+            record = self._open_stages[-1]
+            for counter, value in counters.items():
+                record[counter] = record.get(counter, 0) + int(value)
+
+    def get_summary(self):
+        """ Returns the summary of the run.
+
+        Returns:
+            dict: Dictionary holding the records of the stages and the maximum resident set size (in bytes) of the
+            process and of its terminated children (`None` if they cannot be measured on the platform).
+        """
+        peak_rss = [value for value in [get_max_rss()] + [record['peak_rss'] for record in self.stages]
+                    if value is not None]
+        return {'stages': [dict(record) for record in self.stages],
+                'peak_rss': max(peak_rss) if peak_rss else None,
+                'children_peak_rss': get_max_rss(children=True)}
+
+
+RECORDER = StageRecorder()
+
+
+def stage(name):
+    """ Context manager recording a stage of the run with the module's recorder (Cf. `StageRecorder.stage`).
+
+    Args:
+        name (str): Name of the stage.
+
+    Returns:
+        contextlib.AbstractContextManager: Context manager yielding the record of the stage.
+    """
+    return RECORDER.stage(name=name)
+
+
+def count(**counters):
+    """ Adds counters to the innermost running stage of the module's recorder (Cf. `StageRecorder.count`).
+
+    Args:
+        **counters (int): Values to be added to the counters of the stage, by counter name.
+    """
+    RECORDER.count(**counters)
+
+
+def write_summary(path=None):
+    """ Logs the summary of the run recorded by the module's recorder as a single JSON line and optionally writes it
+    to a JSON file.
+
+    Args:
+        path (str): Path of the JSON file, `None` meaning the summary is only logged.
+    """
+    summary = RECORDER.get_summary()
+    logging.info('Run summary: {}'.format(json.dumps(summary)))
+    if path is not None:
+        with open(path, 'w') as file_obj:
+            json.dump(summary, file_obj, indent=1)
+
+
+@contextlib.contextmanager
+def profile(path=None):
+    """ Context manager profiling the wrapped code with `cProfile` and tracing its memory allocations with
+    `tracemalloc`. On exit, the profile is written to `path` (to be read with `pstats`) and a report of the functions
+    with the highest cumulative times, of the peak traced memory and of the allocation sites of the stage holding the
+    most memory is written to `path` + '.txt'. Tracing memory allocations slows the run down significantly.
+
+    Args:
+        path (str): Path of the profile file, `None` meaning the wrapped code is not profiled.
+    """
+    if path is None:
+        yield
+        return
+
+    import cProfile  # Only needed when profiling: keeps importing the module (Ex: by the CLI) cheap
+    import pstats
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profiler.dump_stats(path)
+        with open(path + '.txt', 'w') as file_obj:
+            file_obj.write('Peak traced memory: {:d} bytes\n\n'.format(traced_peak))
+            pstats.Stats(profiler, stream=file_obj).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+            if RECORDER.snapshot is not None:
+                file_obj.write('Top allocation sites at the end of the stage holding the most memory:\n')
+                for statistic in RECORDER.snapshot.statistics('lineno')[:PROFILE_TOP_ALLOCATIONS]:
+                    file_obj.write('{}\n'.format(statistic))
+        logging.info('Profile written to {path:} and {path:}.txt'.format(path=path))
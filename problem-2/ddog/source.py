@@ -2,16 +2,154 @@
 This modules gathers all the classes and functions dedicated to the downloading and reading of baseball-statistics
 files.
 """
+import concurrent.futures
+import contextlib
 import functools
+import gzip
+import hashlib
+import http
+import http.client
+import json
 import logging
 import os
 import re
 import shutil
-import urllib
+import tempfile
+import threading
+import time
+import urllib.parse
+import zipfile
+import zlib
 
+import numpy as np
 import pandas as pd
 
 import ddog.constants as csts
+import ddog.profiling
+
+COLUMN_NAMES = ['team', 'league', 'player-id']
+CODEC_EXTENSIONS = {csts.GZIP_CODEC_NAME: '.gz', csts.ZSTD_CODEC_NAME: '.zst'}
+GZIP_COMPRESS_LEVEL = 6
+
+
+def split_codec_extension(file_name):
+    """ Splits the extension of the codec a stored baseball-statistics file is compressed with (Cf. `CODEC_EXTENSIONS`)
+    off its name.
+
+    Args:
+        file_name (str): Name (or path) of the file.
+
+    Returns:
+        (str, str): Name of the file without the extension of its codec and name of its codec (`csts.NO_CODEC_NAME`
+        if the file is not compressed).
+    """
+    for codec, extension in CODEC_EXTENSIONS.items():
+        if file_name.endswith(extension):
+            return file_name[:-len(extension)], codec
+    return file_name, csts.NO_CODEC_NAME
+
+
+def import_zstandard():
+    """ Imports the optional `zstandard` package.
+
+    Returns:
+        module: The `zstandard` module.
+
+    Raises:
+        ImportError: If the `zstandard` package is not installed.
+    """
+    try:
+        import zstandard
+    except ImportError as error:
+        raise ImportError('Storing files compressed with zstd requires the zstandard package') from error
+    return zstandard
+
+
+@contextlib.contextmanager
+def open_compressed_writer(file_obj, codec):
+    """ Context manager wrapping a binary file object into a writer compressing the data written to it on the fly.
+    The file object is left open on exit.
+
+    Args:
+        file_obj (io.BufferedIOBase): Binary file object the compressed data is written to.
+        codec (str): Name of the codec, either `csts.NO_CODEC_NAME`, `csts.GZIP_CODEC_NAME` or `csts.ZSTD_CODEC_NAME`.
+
+    Yields:
+        io.BufferedIOBase: Binary file object the uncompressed data should be written to.
+    """
+    if codec == csts.GZIP_CODEC_NAME:
+        with gzip.GzipFile(fileobj=file_obj, mode='wb', compresslevel=GZIP_COMPRESS_LEVEL, mtime=0) as writer:
+            yield writer
+    elif codec == csts.ZSTD_CODEC_NAME:
+        with import_zstandard().ZstdCompressor().stream_writer(file_obj, closefd=False) as writer:
+            yield writer
+    else:
+        yield file_obj
+
+
+@contextlib.contextmanager
+def open_atomic_file(path, mode='wb'):
+    """ Context manager opening a hidden temporary file next to `path`, which atomically replaces `path` on exit, so
+    that readers (possibly other processes) never see a partially written file. The temporary file is removed if an
+    exception is raised.
+
+    Args:
+        path (str): Path of the file to be (over)written on the local file system.
+        mode (str): Mode the temporary file is opened with ('wb' or 'w').
+
+    Yields:
+        io.IOBase: File object the content of the file should be written to.
+    """
+    descriptor, part_path = tempfile.mkstemp(prefix='.', suffix='.part', dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(descriptor, mode) as file_obj:
+            yield file_obj
+        os.replace(part_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(part_path)
+        raise
+
+
+def get_content_checksum(file_name, chunk_size=1 << 20):
+    """ Computes the SHA-256 checksum of the (uncompressed) content of a stored baseball-statistics file.
+
+    Args:
+        file_name (str): Path of the file on the local file system.
+        chunk_size (int): Size (in bytes) of the chunks the file is read by.
+
+    Returns:
+        str: SHA-256 hexadecimal checksum of the content of the file, `None` if the file cannot be read or decompressed.
+    """
+    errors = (OSError, EOFError, zlib.error)
+    if split_codec_extension(file_name=file_name)[1] == csts.ZSTD_CODEC_NAME:
+        errors += (import_zstandard().ZstdError,)
+    digest = hashlib.sha256()
+    try:
+        with open_stored_file(file_name=file_name) as file_obj:
+            for chunk in iter(functools.partial(file_obj.read, chunk_size), b''):
+                digest.update(chunk)
+    except errors:
+        return None
+    return digest.hexdigest()
+
+
+def open_stored_file(file_name):
+    """ Opens a stored baseball-statistics file for reading, decompressing it on the fly according to the extension of
+    its codec (Cf. `split_codec_extension`).
+
+    Args:
+        file_name (str): Path of the file on the local file system.
+
+    Returns:
+        io.BufferedIOBase: Binary file object of the uncompressed content of the file.
+    """
+    codec = split_codec_extension(file_name=file_name)[1]
+    if codec == csts.GZIP_CODEC_NAME:
+        return gzip.open(file_name, 'rb')
+    elif codec == csts.ZSTD_CODEC_NAME:
+        return import_zstandard().open(file_name, 'rb')
+    return open(file_name, 'rb')
 
 
 class TempDir:
@@ -59,25 +197,410 @@ class TempDir:
             logging.info('Removed temporary directory: {path:}'.format(path=self.path))
 
 
+class DownloadManifest:
+    """ Thread-safe JSON manifest stored in the temporary directory which records, for each successfully downloaded
+    baseball-statistics file, its name, size (in bytes), modification time and SHA-256 checksum (of its uncompressed
+    content). A file with no or a mismatching manifest entry cannot be trusted, typically because the run that
+    downloaded it was interrupted or because it was modified since. Each entry also records the
+    HTTP validators (ETag and Last-Modified headers) used to revalidate the file with conditional requests, and the last
+    time the file was used, which drives the least-recently-used eviction of files.
+
+    Attributes:
+        path (str): Path of the manifest file on the local file system.
+        entries (dict): Dictionary mapping years (as strings) to their file entry (dictionary).
+    """
+    def __init__(self, path):
+        """ Initializes the `DownloadManifest` object. Reads the manifest file if it already exists.
+
+        Args:
+            path (str): Cf. class docstring.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = self._read()
+
+    def _read(self):
+        """ Reads the manifest file.
+
+        Returns:
+            dict: The manifest entries, empty if the file does not exist or cannot be decoded.
+        """
+        try:
+            with open(self.path, 'r') as file_obj:
+                return json.load(file_obj)
+        except FileNotFoundError:
+            return dict()
+        except ValueError:
+            logging.warning('Ignoring corrupted manifest file {path:}'.format(path=self.path))
+            return dict()
+
+    def _save(self):
+        """ Atomically (over)writes the manifest file with the current entries. Must be called holding the lock.
+        """
+        with open_atomic_file(path=self.path, mode='w') as file_obj:
+            json.dump(self.entries, file_obj, indent=1, sort_keys=True)
+
+    def get(self, year):
+        """ Returns the manifest entry of year `year`.
+
+        Args:
+            year (int): Year of the baseball-statistics file.
+
+        Returns:
+            dict: The entry of the file of year `year`, `None` if there is none.
+        """
+        return self.entries.get(str(year))
+
+    def _get_file_path(self, entry):
+        """ Returns the path of the file of a manifest entry, stored next to the manifest file.
+
+        Args:
+            entry (dict): Manifest entry.
+
+        Returns:
+            str: Path of the file on the local file system.
+        """
+        return os.path.join(os.path.dirname(self.path), entry['file_name'])
+
+    def get_checksums(self, valid_only=False):
+        """ Returns the SHA-256 checksum of the file of each year of the manifest.
+
+        Args:
+            valid_only (bool): Whether only the checksums of the files matching their manifest entry (Cf. `is_valid`)
+                should be returned, so that the checksums can be trusted to identify the content of the files. The
+                checksum of a file which does not match its entry is then `None` (its content being unknown), and the
+                years whose file is missing (Ex: evicted) are left out.
+
+        Returns:
+            dict: Dictionary mapping years (as integers) to the checksum of their file.
+        """
+        with self._lock:
+            entries = {int(year): dict(entry) for year, entry in self.entries.items()}
+        if not valid_only:
+            return {year: entry.get('sha256') for year, entry in entries.items()}
+        return {year: entry.get('sha256') if self.is_valid(year=year, path=self._get_file_path(entry=entry)) else None
+                for year, entry in entries.items() if os.path.exists(self._get_file_path(entry=entry))}
+
+    def record(self, year, **fields):
+        """ Records (or replaces) the manifest entry of year `year`, marks it as just used and saves the manifest file.
+        The modification time of the file is recorded as well if it exists.
+
+        Args:
+            year (int): Year of the baseball-statistics file.
+            **fields: Fields of the entry ("file_name", "size", "sha256", "codec", "etag", "last_modified").
+        """
+        entry = dict(fields, last_used=time.time())
+        with contextlib.suppress(OSError, KeyError):
+            entry['mtime_ns'] = os.stat(self._get_file_path(entry=entry)).st_mtime_ns
+        with self._lock:
+            self.entries[str(year)] = entry
+            self._save()
+
+    def touch(self, years):
+        """ Marks the manifest entries of years `years` as just used and saves the manifest file.
+
+        Args:
+            years (Iterable[int]): Years of the baseball-statistics files.
+        """
+        with self._lock:
+            now = time.time()
+            for year in years:
+                if str(year) in self.entries:
+                    self.entries[str(year)]['last_used'] = now
+            self._save()
+
+    def remove(self, year):
+        """ Removes the manifest entry of year `year` and saves the manifest file.
+
+        Args:
+            year (int): Year of the baseball-statistics file.
+        """
+        with self._lock:
+            self.entries.pop(str(year), None)
+            self._save()
+
+    def is_valid(self, year, path):
+        """ Whether the file at `path` matches the manifest entry of year `year`. The file size is compared first and,
+        if the modification time of the file differs from the recorded one, the checksum of its content is verified as
+        well (the new modification time being recorded if it matches), so that the check remains cheap for files left
+        untouched since they were recorded.
+
+        Args:
+            year (int): Year of the baseball-statistics file.
+            path (str): Path of the baseball-statistics file on the local file system.
+
+        Returns:
+            bool: `True` if the file has a manifest entry matching its size and checksum.
+        """
+        entry = self.get(year=year)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if entry is None or stat.st_size != entry['size']:
+            return False
+        if stat.st_mtime_ns == entry.get('mtime_ns'):
+            return True
+        if not entry.get('sha256') or get_content_checksum(file_name=path) != entry['sha256']:
+            logging.warning('File for year {year:} at {path:} does not match its manifest checksum'
+                            .format(year=year, path=path))
+            return False
+        with self._lock:
+            if str(year) in self.entries:
+                self.entries[str(year)]['mtime_ns'] = stat.st_mtime_ns
+                self._save()
+        return True
+
+
+class HttpSession:
+    """ Thread-safe HTTP client that keeps one persistent (keep-alive) connection per thread and per host, so that
+    successive requests sent to the same host by the same thread reuse the same TCP (and TLS) connection.
+
+    Attributes:
+        timeout (float): Timeout (in seconds) of the blocking operations of each connection.
+    """
+    def __init__(self, timeout):
+        """ Initializes the `HttpSession` object.
+
+        Args:
+            timeout (float): Cf. class docstring.
+        """
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = list()
+
+    def _get_connection(self, scheme, host):
+        """ Returns the connection of the calling thread to `host`, opening it first if needed.
+
+        Args:
+            scheme (str): URL scheme. Either "http" or "https".
+            host (str): Host (and optional port) to connect to.
+
+        Returns:
+            http.client.HTTPConnection: Persistent connection to `host`.
+        """
+        connections = self._local.__dict__.setdefault('connections', dict())
+        if (scheme, host) not in connections:
+            connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            connection = connection_class(host, timeout=self.timeout)
+            connections[(scheme, host)] = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connections[(scheme, host)]
+
+    def _drop_connection(self, scheme, host):
+        """ Closes and forgets the connection of the calling thread to `host` so that the next request opens a new one.
+
+        Args:
+            scheme (str): URL scheme. Either "http" or "https".
+            host (str): Host (and optional port) of the connection.
+        """
+        connection = self._local.__dict__.get('connections', dict()).pop((scheme, host), None)
+        if connection is not None:
+            connection.close()
+
+    @contextlib.contextmanager
+    def get(self, url, headers=None):
+        """ Sends a GET request to `url` and yields the response. The response body must be consumed within the context
+        for the underlying connection to be reusable. The connection is dropped if anything goes wrong.
+
+        Args:
+            url (str): HTTP(S) URL to request.
+            headers (dict): Additional request headers.
+
+        Yields:
+            http.client.HTTPResponse: Response to the request.
+        """
+        split_url = urllib.parse.urlsplit(url)
+        path = urllib.parse.urlunsplit(('', '', split_url.path or '/', split_url.query, ''))
+        connection = self._get_connection(scheme=split_url.scheme, host=split_url.netloc)
+        try:
+            connection.request('GET', path, headers=headers or dict())
+            response = connection.getresponse()
+            yield response
+            response.read()  # Drains whatever was left unread so the connection can be reused
+        except BaseException:
+            self._drop_connection(scheme=split_url.scheme, host=split_url.netloc)
+            raise
+
+    def close(self):
+        """ Closes every connection opened by the session, whatever the thread which opened it.
+        """
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = list()
+
+
 class BaseballFilesDownloader:
     """ This class encapsulates all the logic dedicated to the downloading of yearly baseball-statistics files to the
-    local file system.
+    local file system. Files are downloaded concurrently by a pool of threads, each of them reusing its own persistent
+    HTTP connection. Requests failing with a transient error are retried with an exponential backoff. Each response is
+    streamed by chunks to a temporary file which is checked against the response's Content-Length header and atomically
+    renamed once complete, so that no truncated file can ever be found under its final name. Files already recorded in
+    the manifest are requested conditionally and kept as is if the source answers they have not been modified. Files
+    can be stored compressed (the extension of their codec being appended to their name), the chunks being compressed
+    as they are streamed.
 
     Attributes:
         tmp_dir_path (str): Directory on the local file system when the downloaded files should be stored.
         formatted_tmp_file_name (str): Formatted string used to generate the local names of the downloaded files.
+        codec (str): Name of the codec the downloaded files are stored with, either `csts.NO_CODEC_NAME`,
+        `csts.GZIP_CODEC_NAME` or `csts.ZSTD_CODEC_NAME` (requires the optional `zstandard` package).
         formatted_url (str): Formatted HTTP URL used to download the required files.
+        workers (int): Number of files downloaded concurrently.
+        max_retries (int): Maximum number of times a request failing with a transient error is retried.
+        backoff_factor (float): Delay (in seconds) before the first retry. The delay doubles at each new retry.
+        timeout (float): Timeout (in seconds) of the blocking network operations.
+        chunk_size (int): Size (in bytes) of the chunks the responses are streamed to the local file system by.
+        manifest (DownloadManifest): Manifest into which the downloaded files are recorded.
     """
-    def __init__(self, tmp_dir_path, config):
+    def __init__(self, tmp_dir_path, config, workers=None, manifest=None):
         """ Initializes the `BaseballFilesDownloader` object.
 
         Args:
             tmp_dir_path (str): Cf. class docstring.
             config (configparser.ConfigParser): Configuration object.
+            workers (int): Cf. class docstring. Read from the configuration object if `None`.
+            manifest (DownloadManifest): Cf. class docstring. Read from `tmp_dir_path` if `None`.
+
+        Raises:
+            ValueError: If the configured codec is not supported.
+            ImportError: If the configured codec is zstd and the `zstandard` package is not installed.
         """
+        conf_section = config[csts.DEFAULT_CONF_SECTION]
         self.tmp_dir_path = tmp_dir_path
-        self.formatted_tmp_file_name = config[csts.DEFAULT_CONF_SECTION][csts.CONF_TMP_FILE_FMT_NAME]
-        self.formatted_url = config[csts.DEFAULT_CONF_SECTION][csts.CONF_FMT_SOURCE_URL]
+        self.formatted_tmp_file_name = conf_section[csts.CONF_TMP_FILE_FMT_NAME]
+        self.codec = conf_section[csts.CONF_STORAGE_CODEC]
+        if self.codec != csts.NO_CODEC_NAME and self.codec not in CODEC_EXTENSIONS:
+            raise ValueError('Unsupported storage codec "{}". Supported codecs: {}'
+                             .format(self.codec, ', '.join([csts.NO_CODEC_NAME] + sorted(CODEC_EXTENSIONS))))
+        if self.codec == csts.ZSTD_CODEC_NAME:
+            import_zstandard()  # Fails before sending any request rather than once the first file is received
+        self.formatted_url = conf_section[csts.CONF_FMT_SOURCE_URL]
+        self.workers = workers or int(conf_section[csts.CONF_DOWNLOAD_WORKERS])
+        self.max_retries = int(conf_section[csts.CONF_DOWNLOAD_MAX_RETRIES])
+        self.backoff_factor = float(conf_section[csts.CONF_DOWNLOAD_BACKOFF_FACTOR])
+        self.timeout = float(conf_section[csts.CONF_DOWNLOAD_TIMEOUT])
+        self.chunk_size = int(conf_section[csts.CONF_DOWNLOAD_CHUNK_SIZE])
+        self.manifest = manifest or DownloadManifest(path=os.path.join(tmp_dir_path,
+                                                                       conf_section[csts.CONF_MANIFEST_FILE_NAME]))
+
+    def _write_response(self, response, file_name):
+        """ Streams the body of `response` by chunks (compressed with the `codec` attribute) to a temporary file then
+        renames it `file_name`.
+
+        Args:
+            response (http.client.HTTPResponse): Response the body of which has not been read yet.
+            file_name (str): Final path of the file on the local file system.
+
+        Returns:
+            (int, str): Size (in bytes) of the written file and SHA-256 hexadecimal checksum of the (uncompressed) body,
+            which identifies the content of the file whatever its codec.
+
+        Raises:
+            http.client.IncompleteRead: If the size of the body does not match the response's Content-Length header.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open_atomic_file(path=file_name) as file_obj:
+            with open_compressed_writer(file_obj=file_obj, codec=self.codec) as writer:
+                for chunk in iter(functools.partial(response.read, self.chunk_size), b''):
+                    writer.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            content_length = response.getheader('Content-Length')
+            if content_length is not None and int(content_length) != size:
+                raise http.client.IncompleteRead(partial=b'', expected=int(content_length) - size)
+            stored_size = file_obj.tell()
+        return stored_size, digest.hexdigest()
+
+    def _download_year(self, session, year):
+        """ Downloads the baseball-statistics file of year `year` to the local file system, retrying on transient
+        errors (network errors and `csts.RETRIABLE_HTTP_CODES` HTTP codes). If a valid copy of the file is already
+        recorded in the manifest (whatever its codec), the request is made conditional on the recorded validators. A
+        copy replaced by the downloaded file is removed.
+
+        Args:
+            session (HttpSession): HTTP session used to send the requests.
+            year (int): Year for which the baseball-statistics file will be downloaded.
+
+        Returns:
+            str: Path of the downloaded file, `None` if the download failed.
+        """
+        file_name = os.path.join(self.tmp_dir_path,
+                                 self.formatted_tmp_file_name.format(year=year) + CODEC_EXTENSIONS.get(self.codec, ''))
+        url = self.formatted_url.format(year=year)
+        headers = dict()
+        entry = self.manifest.get(year=year)
+        stored_file_name = os.path.join(self.tmp_dir_path, entry['file_name']) if entry else file_name
+        if self.manifest.is_valid(year=year, path=stored_file_name):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff_factor * 2 ** (attempt - 1))
+            try:
+                with session.get(url=url, headers=headers) as response:
+                    if response.status == http.HTTPStatus.NOT_MODIFIED and headers:
+                        self.manifest.touch(years=[year])
+                        logging.info('File for year {year:} at {path:} is up to date ({elapsed:.2f}s)'
+                                     .format(year=year, path=stored_file_name, elapsed=time.perf_counter() - start))
+                        return stored_file_name
+                    if response.status == http.HTTPStatus.OK:
+                        size, sha256 = self._write_response(response=response, file_name=file_name)
+                        self.manifest.record(year=year, file_name=os.path.basename(file_name), size=size,
+                                             sha256=sha256, codec=self.codec, etag=response.getheader('ETag'),
+                                             last_modified=response.getheader('Last-Modified'))
+                        if stored_file_name != file_name:
+                            with contextlib.suppress(FileNotFoundError):
+                                os.remove(stored_file_name)
+                        logging.info('Successfully downloaded file for year {year:} at {path:} ({size:d} bytes in '
+                                     '{elapsed:.2f}s)'.format(year=year, path=file_name, size=size,
+                                                              elapsed=time.perf_counter() - start))
+                        return file_name
+                    error = 'Code: {code:} - {msg:}'.format(code=response.status, msg=response.reason)
+                    if response.status not in csts.RETRIABLE_HTTP_CODES:
+                        logging.warning('Requesting URL "{url:}" failed returning the following HTTP error: '
+                                        '{error:}'.format(url=url, error=error))
+                        return None
+            except (OSError, http.client.HTTPException) as exc:
+                error = repr(exc)
+            logging.warning('Attempt {attempt:d}/{attempts:d} at requesting URL "{url:}" failed: {error:}'
+                            .format(attempt=attempt + 1, attempts=self.max_retries + 1, url=url, error=error))
+        logging.warning('Giving up downloading file for year {year:}'.format(year=year))
+        return None
+
+    def iter_download(self, years):
+        """ Downloads a single baseball-statistics file using an HTTP URL to the local file system for each requested
+        year in `years`, generating the years as soon as the download of their file completes.
+
+        Args:
+            years (list[int]): List of years for which baseball-statistics files will be downloaded.
+
+        Yields:
+            int: Year of the downloaded file, in the order in which downloads complete.
+        """
+        years = sorted(years)
+        session = HttpSession(timeout=self.timeout)
+        start = time.perf_counter()
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(self._download_year, session, year): year for year in years}
+                for done, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+                    if future.result() is not None:
+                        entry = self.manifest.get(year=futures[future])
+                        ddog.profiling.count(files=1, bytes=entry['size'] if entry else 0)
+                    logging.debug('Download progress: {done:d}/{total:d} files'.format(done=done, total=len(years)))
+                    yield futures[future]
+        finally:
+            session.close()
+        logging.info('Processed {total:d} downloads in {elapsed:.2f}s using {workers:d} workers'
+                     .format(total=len(years), elapsed=time.perf_counter() - start, workers=self.workers))
 
     def download(self, years):
         """ Downloads a single baseball-statistics file using an HTTP URL to the local file system for each requested
@@ -86,26 +609,96 @@ class BaseballFilesDownloader:
         Args:
             years (list[int]): List of years for which baseball-statistics files will be downloaded.
         """
-        for year in years:
-            local_file_name = self.formatted_tmp_file_name.format(year=year)
-            url = self.formatted_url.format(year=year)
-            try:
-                with urllib.request.urlopen(url=url) as response:
-                    file_name = os.path.join(self.tmp_dir_path, local_file_name)
-                    with open(file_name, 'wb') as file_obj:
-                        file_obj.write(response.read())
-                logging.info('Successfully downloaded file for year {year:} at {path:}'
-                             .format(year=year, path=file_name))
-
-            except urllib.error.HTTPError as error:
-                logging.warning('Requesting URL "{url:}" failed returning the following HTTP error: '
-                                'Code: {code:} - {msg:}'.format(url=url, code=error.code, msg=error.msg))
-                continue
+        with ddog.profiling.stage(name='download'):
+            for _ in self.iter_download(years=years):
+                pass
+
+
+def read_baseball_file(file_name):
+    """ Reads the 'team', 'league' and 'player-id' columns of a baseball-statistics CSV file.
+
+    Args:
+        file_name (str): Path of the baseball-statistics file on the local file system.
+
+    Returns:
+        pandas.DataFrame: DataFrame with 'team', 'league' and 'player-id' columns.
+    """
+    with open_stored_file(file_name=file_name) as file_obj:
+        return pd.read_csv(file_obj, header=None, usecols=[1, 2, 3], names=COLUMN_NAMES)
+
+
+def read_encoded_file(file_name, cache_file_name):
+    """ Reads the dictionary-encoded 'team', 'league' and 'player-id' columns of a baseball-statistics CSV file. The
+    encoded columns are read from the parsed cache file `cache_file_name` if it is up to date with the CSV file (same
+    size and modification time). Otherwise, the CSV file is parsed and the parsed cache file (re)written.
+
+    Args:
+        file_name (str): Path of the baseball-statistics CSV file on the local file system.
+        cache_file_name (str): Path of the associated parsed cache (NumPy .npz) file on the local file system.
+
+    Returns:
+        dict: Dictionary mapping each column name to a (codes, categories) tuple of `numpy.ndarray` objects, missing
+        values being encoded as -1.
+    """
+    stat = os.stat(file_name)
+    signature = np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+    try:
+        with np.load(cache_file_name, allow_pickle=False) as cache:
+            if np.array_equal(cache['signature'], signature):
+                return {column: (cache[column + '-codes'], cache[column + '-categories']) for column in COLUMN_NAMES}
+    except FileNotFoundError:
+        pass
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        logging.warning('Ignoring corrupted parsed cache file {path:}'.format(path=cache_file_name))
+
+    df = read_baseball_file(file_name=file_name)
+    encoded_columns = dict()
+    for column in COLUMN_NAMES:
+        codes, categories = pd.factorize(df[column])
+        encoded_columns[column] = (codes.astype(np.int32), np.asarray(categories, dtype=str))
+
+    arrays = {'{}-{}'.format(column, suffix): array for column, encoded_column in encoded_columns.items()
+              for suffix, array in zip(('codes', 'categories'), encoded_column)}
+    with open_atomic_file(path=cache_file_name) as file_obj:
+        np.savez(file_obj, signature=signature, **arrays)
+    return encoded_columns
+
+
+def concat_encoded_files(encoded_files, years=None):
+    """ Concatenates dictionary-encoded columns into a single `pandas.DataFrame` with categorical columns. The
+    dictionaries (categories) of each file are merged and the codes remapped to the merged dictionary in a vectorized
+    fashion, so that no string is ever materialized per row.
+
+    Args:
+        encoded_files (list[dict]): List of dictionaries as returned by `read_encoded_file`.
+        years (list[int]): Year of each file. If provided, a 'year' column is added.
+
+    Returns:
+        pandas.DataFrame: DataFrame with categorical 'team', 'league' and 'player-id' columns (and an integer 'year'
+        column if `years` is provided).
+    """
+    data = dict()
+    for column in COLUMN_NAMES:
+        categories = [encoded_file[column][1] for encoded_file in encoded_files]
+        offsets = np.cumsum([0] + [len(file_categories) for file_categories in categories[:-1]])
+        inverse, merged_categories = pd.factorize(np.concatenate(categories))
+        lookup = np.append(inverse, -1)  # Missing values (code -1) are mapped to the last, sentinel, position
+        codes = np.concatenate([lookup[np.where(encoded_file[column][0] >= 0, encoded_file[column][0] + offset,
+                                                len(inverse))]
+                                for encoded_file, offset in zip(encoded_files, offsets)])
+        data[column] = pd.Categorical.from_codes(codes, categories=merged_categories)
+    if years is not None:
+        data['year'] = np.repeat(np.asarray(years, dtype=np.int16),
+                                 [len(encoded_file[COLUMN_NAMES[0]][0]) for encoded_file in encoded_files])
+    return pd.DataFrame(data=data)
 
 
 class BaseballFilesLoader:
     """ This class encapsulates all the logic dedicated to loading the content of baseball-statistics CSV files stored
-    in the same directory on the local file system into a single `pandas.DataFrame` object.
+    in the same directory on the local file system into a single `pandas.DataFrame` object. Files are parsed in
+    parallel by a pool of processes into dictionary-encoded columns which are cached next to the CSV files, so that
+    files left unchanged since the last run are never parsed again. Encoded columns are concatenated in a single copy
+    as categorical columns.
 
     Attributes:
         tmp_dir_path (str): Directory on the local file system when the files to be loaded are stored.
@@ -113,28 +706,53 @@ class BaseballFilesLoader:
         min_year (int): Year of the first file to load.
         max_year (int): Year of the last file to load.
         tmp_file_formatted_name (str): Name (formatted string) used to store baseball-statistics files on the local FS.
+        parsed_cache_formatted_name (str): Name (formatted string) used to store the parsed cache files on the local FS.
         regex (_sre.SRE_Pattern): Regex object used to filter the files located in `tmp_dir_path`.
+        download_workers (int): Number of files downloaded concurrently. Read from the configuration object if `None`.
+        refresh (bool): Whether the files already present in `tmp_dir_path` should be revalidated against the source.
+        manifest (DownloadManifest): Manifest of the files downloaded to `tmp_dir_path`.
+        max_cache_size (int): Maximum total size (in bytes) of the files kept in `tmp_dir_path` (baseball-statistics
+            files, their parsed cache files and the derived files), 0 meaning no limit.
+        derived_file_names (list[str]): Names of the files derived from all the years (Ex: the incremental state and
+            the team index) which count towards `max_cache_size` without being evicted.
+        load_workers (int): Number of processes the files are parsed by, 0 meaning as many as there are CPUs.
     """
-    def __init__(self, tmp_dir_path, config, min_year, max_year):
+    def __init__(self, tmp_dir_path, config, min_year, max_year, download_workers=None, refresh=False):
         self.tmp_dir_path = tmp_dir_path
         self.config = config
         self.min_year = min_year
         self.max_year = max_year
+        self.download_workers = download_workers
+        self.refresh = refresh
         self.tmp_file_formatted_name = config[csts.DEFAULT_CONF_SECTION][csts.CONF_TMP_FILE_FMT_NAME]
+        self.parsed_cache_formatted_name = config[csts.DEFAULT_CONF_SECTION][csts.CONF_PARSED_CACHE_FMT_NAME]
 
         tmp_file_regex = config[csts.DEFAULT_CONF_SECTION][csts.CONF_TMP_FILE_REGEX]
         self.regex = re.compile(tmp_file_regex)
 
+        manifest_file_name = config[csts.DEFAULT_CONF_SECTION][csts.CONF_MANIFEST_FILE_NAME]
+        self.manifest = DownloadManifest(path=os.path.join(tmp_dir_path, manifest_file_name))
+        self.max_cache_size = int(config[csts.DEFAULT_CONF_SECTION][csts.CONF_MAX_CACHE_SIZE])
+        self.derived_file_names = [file_name for file_name in (config[csts.DEFAULT_CONF_SECTION].get(conf_key)
+                                                               for conf_key in (csts.CONF_STATE_FILE_NAME,
+                                                                                csts.CONF_INDEX_FILE_NAME))
+                                   if file_name]
+        self.load_workers = int(config[csts.DEFAULT_CONF_SECTION][csts.CONF_LOAD_WORKERS]) or os.cpu_count()
+
     def _get_missing_years(self):
         """ Returns the list of missing years considering the requested year range and the files already present in
-        `tmp_dir_path`.
+        `tmp_dir_path`. Compressed files are recognized by the extension of their codec (Cf. `split_codec_extension`). A
+        file which does not match its manifest entry (or has none) is considered missing.
 
         Returns:
             set: Set of missing years.
         """
         requested_year_range = range(self.min_year, self.max_year + 1)
-        available_years = [int(self.regex.search(file_name).group(1)) for file_name in os.listdir(self.tmp_dir_path)
-                           if self.regex.match(file_name)]
+        matches = [(self.regex.fullmatch(split_codec_extension(file_name=file_name)[0]), file_name)
+                   for file_name in os.listdir(self.tmp_dir_path)]
+        available_years = [int(match.group(1)) for match, file_name in matches
+                           if match and self.manifest.is_valid(year=int(match.group(1)),
+                                                               path=os.path.join(self.tmp_dir_path, file_name))]
         return set(requested_year_range).difference(available_years)
 
     def _download_years(self, years):
@@ -143,26 +761,137 @@ class BaseballFilesLoader:
         Args:
             years (Iterable[int]): List of years for which the baseball-statistics file needs to be downloaded.
         """
-        logging.info('Starts downloading files corresponding to {:d} missing years'.format(len(years)))
-        files_downloader = BaseballFilesDownloader(tmp_dir_path=self.tmp_dir_path, config=self.config)
+        logging.info('Starts downloading files corresponding to {:d} {} years'
+                     .format(len(years), 'requested' if self.refresh else 'missing'))
+        files_downloader = BaseballFilesDownloader(tmp_dir_path=self.tmp_dir_path,
+                                                   config=self.config,
+                                                   workers=self.download_workers,
+                                                   manifest=self.manifest)
         files_downloader.download(years=years)
 
-    def load(self):
+    def _get_file_names(self, year):
+        """ Returns the paths of the baseball-statistics file of `year` (as recorded in the manifest, so that compressed
+        files are found) and of its parsed cache file.
+
+        Args:
+            year (int): Year of the file.
+
+        Returns:
+            (str, str): Path of the CSV file and path of the parsed cache file on the local file system.
+        """
+        entry = self.manifest.get(year=year)
+        file_name = entry['file_name'] if entry else self.tmp_file_formatted_name.format(year=year)
+        return (os.path.join(self.tmp_dir_path, file_name),
+                os.path.join(self.tmp_dir_path, self.parsed_cache_formatted_name.format(year=year)))
+
+    def _evict_files(self):
+        """ Removes the least recently used baseball-statistics files (outside of the requested year range) and their
+        parsed cache files from `tmp_dir_path` until the total size of the files recorded in the manifest, of their
+        parsed cache files and of the derived files fits within `max_cache_size`. The result cache is bounded
+        separately (Cf. `ddog.cache.ResultCache`).
+        """
+        if not self.max_cache_size:
+            return
+
+        def get_size(file_name):
+            try:
+                return os.path.getsize(os.path.join(self.tmp_dir_path, file_name))
+            except OSError:
+                return 0
+
+        entries = sorted(self.manifest.entries.items(), key=lambda item: item[1].get('last_used', 0))
+        year_sizes = {year: entry['size'] + get_size(self.parsed_cache_formatted_name.format(year=int(year)))
+                      for year, entry in entries}
+        cache_size = sum(year_sizes.values()) + sum(get_size(file_name) for file_name in self.derived_file_names)
+        for year, entry in entries:
+            if cache_size <= self.max_cache_size:
+                break
+            if self.min_year <= int(year) <= self.max_year:
+                continue
+            for file_name in (entry['file_name'], self.parsed_cache_formatted_name.format(year=int(year))):
+                try:
+                    os.remove(os.path.join(self.tmp_dir_path, file_name))
+                except FileNotFoundError:
+                    pass
+            self.manifest.remove(year=int(year))
+            cache_size -= year_sizes[year]
+            logging.info('Evicted file for year {year:} from the temporary directory'.format(year=year))
+
+    def download(self):
+        """ Downloads the missing files of the requested year range to `tmp_dir_path`, or revalidates all of them
+        against the source if the `refresh` attribute is set. Called by `load`, it can also be called beforehand so that
+        the checksums of the manifest reflect the files about to be loaded.
+        """
+        years = set(range(self.min_year, self.max_year + 1)) if self.refresh else self._get_missing_years()
+        if years:
+            self._download_years(years=years)
+
+    def load(self, with_years=False):
         """ Loads the content of all the files (the name of which matches the `regex` attribute) from `tmp_dir_path`
         into a `pandas.DataFrame`
 
+        Args:
+            with_years (bool): Whether a 'year' column holding the year of the file of each record should be added.
+
         Returns:
             pandas.DataFrame: DataFrames into which the 'team', 'league' and 'player' columns of the baseball-statistics
-            files located in `tmp_dir_path` have been loaded.
+            files located in `tmp_dir_path` have been loaded as categorical columns.
         """
-        missing_years = self._get_missing_years()
-        if missing_years:
-            self._download_years(years=missing_years)
+        with ddog.profiling.stage(name='load'):
+            self.download()
+
+            input_file_names, cache_file_names = zip(*[self._get_file_names(year=year)
+                                                       for year in range(self.min_year, self.max_year + 1)])
 
-        input_file_names = [os.path.join(self.tmp_dir_path, self.tmp_file_formatted_name.format(year=year))
-                            for year in range(self.min_year, self.max_year + 1)]
+            with ddog.profiling.stage(name='parse'):
+                if self.load_workers > 1 and len(input_file_names) > 1:
+                    with concurrent.futures.ProcessPoolExecutor(max_workers=self.load_workers) as executor:
+                        encoded_files = list(executor.map(read_encoded_file, input_file_names, cache_file_names))
+                else:
+                    encoded_files = [read_encoded_file(file_name=file_name, cache_file_name=cache_file_name)
+                                     for file_name, cache_file_name in zip(input_file_names, cache_file_names)]
+                ddog.profiling.count(files=len(encoded_files))
+
+            self.manifest.touch(years=range(self.min_year, self.max_year + 1))
+            self._evict_files()
+
+            years = list(range(self.min_year, self.max_year + 1)) if with_years else None
+            df = concat_encoded_files(encoded_files=encoded_files, years=years)
+            ddog.profiling.count(rows=len(df))
+        return df
+
+    def iter_encoded_files(self):
+        """ Generates the dictionary-encoded columns of each file of the requested year range as soon as they are
+        available, so that downloading, parsing and consuming files overlap in time. Files already present in
+        `tmp_dir_path` are handed over to the parsing pool right away, and each missing file as soon as its download
+        completes. Parsed files are generated in no particular order.
+
+        Yields:
+            (int, dict): Year of the file and its encoded columns (as returned by `read_encoded_file`).
+        """
+        requested_years = range(self.min_year, self.max_year + 1)
+        missing_years = set(requested_years) if self.refresh else self._get_missing_years()
+        if self.load_workers > 1:
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.load_workers)
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
 
-        dataframes = [pd.read_csv(file_name, header=None, usecols=[1, 2, 3], names=['team', 'league', 'player-id'])
-                      for file_name in input_file_names]
+        with executor:
+            pending = {executor.submit(read_encoded_file, *self._get_file_names(year=year)): year
+                       for year in sorted(set(requested_years).difference(missing_years))}
+            if missing_years:
+                logging.info('Starts downloading files corresponding to {:d} {} years'
+                             .format(len(missing_years), 'requested' if self.refresh else 'missing'))
+                files_downloader = BaseballFilesDownloader(tmp_dir_path=self.tmp_dir_path,
+                                                           config=self.config,
+                                                           workers=self.download_workers,
+                                                           manifest=self.manifest)
+                for year in files_downloader.iter_download(years=missing_years):
+                    pending[executor.submit(read_encoded_file, *self._get_file_names(year=year))] = year
+                    for future in [future for future in pending if future.done()]:
+                        yield pending.pop(future), future.result()
+            for future in concurrent.futures.as_completed(list(pending)):
+                yield pending.pop(future), future.result()
 
-        return functools.reduce(lambda x, y: x.append(y), dataframes)
+        self.manifest.touch(years=requested_years)
+        self._evict_files()
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _build_random_appearances(seed, n_rows=2000, n_players=150, n_teams=12, min_year=None, max_year=None):
+    """ Builds a random `pandas.DataFrame` of player appearances, some teams having no league name. A `year` column is
+    added when a year range is given.
+    """
+    rng = np.random.RandomState(seed)
+    teams = np.array(['T{:02d}'.format(team) for team in range(n_teams)])
+    team_codes = rng.randint(n_teams, size=n_rows)
+    data = {
+        'team': teams[team_codes],
+        'league': np.where(team_codes % 5 == 0, None, np.where(team_codes % 2 == 0, 'AL', 'NL')),
+        'player-id': rng.randint(n_players, size=n_rows).astype(str)
+    }
+    if min_year is not None:
+        data['year'] = rng.randint(min_year, max_year + 1, size=n_rows)
+    return pd.DataFrame(data=data)
+
+
+@pytest.fixture
+def build_random_appearances():
+    """ Returns a factory of random `pandas.DataFrame` of player appearances.
+    """
+    return _build_random_appearances
@@ -0,0 +1,94 @@
+import os
+
+import pandas as pd
+import pytest
+
+import ddog.bench
+import ddog.constants as csts
+import ddog.source
+
+
+def build_config():
+    """ Builds a minimal configuration object for the benchmarks, matching the names of the *config.ini* file.
+    """
+    return {csts.DEFAULT_CONF_SECTION: {csts.CONF_TMP_FILE_FMT_NAME: 'baseball-{year:d}.csv',
+                                        csts.CONF_PARSED_CACHE_FMT_NAME: 'baseball-{year:d}.npz',
+                                        csts.CONF_TMP_FILE_REGEX: 'baseball-([0-9]{4})\\.csv',
+                                        csts.CONF_MANIFEST_FILE_NAME: 'manifest.json',
+                                        csts.CONF_MAX_CACHE_SIZE: '0',
+                                        csts.CONF_LOAD_WORKERS: '1'}}
+
+
+@pytest.mark.parametrize('distribution', ddog.bench.DISTRIBUTIONS)
+def test_generate_files(tmp_path, distribution):
+    """
+    Given a configuration object and an empty temporary directory,
+    When I call the `ddog.bench.generate_files` function for years 2000 to 2004, 500 players and 12 teams,
+    Then one file per year should be generated and recorded in the manifest, so that a `ddog.source.BaseballFilesLoader`
+    object considers no year missing and loads as many records as were generated, with the requested teams and players
+    and at most one record per player and team in each year's file.
+    """
+    config = build_config()
+    rows = ddog.bench.generate_files(config=config, tmp_dir_path=str(tmp_path), min_year=2000, max_year=2004,
+                                     players=500, teams=12, teams_per_player=3, distribution=distribution)
+    loader = ddog.source.BaseballFilesLoader(tmp_dir_path=str(tmp_path), config=config, min_year=2000, max_year=2004)
+    assert loader._get_missing_years() == set()
+
+    df = loader.load()
+    assert len(df) == rows
+    assert set(df['team'].astype(str)) <= {'T{:03d}'.format(team) for team in range(12)}
+    assert df['player-id'].nunique() <= 500
+    for year in range(2000, 2005):
+        year_df = pd.read_csv(tmp_path / 'baseball-{:d}.csv'.format(year), header=None)
+        assert set(year_df[0]) == {year}
+        assert not year_df.duplicated(subset=[1, 3]).any()
+
+
+def test_bench_codecs(tmp_path):
+    """
+    Given a temporary directory containing synthetic baseball-statistics files for years 2000 to 2002,
+    When I call the `ddog.bench.bench_codecs` function,
+    Then I should be returned the measures of each available codec, every codec loading as many records as were
+    generated and the compressed codecs taking less disk space than the uncompressed files, and no scratch directory
+    should be left behind.
+    """
+    config = build_config()
+    rows = ddog.bench.generate_files(config=config, tmp_dir_path=str(tmp_path), min_year=2000, max_year=2002,
+                                     players=500, teams=12, teams_per_player=3)
+    files = set(os.listdir(str(tmp_path)))
+    results = {result['codec']: result for result in ddog.bench.bench_codecs(config=config, tmp_dir_path=str(tmp_path),
+                                                                               min_year=2000, max_year=2002)}
+    assert {csts.NO_CODEC_NAME, csts.GZIP_CODEC_NAME} <= set(results)
+    assert all(result['rows'] == rows for result in results.values())
+    assert all(result['disk_size'] < results[csts.NO_CODEC_NAME]['disk_size']
+               for codec, result in results.items() if codec != csts.NO_CODEC_NAME)
+    assert set(os.listdir(str(tmp_path))) == files
+
+
+def test_bench_pipeline(tmp_path):
+    """
+    Given a temporary directory containing synthetic baseball-statistics files for years 2000 to 2004,
+    When I call the `ddog.bench.bench_pipeline` function with each counting engine,
+    Then every engine should measure the load, pre-aggregation, count, sink and end-to-end stages and write the same
+    team triples to the sink, the end-to-end run bypassing the result cache.
+    """
+    config = build_config()
+    ddog.bench.generate_files(config=config, tmp_dir_path=str(tmp_path), min_year=2000, max_year=2004, players=2000,
+                              teams=10, teams_per_player=4)
+    engines = [csts.PYTHON_ENGINE_NAME, csts.NUMPY_ENGINE_NAME, csts.SKETCH_ENGINE_NAME, csts.APRIORI_ENGINE_NAME]
+    try:
+        import scipy.sparse  # noqa: F401
+        engines.append(csts.SPARSE_ENGINE_NAME)
+    except ImportError:
+        pass
+
+    outputs = dict()
+    for engine in engines:
+        stages = ddog.bench.bench_pipeline(config=config, tmp_dir_path=str(tmp_path), min_year=2000, max_year=2004,
+                                           engine=engine, min_player_count=5, sink_format=csts.CSV_SINK_NAME)
+        assert [stage['stage'] for stage in stages] == ['load', 'pre-aggregation', 'count', 'sink', 'end-to-end']
+        assert len({stage['triples'] for stage in stages}) == 1
+        outputs[engine] = sorted((tmp_path / 'bench-results.csv').read_text().splitlines())
+    assert len(outputs[csts.PYTHON_ENGINE_NAME]) > 1
+    assert all(output == outputs[csts.PYTHON_ENGINE_NAME] for output in outputs.values())
+    assert not (tmp_path / 'results').exists()
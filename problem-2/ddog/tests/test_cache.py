@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+import ddog.cache
+import ddog.processing
+
+CHECKSUMS = {1990: 'a', 1991: 'b', 1992: 'c'}
+
+
+def test_get_result_key():
+    """
+    Given the parameters of a run and the checksums of its input files,
+    When I pass them to the `ddog.cache.get_result_key` function,
+    Then I should be returned the same key for the same parameters and checksums, a different key if a parameter or the
+    checksum of a file of the year range differs, and `None` if the checksum of a file of the year range is unknown.
+    """
+    key = ddog.cache.get_result_key(min_year=1990, max_year=1991, size=3, checksums=CHECKSUMS)
+    assert key == ddog.cache.get_result_key(min_year=1990, max_year=1991, size=3, checksums={**CHECKSUMS, 1992: 'd'})
+    assert key != ddog.cache.get_result_key(min_year=1990, max_year=1991, size=3, checksums={**CHECKSUMS, 1991: 'd'})
+    assert key != ddog.cache.get_result_key(min_year=1990, max_year=1991, size=4, checksums=CHECKSUMS)
+    assert key != ddog.cache.get_result_key(min_year=1990, max_year=1992, size=3, checksums=CHECKSUMS)
+    assert ddog.cache.get_result_key(min_year=1990, max_year=1993, size=3, checksums=CHECKSUMS) is None
+
+
+@pytest.mark.parametrize('counter_class', [ddog.processing.TripleCounter, ddog.processing.NumpyTripleCounter])
+@pytest.mark.parametrize('min_player_count', [3, 5, 100])
+def test_result_cache_get(tmp_path, counter_class, min_player_count, build_random_appearances):
+    """
+    Given a `ddog.cache.ResultCache` object into which the team triples of a random `pandas.DataFrame` of player
+    appearances counted with a minimum player count of 3 were put (either as a list or as arrays),
+    When I call its `get` method with a greater or equal minimum player count,
+    Then I should be returned the same (team triple, player count) tuples as when counting with that minimum player
+    count, and `None` with a lower minimum player count or an unknown key.
+    """
+    df = build_random_appearances(seed=0)
+    cache = ddog.cache.ResultCache(path=str(tmp_path / 'results'))
+    cache.put(key='key', min_player_count=3, combinations=counter_class(min_player_count=3).compute(df=df), size=3)
+
+    exp = ddog.processing.TripleCounter(min_player_count=min_player_count).compute(df=df)
+    res = cache.get(key='key', min_player_count=min_player_count)
+    assert dict(res) == dict(exp) and len(res) == len(exp)
+    assert cache.get(key='key', min_player_count=2) is None
+    assert cache.get(key='other-key', min_player_count=3) is None
+
+
+def test_result_cache_put_higher_min_player_count(tmp_path, build_random_appearances):
+    """
+    Given a `ddog.cache.ResultCache` object holding the results of a key counted with a minimum player count of 3,
+    When I call its `put` method for the same key with a minimum player count of 5,
+    Then the cached results should be left untouched, still answering a minimum player count of 3.
+    """
+    df = build_random_appearances(seed=1)
+    cache = ddog.cache.ResultCache(path=str(tmp_path))
+    cache.put(key='key', min_player_count=3,
+              combinations=ddog.processing.TripleCounter(min_player_count=3).compute(df=df), size=3)
+    cache.put(key='key', min_player_count=5,
+              combinations=ddog.processing.TripleCounter(min_player_count=5).compute(df=df), size=3)
+    assert len(cache.get(key='key', min_player_count=3)) \
+        == len(ddog.processing.TripleCounter(min_player_count=3).compute(df=df))
+
+
+def test_result_cache_evict(tmp_path):
+    """
+    Given a `ddog.cache.ResultCache` object whose maximum size fits two entries, holding the entries of keys 'a' and 'b'
+    (put in that order),
+    When I get the entry of key 'a' and then put the entry of key 'c',
+    Then the least recently used entry (of key 'b') should be evicted.
+    """
+    combinations = [(frozenset(['A', 'B', 'C']), 3)]
+    cache = ddog.cache.ResultCache(path=str(tmp_path))
+    cache.put(key='a', min_player_count=1, combinations=combinations, size=3)
+    cache.max_size = 2 * os.path.getsize(str(tmp_path / 'a.npz'))
+    cache.put(key='b', min_player_count=1, combinations=combinations, size=3)
+    os.utime(str(tmp_path / 'a.npz'), ns=(0, 0))
+    os.utime(str(tmp_path / 'b.npz'), ns=(1, 1))
+
+    assert cache.get(key='a', min_player_count=1) is not None
+    cache.put(key='c', min_player_count=1, combinations=combinations, size=3)
+    assert sorted(os.listdir(str(tmp_path))) == ['a.npz', 'c.npz']
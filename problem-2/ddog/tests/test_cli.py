@@ -1,5 +1,8 @@
 import argparse
+import os
 import pytest
+import subprocess
+import sys
 import unittest.mock as mock
 
 import ddog.cli
@@ -47,6 +50,32 @@ def test_positive_integer_invalid_string():
         ddog.cli.positive_integer(string='abc')
 
 
+def test_strictly_positive_integer_zero():
+    """
+    Given the "0" string,
+    When I pass it to `ddog.cli.strictly_positive_integer` function,
+    Then an `argparse.ArgumentTypeError` error should be raised.
+    """
+    with pytest.raises(argparse.ArgumentTypeError):
+        ddog.cli.strictly_positive_integer(string='0')
+
+
+@pytest.mark.parametrize('string,valid', [('0.01', True), ('1e-5', True), ('0', False), ('1', False),
+                                          ('abc', False)])
+def test_probability(string, valid):
+    """
+    Given a number string,
+    When I pass it to `ddog.cli.probability` function,
+    Then I should be returned the corresponding float if it is strictly between 0 and 1, an
+    `argparse.ArgumentTypeError` error should be raised otherwise.
+    """
+    if valid:
+        assert ddog.cli.probability(string=string) == float(string)
+    else:
+        with pytest.raises(argparse.ArgumentTypeError):
+            ddog.cli.probability(string=string)
+
+
 def test_validate_args_valid_from_to():
     """
     Given a set of parsed CLI arguments with the minimum year argument being lower than the maximum year argument,
@@ -58,7 +87,10 @@ def test_validate_args_valid_from_to():
     mock_parser = mock.Mock()
     mock_parser.min_year_arg_name = min_year_arg_name
     mock_parser.max_year_arg_name = max_year_arg_name
-    args = {min_year_arg_name: 1871, max_year_arg_name: 2014}
+    args = {min_year_arg_name: 1871, max_year_arg_name: 2014, csts.CLI_ENGINE_ARG: csts.PYTHON_ENGINE_NAME,
+            csts.CLI_SIZE_ARG: 3, csts.CLI_INCREMENTAL_ARG: False, csts.CLI_SWEEP_ARG: None,
+            csts.CLI_STREAM_ARG: False, csts.CLI_SINK_ARG: csts.CONSOLE_SINK_NAME, csts.CLI_JOBS_ARG: None,
+            csts.CLI_KEEP_FILES_ARG: True, csts.CLI_SERVE_ARG: None, csts.CLI_PRUNE_ARG: False, csts.CLI_WORKERS_ARG: 1}
     res = ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args)
     assert res == args
 
@@ -74,11 +106,228 @@ def test_validate_args_invalid_from_to():
     mock_parser = mock.Mock()
     mock_parser.min_year_arg_name = min_year_arg_name
     mock_parser.max_year_arg_name = max_year_arg_name
-    args = {min_year_arg_name: 1910, max_year_arg_name: 1900}
+    args = {min_year_arg_name: 1910, max_year_arg_name: 1900, csts.CLI_ENGINE_ARG: csts.PYTHON_ENGINE_NAME,
+            csts.CLI_SIZE_ARG: 3, csts.CLI_INCREMENTAL_ARG: False, csts.CLI_SWEEP_ARG: None,
+            csts.CLI_STREAM_ARG: False, csts.CLI_SINK_ARG: csts.CONSOLE_SINK_NAME, csts.CLI_JOBS_ARG: None,
+            csts.CLI_KEEP_FILES_ARG: True, csts.CLI_SERVE_ARG: None, csts.CLI_PRUNE_ARG: False, csts.CLI_WORKERS_ARG: 1}
     with pytest.raises(ValueError):
         ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args)
 
 
+@pytest.mark.parametrize('engine,size,incremental,valid', [(csts.PYTHON_ENGINE_NAME, 3, True, True),
+                                                           (csts.NUMPY_ENGINE_NAME, 4, False, False),
+                                                           (csts.APRIORI_ENGINE_NAME, 4, False, True),
+                                                           (csts.APRIORI_ENGINE_NAME, 4, True, False)])
+def test_validate_args_size(engine, size, incremental, valid):
+    """
+    Given a set of parsed CLI arguments with a given engine, combination size and incremental mode,
+    When I pass it to the `ddog.cli.CliArgParser._validate_args` method,
+    Then a `ValueError` should be raised only if the engine or the incremental mode does not support the combination
+    size.
+    """
+    mock_parser = mock.Mock()
+    mock_parser.min_year_arg_name = csts.CLI_MIN_YEAR_ARG
+    mock_parser.max_year_arg_name = csts.CLI_MAX_YEAR_ARG
+    args = {csts.CLI_MIN_YEAR_ARG: 1871, csts.CLI_MAX_YEAR_ARG: 2014, csts.CLI_ENGINE_ARG: engine,
+            csts.CLI_SIZE_ARG: size, csts.CLI_INCREMENTAL_ARG: incremental, csts.CLI_SWEEP_ARG: None,
+            csts.CLI_STREAM_ARG: False, csts.CLI_SINK_ARG: csts.CONSOLE_SINK_NAME, csts.CLI_JOBS_ARG: None,
+            csts.CLI_KEEP_FILES_ARG: True, csts.CLI_SERVE_ARG: None, csts.CLI_PRUNE_ARG: False, csts.CLI_WORKERS_ARG: 1}
+    if valid:
+        assert ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args) == args
+    else:
+        with pytest.raises(ValueError):
+            ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args)
+
+
+@pytest.mark.parametrize('sweep,valid', [(None, True), (10, True), (11, False)])
+def test_validate_args_sweep(sweep, valid):
+    """
+    Given a set of parsed CLI arguments over the 1900-1909 range with a given rolling window length,
+    When I pass it to the `ddog.cli.CliArgParser._validate_args` method,
+    Then a `ValueError` should be raised only if the window is longer than the year range.
+    """
+    mock_parser = mock.Mock()
+    mock_parser.min_year_arg_name = csts.CLI_MIN_YEAR_ARG
+    mock_parser.max_year_arg_name = csts.CLI_MAX_YEAR_ARG
+    args = {csts.CLI_MIN_YEAR_ARG: 1900, csts.CLI_MAX_YEAR_ARG: 1909, csts.CLI_ENGINE_ARG: csts.PYTHON_ENGINE_NAME,
+            csts.CLI_SIZE_ARG: 3, csts.CLI_INCREMENTAL_ARG: False, csts.CLI_SWEEP_ARG: sweep,
+            csts.CLI_STREAM_ARG: False, csts.CLI_SINK_ARG: csts.CONSOLE_SINK_NAME, csts.CLI_JOBS_ARG: None,
+            csts.CLI_KEEP_FILES_ARG: True, csts.CLI_SERVE_ARG: None, csts.CLI_PRUNE_ARG: False, csts.CLI_WORKERS_ARG: 1}
+    if valid:
+        assert ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args) == args
+    else:
+        with pytest.raises(ValueError):
+            ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args)
+
+
+@pytest.mark.parametrize('stream,incremental,valid', [(True, False, True), (False, True, True), (True, True, False)])
+def test_validate_args_stream(stream, incremental, valid):
+    """
+    Given a set of parsed CLI arguments with a given streaming and incremental mode,
+    When I pass it to the `ddog.cli.CliArgParser._validate_args` method,
+    Then a `ValueError` should be raised only if both modes are requested.
+    """
+    mock_parser = mock.Mock()
+    mock_parser.min_year_arg_name = csts.CLI_MIN_YEAR_ARG
+    mock_parser.max_year_arg_name = csts.CLI_MAX_YEAR_ARG
+    args = {csts.CLI_MIN_YEAR_ARG: 1871, csts.CLI_MAX_YEAR_ARG: 2014, csts.CLI_ENGINE_ARG: csts.PYTHON_ENGINE_NAME,
+            csts.CLI_SIZE_ARG: 3, csts.CLI_INCREMENTAL_ARG: incremental, csts.CLI_SWEEP_ARG: None,
+            csts.CLI_STREAM_ARG: stream, csts.CLI_SINK_ARG: csts.CONSOLE_SINK_NAME, csts.CLI_JOBS_ARG: None,
+            csts.CLI_KEEP_FILES_ARG: True, csts.CLI_SERVE_ARG: None, csts.CLI_PRUNE_ARG: False, csts.CLI_WORKERS_ARG: 1}
+    if valid:
+        assert ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args) == args
+    else:
+        with pytest.raises(ValueError):
+            ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args)
+
+
+@pytest.mark.parametrize('incremental,keep,valid', [(True, True, True), (True, False, False), (False, False, True)])
+def test_validate_args_incremental_keep(incremental, keep, valid):
+    """
+    Given a set of parsed CLI arguments with a given incremental mode, keeping the temporary directory or not,
+    When I pass it to the `ddog.cli.CliArgParser._validate_args` method,
+    Then a `ValueError` should be raised only if counting incrementally without keeping the temporary directory.
+    """
+    mock_parser = mock.Mock()
+    mock_parser.min_year_arg_name = csts.CLI_MIN_YEAR_ARG
+    mock_parser.max_year_arg_name = csts.CLI_MAX_YEAR_ARG
+    args = {csts.CLI_MIN_YEAR_ARG: 1871, csts.CLI_MAX_YEAR_ARG: 2014, csts.CLI_ENGINE_ARG: csts.PYTHON_ENGINE_NAME,
+            csts.CLI_SIZE_ARG: 3, csts.CLI_INCREMENTAL_ARG: incremental, csts.CLI_SWEEP_ARG: None,
+            csts.CLI_STREAM_ARG: False, csts.CLI_SINK_ARG: csts.CONSOLE_SINK_NAME, csts.CLI_JOBS_ARG: None,
+            csts.CLI_KEEP_FILES_ARG: keep, csts.CLI_SERVE_ARG: None, csts.CLI_PRUNE_ARG: False, csts.CLI_WORKERS_ARG: 1}
+    if valid:
+        assert ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args) == args
+    else:
+        with pytest.raises(ValueError):
+            ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args)
+
+
+@pytest.mark.parametrize('serve,sweep,jobs,valid', [('stdin', None, None, True), (None, 5, None, True),
+                                                   (None, None, 'jobs.json', True), ('stdin', None, 'jobs.json', False),
+                                                   (None, 5, 'jobs.json', False), ('stdin', 5, None, False)])
+def test_validate_args_modes(serve, sweep, jobs, valid):
+    """
+    Given a set of parsed CLI arguments requesting some of the serving, sweeping and batch modes,
+    When I pass it to the `ddog.cli.CliArgParser._validate_args` method,
+    Then a `ValueError` should be raised only if more than one of these modes is requested.
+    """
+    mock_parser = mock.Mock()
+    mock_parser.min_year_arg_name = csts.CLI_MIN_YEAR_ARG
+    mock_parser.max_year_arg_name = csts.CLI_MAX_YEAR_ARG
+    args = {csts.CLI_MIN_YEAR_ARG: 1871, csts.CLI_MAX_YEAR_ARG: 2014, csts.CLI_ENGINE_ARG: csts.PYTHON_ENGINE_NAME,
+            csts.CLI_SIZE_ARG: 3, csts.CLI_INCREMENTAL_ARG: False, csts.CLI_SWEEP_ARG: sweep,
+            csts.CLI_STREAM_ARG: False, csts.CLI_SINK_ARG: csts.CONSOLE_SINK_NAME, csts.CLI_JOBS_ARG: jobs,
+            csts.CLI_KEEP_FILES_ARG: True, csts.CLI_SERVE_ARG: serve, csts.CLI_PRUNE_ARG: False,
+            csts.CLI_WORKERS_ARG: 1}
+    if valid:
+        assert ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args) == args
+    else:
+        with pytest.raises(ValueError):
+            ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args)
+
+
+@pytest.mark.parametrize('engine,prune,valid', [(csts.NUMPY_ENGINE_NAME, True, True),
+                                               (csts.APRIORI_ENGINE_NAME, False, True),
+                                               (csts.APRIORI_ENGINE_NAME, True, False)])
+def test_validate_args_prune(engine, prune, valid):
+    """
+    Given a set of parsed CLI arguments with a given engine, pruning teams or not,
+    When I pass it to the `ddog.cli.CliArgParser._validate_args` method,
+    Then a `ValueError` should be raised only if pruning is requested from the Apriori engine.
+    """
+    mock_parser = mock.Mock()
+    mock_parser.min_year_arg_name = csts.CLI_MIN_YEAR_ARG
+    mock_parser.max_year_arg_name = csts.CLI_MAX_YEAR_ARG
+    args = {csts.CLI_MIN_YEAR_ARG: 1871, csts.CLI_MAX_YEAR_ARG: 2014, csts.CLI_ENGINE_ARG: engine,
+            csts.CLI_SIZE_ARG: 3, csts.CLI_INCREMENTAL_ARG: False, csts.CLI_SWEEP_ARG: None,
+            csts.CLI_STREAM_ARG: False, csts.CLI_SINK_ARG: csts.CONSOLE_SINK_NAME, csts.CLI_JOBS_ARG: None,
+            csts.CLI_KEEP_FILES_ARG: True, csts.CLI_SERVE_ARG: None, csts.CLI_PRUNE_ARG: prune, csts.CLI_WORKERS_ARG: 1}
+    if valid:
+        assert ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args) == args
+    else:
+        with pytest.raises(ValueError):
+            ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args)
+
+
+@pytest.mark.parametrize('serve,sweep,incremental,stream,engine,workers,valid', [
+    ('stdin', None, False, False, csts.PYTHON_ENGINE_NAME, 1, True),
+    ('stdin', None, False, True, csts.PYTHON_ENGINE_NAME, 1, False),
+    (None, 3, True, False, csts.PYTHON_ENGINE_NAME, 1, False),
+    (None, 3, False, False, csts.SKETCH_ENGINE_NAME, 4, False),
+    (None, None, True, False, csts.PYTHON_ENGINE_NAME, 1, True),
+    (None, None, True, False, csts.NUMPY_ENGINE_NAME, 1, False),
+    (None, None, True, False, csts.PYTHON_ENGINE_NAME, 2, False),
+    (None, None, False, True, csts.NUMPY_ENGINE_NAME, 2, True)])
+def test_validate_args_ignored_flags(serve, sweep, incremental, stream, engine, workers, valid):
+    """
+    Given a set of parsed CLI arguments requesting a given mode (serving, sweeping, incremental counting or counting
+    from scratch) together with streaming, engine and worker flags,
+    When I pass it to the `ddog.cli.CliArgParser._validate_args` method,
+    Then a `ValueError` should be raised only if the mode ignores some of the flags: the serving and sweeping modes
+    read neither the incremental, streaming nor engine flags, and incremental counting does not read the engine flags.
+    """
+    mock_parser = mock.Mock()
+    mock_parser.min_year_arg_name = csts.CLI_MIN_YEAR_ARG
+    mock_parser.max_year_arg_name = csts.CLI_MAX_YEAR_ARG
+    args = {csts.CLI_MIN_YEAR_ARG: 1871, csts.CLI_MAX_YEAR_ARG: 2014, csts.CLI_ENGINE_ARG: engine,
+            csts.CLI_SIZE_ARG: 3, csts.CLI_INCREMENTAL_ARG: incremental, csts.CLI_SWEEP_ARG: sweep,
+            csts.CLI_STREAM_ARG: stream, csts.CLI_SINK_ARG: csts.CONSOLE_SINK_NAME, csts.CLI_JOBS_ARG: None,
+            csts.CLI_KEEP_FILES_ARG: True, csts.CLI_SERVE_ARG: serve, csts.CLI_PRUNE_ARG: False,
+            csts.CLI_WORKERS_ARG: workers}
+    if valid:
+        assert ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args) == args
+    else:
+        with pytest.raises(ValueError):
+            ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args)
+
+
+@pytest.mark.parametrize('sink,valid', [('console', True), ('/path/to/results.csv', True),
+                                        ('parquet:///path/to/results', True), ('s3://bucket/results.csv', False)])
+@mock.patch('importlib.util.find_spec', new=mock.Mock())
+def test_validate_args_sink(sink, valid):
+    """
+    Given a set of parsed CLI arguments with a given output sink, the optional packages being installed,
+    When I pass it to the `ddog.cli.CliArgParser._validate_args` method,
+    Then a `ValueError` should be raised only if the sink has an unsupported format.
+    """
+    mock_parser = mock.Mock()
+    mock_parser.min_year_arg_name = csts.CLI_MIN_YEAR_ARG
+    mock_parser.max_year_arg_name = csts.CLI_MAX_YEAR_ARG
+    args = {csts.CLI_MIN_YEAR_ARG: 1871, csts.CLI_MAX_YEAR_ARG: 2014, csts.CLI_ENGINE_ARG: csts.PYTHON_ENGINE_NAME,
+            csts.CLI_SIZE_ARG: 3, csts.CLI_INCREMENTAL_ARG: False, csts.CLI_SWEEP_ARG: None,
+            csts.CLI_STREAM_ARG: False, csts.CLI_SINK_ARG: sink, csts.CLI_JOBS_ARG: None,
+            csts.CLI_KEEP_FILES_ARG: True, csts.CLI_SERVE_ARG: None, csts.CLI_PRUNE_ARG: False, csts.CLI_WORKERS_ARG: 1}
+    if valid:
+        assert ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args) == args
+    else:
+        with pytest.raises(ValueError):
+            ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args)
+
+
+@pytest.mark.parametrize('engine,sink,valid', [(csts.NUMPY_ENGINE_NAME, '/path/to/results.csv', True),
+                                              (csts.NUMPY_ENGINE_NAME, 'parquet:///path/to/results', False),
+                                              (csts.SPARSE_ENGINE_NAME, '/path/to/results.csv', False)])
+def test_validate_args_missing_package(engine, sink, valid):
+    """
+    Given a set of parsed CLI arguments with a given engine and output sink, the optional packages not being installed,
+    When I pass it to the `ddog.cli.CliArgParser._validate_args` method,
+    Then an `ImportError` should be raised only if the sink writes Parquet files or the engine is the sparse one.
+    """
+    mock_parser = mock.Mock()
+    mock_parser.min_year_arg_name = csts.CLI_MIN_YEAR_ARG
+    mock_parser.max_year_arg_name = csts.CLI_MAX_YEAR_ARG
+    args = {csts.CLI_MIN_YEAR_ARG: 1871, csts.CLI_MAX_YEAR_ARG: 2014, csts.CLI_ENGINE_ARG: engine,
+            csts.CLI_SIZE_ARG: 3, csts.CLI_INCREMENTAL_ARG: False, csts.CLI_SWEEP_ARG: None,
+            csts.CLI_STREAM_ARG: False, csts.CLI_SINK_ARG: sink, csts.CLI_JOBS_ARG: None,
+            csts.CLI_KEEP_FILES_ARG: True, csts.CLI_SERVE_ARG: None, csts.CLI_PRUNE_ARG: False, csts.CLI_WORKERS_ARG: 1}
+    with mock.patch('importlib.util.find_spec', return_value=None):
+        if valid:
+            assert ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args) == args
+        else:
+            with pytest.raises(ImportError):
+                ddog.cli.CliArgParser._validate_args(self=mock_parser, args=args)
+
+
 def test_parse_args():
     """
     Given a list of command line arguments, a configuration object and a `ddog.cli.CliArgParser` object,
@@ -91,19 +340,44 @@ def test_parse_args():
     min_players_arg_name = csts.CLI_MIN_PLAYERS_ARG
     output_arg_name = csts.CLI_SINK_ARG
     keep_arg_name = csts.CLI_KEEP_FILES_ARG
+    download_workers_arg_name = csts.CLI_DOWNLOAD_WORKERS_ARG
+    refresh_arg_name = csts.CLI_REFRESH_ARG
+    engine_arg_name = csts.CLI_ENGINE_ARG
+    workers_arg_name = csts.CLI_WORKERS_ARG
+    prune_arg_name = csts.CLI_PRUNE_ARG
+    size_arg_name = csts.CLI_SIZE_ARG
+    incremental_arg_name = csts.CLI_INCREMENTAL_ARG
+    serve_arg_name = csts.CLI_SERVE_ARG
+    sweep_arg_name = csts.CLI_SWEEP_ARG
+    stream_arg_name = csts.CLI_STREAM_ARG
+    top_arg_name = csts.CLI_TOP_ARG
+    summary_arg_name = csts.CLI_SUMMARY_ARG
+    profile_arg_name = csts.CLI_PROFILE_ARG
 
     conf_section = csts.DEFAULT_CONF_SECTION
     conf_min_year = csts.CONF_MIN_YEAR
     conf_max_year = csts.CONF_MAX_YEAR
+    conf_download_workers = csts.CONF_DOWNLOAD_WORKERS
 
-    config = {conf_section: {conf_min_year: '1871', conf_max_year: '2014'}}
+    config = {conf_section: {conf_min_year: '1871', conf_max_year: '2014', conf_download_workers: '8'}}
     parser = ddog.cli.CliArgParser(config=config)
     args = ['--{}'.format(min_year_arg_name), '1900',
             '--{}'.format(max_year_arg_name), '1910',
             '--{}'.format(tmp_dir_arg_name), '/path/to/tmp',
             '--{}'.format(min_players_arg_name), '40',
             '--{}'.format(output_arg_name), 'console',
-            '--{}'.format(keep_arg_name)]
+            '--{}'.format(keep_arg_name),
+            '--{}'.format(download_workers_arg_name), '4',
+            '--{}'.format(refresh_arg_name),
+            '--{}'.format(csts.CLI_NO_RESULT_CACHE_ARG),
+            '--{}'.format(engine_arg_name), 'apriori',
+            '--{}'.format(workers_arg_name), '2',
+            '--{}'.format(size_arg_name), '4',
+            '--{}'.format(stream_arg_name),
+            '--{}'.format(top_arg_name), '10',
+            '--{}'.format(summary_arg_name), '/path/to/summary.json',
+            '--{}'.format(profile_arg_name), '/path/to/run.prof',
+            '--{}'.format(csts.CLI_SKETCH_ERROR_ARG), '0.001']
 
     res = parser.parse_args(args=args)
     exp = {
@@ -112,7 +386,97 @@ def test_parse_args():
         tmp_dir_arg_name: '/path/to/tmp',
         min_players_arg_name: 40,
         output_arg_name: 'console',
-        keep_arg_name: True
+        keep_arg_name: True,
+        download_workers_arg_name: 4,
+        refresh_arg_name: True,
+        csts.CLI_NO_RESULT_CACHE_ARG: True,
+        engine_arg_name: 'apriori',
+        workers_arg_name: 2,
+        prune_arg_name: False,
+        size_arg_name: 4,
+        incremental_arg_name: False,
+        serve_arg_name: None,
+        sweep_arg_name: None,
+        stream_arg_name: True,
+        top_arg_name: 10,
+        summary_arg_name: '/path/to/summary.json',
+        profile_arg_name: '/path/to/run.prof',
+        csts.CLI_JOBS_ARG: None,
+        csts.CLI_SKETCH_ERROR_ARG: 0.001,
+        csts.CLI_SKETCH_DELTA_ARG: csts.DEFAULT_SKETCH_DELTA
     }
 
     assert res == exp
+
+
+@pytest.mark.parametrize('extension,content', [
+    ('.json', '[{"from": 1990, "to": 1999, "sink": "/path/to/a.csv"}, {"players": "10", "top": 5}]'),
+    ('.csv', 'from,to,players,sink,top\n1990,1999,,/path/to/a.csv,\n,,10,,5\n')])
+def test_read_jobs(tmp_path, extension, content):
+    """
+    Given a JSON or CSV jobs file of two jobs and command line arguments passing it with the `--jobs` flag,
+    When I parse the arguments and pass the file path to the `ddog.cli.CliArgParser.read_jobs` method,
+    Then I should be returned the jobs with their parameters cast, the missing ones defaulting to the parsed arguments.
+    """
+    path = tmp_path / 'jobs{}'.format(extension)
+    path.write_text(content)
+    config = {csts.DEFAULT_CONF_SECTION: {csts.CONF_MIN_YEAR: '1871', csts.CONF_MAX_YEAR: '2014',
+                                          csts.CONF_DOWNLOAD_WORKERS: '8'}}
+    parser = ddog.cli.CliArgParser(config=config)
+    args = parser.parse_args(args=['--{}'.format(csts.CLI_JOBS_ARG), str(path), '--{}'.format(csts.CLI_MIN_PLAYERS_ARG),
+                                   '20'])
+    res = parser.read_jobs(path=args[csts.CLI_JOBS_ARG], args=args)
+    assert res == [{'from': 1990, 'to': 1999, 'players': 20, 'sink': '/path/to/a.csv', 'top': None},
+                   {'from': 1871, 'to': 2014, 'players': 10, 'sink': 'console', 'top': 5}]
+
+
+@pytest.mark.parametrize('file_name,content', [('jobs.json', '[{"from": 1990, "to": 1980}]'),
+                                               ('jobs.json', '[{"from": 1800}]'),
+                                               ('jobs.json', '[{"players": -1}]'),
+                                               ('jobs.json', '[{"size": 4}]'),
+                                               ('jobs.json', '[{"sink": "s3://bucket/a.csv"}]'),
+                                               ('jobs.json', '[]'),
+                                               ('jobs.txt', 'from,to\n1990,1999\n')])
+def test_read_jobs_invalid(tmp_path, file_name, content):
+    """
+    Given a jobs file with an invalid job (or none) or an unsupported extension,
+    When I pass its path to the `ddog.cli.CliArgParser.read_jobs` method,
+    Then a `ValueError` should be raised.
+    """
+    path = tmp_path / file_name
+    path.write_text(content)
+    config = {csts.DEFAULT_CONF_SECTION: {csts.CONF_MIN_YEAR: '1871', csts.CONF_MAX_YEAR: '2014',
+                                          csts.CONF_DOWNLOAD_WORKERS: '8'}}
+    parser = ddog.cli.CliArgParser(config=config)
+    args = parser.parse_args(args=['--{}'.format(csts.CLI_JOBS_ARG), str(path)])
+    with pytest.raises(ValueError):
+        parser.read_jobs(path=str(path), args=args)
+
+
+def test_bounded_year():
+    """
+    Given a function built by `ddog.cli.bounded_year` for the 1871-2014 range,
+    When I pass it strings,
+    Then I should be returned the years of the range and an `argparse.ArgumentTypeError` should be raised for the
+    other strings.
+    """
+    year = ddog.cli.bounded_year(min_year=1871, max_year=2014)
+    assert year('1871') == 1871 and year('2014') == 2014
+    for string in ('1870', '2015', '19x0'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            year(string)
+
+
+def test_help_import_time():
+    """
+    Given the *main.py* entry-point script,
+    When I run it with the `--help` flag and the `-X importtime` interpreter option,
+    Then neither NumPy nor pandas should be imported.
+    """
+    root_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run([sys.executable, '-X', 'importtime', 'main.py', '--help'], cwd=root_path, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    imports = [line.split('|')[1:] for line in result.stderr.splitlines()
+               if line.startswith('import time:') and 'cumulative' not in line]
+    assert imports
+    assert not {name.strip().split('.')[0] for _, name in imports} & {'numpy', 'pandas'}
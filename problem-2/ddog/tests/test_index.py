@@ -0,0 +1,253 @@
+import hashlib
+import io
+import itertools
+import os
+import socket
+import threading
+import unittest.mock as mock
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+import ddog.index
+import ddog.processing
+import ddog.source
+
+
+@pytest.mark.parametrize('min_year,max_year', [(1990, 1999), (1993, 1996), (1995, 1995)])
+def test_team_index_count(min_year, max_year, build_random_appearances):
+    """
+    Given a random `pandas.DataFrame` of yearly player appearances and a year range,
+    When I build a `ddog.index.TeamIndex` object from it and call its `count` method for each team triple,
+    Then I should be returned the same player counts as the ones of a `ddog.processing.TripleCounter` object computed
+    over the records of the year range.
+    """
+    df = build_random_appearances(seed=0, n_teams=8, min_year=1990, max_year=1999)
+    index = ddog.index.TeamIndex.build(df=df, min_year=1990, max_year=1999)
+    exp = dict(ddog.processing.TripleCounter(min_player_count=1)
+               .compute(df=df[df.year.between(min_year, max_year)].drop(columns='year')))
+    assert len(exp) > 0
+    for triple in itertools.combinations(index.team_names, 3):
+        res = index.count(teams=triple, min_year=min_year, max_year=max_year)
+        assert res == exp.get(frozenset(triple), 0)
+
+
+def test_team_index_count_invalid(build_random_appearances):
+    """
+    Given a `ddog.index.TeamIndex` object built over the 1990-1999 range,
+    When I call its `count` method with an unknown team or a year range outside of the indexed one,
+    Then a `ValueError` should be raised.
+    """
+    df = build_random_appearances(seed=1, n_teams=8, min_year=1990, max_year=1999)
+    index = ddog.index.TeamIndex.build(df=df, min_year=1990, max_year=1999)
+    with pytest.raises(ValueError):
+        index.count(teams=['T01-NL', 'UNKNOWN'])
+    with pytest.raises(ValueError):
+        index.count(teams=['T01-NL'], min_year=1985, max_year=1995)
+
+
+def test_team_index_save_read(tmp_path, build_random_appearances):
+    """
+    Given a `ddog.index.TeamIndex` object built with the checksums of its files,
+    When I save it and read it back,
+    Then the read index should answer the same counts and only match its year range as long as no file changed.
+    """
+    path = str(tmp_path / 'index.npz')
+    df = build_random_appearances(seed=2, n_teams=8, min_year=1990, max_year=1999)
+    index = ddog.index.TeamIndex.build(df=df, min_year=1990, max_year=1999, checksums={1990: 'abc', 2000: 'def'})
+    index.save(path=path)
+    res = ddog.index.TeamIndex.read(path=path)
+    assert res.checksums == {1990: 'abc'}
+    for triple in itertools.combinations(index.team_names, 3):
+        assert res.count(teams=triple, min_year=1992) == index.count(teams=triple, min_year=1992)
+    assert res.matches(min_year=1990, max_year=1999, checksums={1990: 'abc'})
+    assert res.matches(min_year=1990, max_year=1999, checksums=dict())
+    assert not res.matches(min_year=1990, max_year=1999, checksums={1990: 'xyz'})
+    assert not res.matches(min_year=1990, max_year=1999, checksums={1990: None})
+    assert not res.matches(min_year=1991, max_year=1999, checksums=dict())
+    assert ddog.index.TeamIndex.read(path=str(tmp_path / 'missing.npz')) is None
+
+
+def test_team_index_matches_modified_file(tmp_path, build_random_appearances):
+    """
+    Given a `ddog.index.TeamIndex` object built with the checksums of the files of a download manifest,
+    When a file is modified (with the same size) after indexing, then removed from the temporary directory,
+    Then the index should no longer match the checksums of the valid files of the manifest once the file is modified,
+    but match them again once the file is removed (Ex: evicted).
+    """
+    manifest = ddog.source.DownloadManifest(path=str(tmp_path / 'manifest.json'))
+    for year in (1990, 1991):
+        content = '{:d},BOS,AL,bob\n'.format(year).encode()
+        (tmp_path / 'baseball-{:d}.csv'.format(year)).write_bytes(content)
+        manifest.record(year=year, file_name='baseball-{:d}.csv'.format(year), size=len(content),
+                        sha256=hashlib.sha256(content).hexdigest())
+    df = build_random_appearances(seed=3, n_teams=8, min_year=1990, max_year=1991)
+    index = ddog.index.TeamIndex.build(df=df, min_year=1990, max_year=1991,
+                                       checksums=manifest.get_checksums(valid_only=True))
+    assert index.matches(min_year=1990, max_year=1991, checksums=manifest.get_checksums(valid_only=True))
+
+    (tmp_path / 'baseball-1991.csv').write_bytes(b'1991,NYA,AL,joe\n')
+    os.utime(str(tmp_path / 'baseball-1991.csv'), ns=(0, 0))
+    assert not index.matches(min_year=1990, max_year=1991, checksums=manifest.get_checksums(valid_only=True))
+
+    os.remove(str(tmp_path / 'baseball-1991.csv'))
+    assert index.matches(min_year=1990, max_year=1991, checksums=manifest.get_checksums(valid_only=True))
+
+
+def build_small_index():
+    """ Builds a `ddog.index.TeamIndex` object where teams A, B and C were played for by Bob in 1990 and by Joe in
+    1991.
+    """
+    df = pd.DataFrame(data={
+        'team': ['A', 'B', 'C', 'A', 'B', 'C', 'A'],
+        'league': 'NL',
+        'player-id': ['Bob', 'Bob', 'Bob', 'Joe', 'Joe', 'Joe', 'Pete'],
+        'year': [1990, 1990, 1990, 1991, 1991, 1991, 1991]
+    })
+    return ddog.index.TeamIndex.build(df=df, min_year=1990, max_year=1991)
+
+
+def test_answer():
+    """
+    Given a `ddog.index.TeamIndex` object,
+    When I pass it valid and invalid queries with the `ddog.index.answer` function,
+    Then I should be returned formatted counts for the valid ones and error messages for the invalid ones.
+    """
+    index = build_small_index()
+    assert ddog.index.answer(index=index, query='C-NL|A-NL|B-NL\n') == 'A-NL|B-NL|C-NL, 2'
+    assert ddog.index.answer(index=index, query='C-NL|A-NL|B-NL 1991') == 'A-NL|B-NL|C-NL, 1'
+    assert ddog.index.answer(index=index, query='A-NL 1990-1991') == 'A-NL, 3'
+    assert ddog.index.answer(index=index, query='A-NL|D-NL').startswith('ERROR: ')
+    assert ddog.index.answer(index=index, query='A-NL 1990 1991').startswith('ERROR: ')
+    assert ddog.index.answer(index=index, query='A-NL 19x0').startswith('ERROR: ')
+
+
+def test_serve_stream():
+    """
+    Given a `ddog.index.TeamIndex` object and a text stream of queries with an empty line,
+    When I pass them to the `ddog.index.serve_stream` function,
+    Then one answer per non-empty query line should be written to the output stream.
+    """
+    output_stream = io.StringIO()
+    ddog.index.serve_stream(index=build_small_index(), input_stream=io.StringIO('A-NL|B-NL\n\nA-NL 1991\n'),
+                            output_stream=output_stream)
+    assert output_stream.getvalue() == 'A-NL|B-NL, 2\nA-NL, 2\n'
+
+
+def test_query_server(tmp_path):
+    """
+    Given a `ddog.index.QueryServer` object serving a `ddog.index.TeamIndex` object on a Unix domain socket,
+    When I send it two queries through a single connection,
+    Then I should be returned one answer per query.
+    """
+    path = str(tmp_path / 'query.sock')
+    server = ddog.index.QueryServer(path=path, index=build_small_index())
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            client.sendall(b'A-NL|B-NL|C-NL\nA-NL 1991\n')
+            client.shutdown(socket.SHUT_WR)
+            res = b''.join(iter(lambda: client.recv(4096), b''))
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+    assert res == b'A-NL|B-NL|C-NL, 2\nA-NL, 2\n'
+
+
+def test_year_range_triple_counter_sweep(build_random_appearances):
+    """
+    Given a `ddog.index.TeamIndex` object built from random yearly player appearances and a sequence of overlapping and
+    disjoint year ranges,
+    When I pass the ranges to the `sweep` method of a `ddog.index.YearRangeTripleCounter` object,
+    Then I should be returned, for each range, the same (team triple, player count) tuples as the ones of a
+    `ddog.processing.TripleCounter` object computed over the records of the range.
+    """
+    df = build_random_appearances(seed=3, n_teams=10, min_year=1990, max_year=1999)
+    index = ddog.index.TeamIndex.build(df=df, min_year=1990, max_year=1999)
+    ranges = [(1990, 1994), (1991, 1995), (1992, 1996), (1998, 1999), (1990, 1999), (1995, 1995)]
+    counter = ddog.index.YearRangeTripleCounter(index=index, min_player_count=2)
+    for (min_year, max_year), res in counter.sweep(ranges=ranges):
+        exp = ddog.processing.TripleCounter(min_player_count=2) \
+            .compute(df=df[df.year.between(min_year, max_year)].drop(columns='year'))
+        assert len(exp) > 0
+        assert dict(res) == dict(exp) and len(res) == len(exp)
+
+    with pytest.raises(ValueError):
+        counter.move(min_year=1985, max_year=1995)
+
+
+def test_index_service(build_random_appearances):
+    """
+    Given a `ddog.index.IndexService` object loading a `ddog.index.TeamIndex` object and checking the signature of its
+    data directory before each query,
+    When I query it for team combinations and for the team triples of several year ranges and minimum player counts,
+    then change the signature,
+    Then I should be returned the same counts as the ones of the index and of a `ddog.processing.TripleCounter` object
+    over the records of each range, and the index should only be loaded again once the signature changed.
+    """
+    df = build_random_appearances(seed=4, n_teams=8, min_year=1990, max_year=1999)
+    load = mock.Mock(side_effect=lambda: ddog.index.TeamIndex.build(df=df, min_year=1990, max_year=1999))
+    signature = ['v1']
+    service = ddog.index.IndexService(load=load, get_signature=lambda: signature[0], min_player_count=3,
+                                      check_interval=0)
+    for min_year, max_year, min_player_count in [(1990, 1999, None), (1992, 1996, 2), (1993, 1996, None)]:
+        exp = ddog.processing.TripleCounter(min_player_count=min_player_count or 3) \
+            .compute(df=df[df.year.between(min_year, max_year)].drop(columns='year'))
+        res = service.get_triples(min_year=min_year, max_year=max_year, min_player_count=min_player_count)
+        assert len(exp) > 0
+        assert dict(res) == dict(exp) and len(res) == len(exp)
+    assert service.count(teams=['T01-NL', 'T03-NL'], min_year=1991) == service.index.count(teams=['T01-NL', 'T03-NL'],
+                                                                                          min_year=1991)
+    assert load.call_count == 1
+
+    signature[0] = 'v2'
+    service.get_triples()
+    assert load.call_count == 2
+
+
+def test_answer_triples():
+    """
+    Given a `ddog.index.IndexService` object,
+    When I pass it valid and invalid team triple queries with the `ddog.index.answer` function,
+    Then I should be returned the formatted triples followed by an empty line for the valid ones and error messages for
+    the invalid ones.
+    """
+    service = ddog.index.IndexService(load=build_small_index, get_signature=lambda: None, min_player_count=2)
+    assert ddog.index.answer(index=service, query='TRIPLES') == 'A-NL|B-NL|C-NL, 2\n'
+    assert ddog.index.answer(index=service, query='triples 1991 2') == ''
+    assert ddog.index.answer(index=service, query='TRIPLES 1990-1991 1 1') == 'A-NL|B-NL|C-NL, 2\n'
+    assert ddog.index.answer(index=service, query='A-NL 1991') == 'A-NL, 2'
+    assert ddog.index.answer(index=service, query='TRIPLES 1980-1991').startswith('ERROR: ')
+    assert ddog.index.answer(index=service, query='TRIPLES 1990 1 0').startswith('ERROR: ')
+    assert ddog.index.answer(index=service, query='TRIPLES 1990 1 1 1').startswith('ERROR: ')
+
+
+def test_http_query_server():
+    """
+    Given a `ddog.index.HttpQueryServer` object serving a `ddog.index.IndexService` object on a local port,
+    When I send it team triple, team combination, invalid and unknown requests,
+    Then I should be returned the answers with a 200 status code, and 400 and 404 status codes respectively.
+    """
+    service = ddog.index.IndexService(load=build_small_index, get_signature=lambda: None, min_player_count=1)
+    server = ddog.index.HttpQueryServer(address=('127.0.0.1', 0), index=service)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    url = 'http://127.0.0.1:{:d}'.format(server.server_address[1])
+    try:
+        with urllib.request.urlopen(url + '/triples?from=1991&players=1') as response:
+            assert response.status == 200 and response.read() == b'A-NL|B-NL|C-NL, 1\n'
+        with urllib.request.urlopen(url + '/count?teams=A-NL|B-NL&to=1990') as response:
+            assert response.read() == b'A-NL|B-NL, 1\n'
+        for path, status in [('/triples?to=2000', 400), ('/count?teams=X-NL', 400), ('/unknown', 404)]:
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(url + path)
+            assert error.value.code == status
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
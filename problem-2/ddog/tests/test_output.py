@@ -1,22 +1,65 @@
+import csv
+import functools
+import json
 import unittest.mock as mock
 
+import numpy as np
+import pytest
+
+import ddog.constants
 import ddog.output
+import ddog.processing
 
 
 def test_preprocess_triples():
     """
     Given a list of (team triple, player count) tuples,
     When I pass it to a function decorated with `ddog.output.preprocess_triples`,
-    Then the decorated function should be passed a list of formatted strings sorted in decreasing player count order.
+    Then the decorated function should be passed formatted strings sorted in decreasing player count order.
     """
-    mock_sink = mock.Mock()
+    mock_sink = mock.Mock(top=None)
     func = mock.Mock()
     decorated_func = ddog.output.preprocess_triples(func)
     triples = [(frozenset(['A', 'B', 'C']), 4), (frozenset(['D', 'E', 'F']), 1), (frozenset(['G', 'H', 'I']), 10)]
     formatted_triples = ['G|H|I, 10', 'A|B|C, 4', 'D|E|F, 1']
 
     decorated_func(self=mock_sink, triples=triples)
-    func.assert_called_with(mock_sink, formatted_triples)
+    assert func.call_args[0][0] is mock_sink
+    assert list(func.call_args[0][1]) == formatted_triples
+
+
+def test_iter_formatted_combinations():
+    """
+    Given the same team triple counts as a list of (team triple, player count) tuples and as a
+    `ddog.processing.CombinationCounts` object,
+    When I pass them to the `ddog.output.iter_formatted_combinations` function with and without a top limit,
+    Then I should be generated the same formatted lines in decreasing player count order, limited to the top ones.
+    """
+    team_names = np.array(['D', 'C', 'B', 'A'], dtype=object)
+    combination_counts = ddog.processing.CombinationCounts(team_names=team_names,
+                                                           combinations=np.array([[0, 1, 2], [1, 2, 3], [0, 1, 3]]),
+                                                           counts=np.array([3, 7, 5]))
+    triples = list(combination_counts)
+    exp = ['A|B|C, 7', 'A|C|D, 5', 'B|C|D, 3']
+    for combinations in (triples, combination_counts):
+        assert list(ddog.output.iter_formatted_combinations(combinations=combinations)) == exp
+        assert list(ddog.output.iter_formatted_combinations(combinations=combinations, top=2)) == exp[:2]
+        assert list(ddog.output.iter_formatted_combinations(combinations=combinations, top=5)) == exp
+
+
+def test_local_file_system_sink_write(tmp_path):
+    """
+    Given a `ddog.processing.CombinationCounts` object of three team triples,
+    When I pass it to the `write` method of a `ddog.output.LocalFileSystemSink` object limited to the top 2 triples,
+    Then the file should hold the header followed by the two triples with the highest player counts.
+    """
+    path = str(tmp_path / 'results.txt')
+    combination_counts = ddog.processing.CombinationCounts(team_names=np.array(['A', 'B', 'C', 'D'], dtype=object),
+                                                           combinations=np.array([[0, 1, 2], [1, 2, 3], [0, 1, 3]]),
+                                                           counts=np.array([3, 7, 5]))
+    ddog.output.LocalFileSystemSink(path=path, top=2).write(triples=combination_counts)
+    with open(path) as file_obj:
+        assert file_obj.read() == '\n'.join([ddog.output.HEADER, 'B|C|D, 7', 'A|B|D, 5'])
 
 
 @mock.patch('logging.warning')
@@ -33,3 +76,112 @@ def test_preprocess_triples_no_triples(mock_warning):
     decorated_func(self=mock_sink, triples=triples)
     assert mock_warning.call_count == 2
     func.assert_not_called()
+
+
+def test_build_header():
+    """
+    Given combination sizes of 2, 3 and 4 teams,
+    When I pass them to the `ddog.output.build_header` function,
+    Then I should be returned headers of the same width, the one of team triples being `ddog.output.HEADER`.
+    """
+    assert ddog.output.build_header(size=3) == ddog.output.HEADER
+    assert ddog.output.build_header(size=2) == 'Team pair           Count\n-------------------------'
+    assert ddog.output.build_header(size=4) == 'Team 4-tuple        Count\n-------------------------'
+
+
+def test_build_window_output():
+    """
+    Given the console output and an output file path,
+    When I pass them to the `ddog.output.build_window_output` function with the 1990-1999 window,
+    Then the console output should be returned unchanged and the years inserted before the extension of the file path.
+    """
+    console = ddog.constants.CONSOLE_SINK_NAME
+    assert ddog.output.build_window_output(output=console, min_year=1990, max_year=1999) == console
+    assert ddog.output.build_window_output(output='/path/to/results.txt', min_year=1990, max_year=1999) \
+        == '/path/to/results-1990-1999.txt'
+
+
+@pytest.mark.parametrize('output,exp_class,exp_path', [
+    ('/path/to/results.txt', ddog.output.LocalFileSystemSink, '/path/to/results.txt'),
+    ('/path/to/results.CSV', ddog.output.CsvSink, '/path/to/results.CSV'),
+    ('/path/to/results.ndjson', ddog.output.JsonLinesSink, '/path/to/results.ndjson'),
+    ('parquet:///path/to/results', ddog.output.ParquetSink, '/path/to/results'),
+    ('csv://results.out', ddog.output.CsvSink, 'results.out')])
+def test_sink_factory_build_sink(output, exp_class, exp_path):
+    """
+    Given output file paths with various extensions or URI schemes,
+    When I call the `build_sink` method of a `ddog.output.SinkFactory` object,
+    Then I should be returned a sink of the format given by the scheme, or else by the extension, writing to the path.
+    """
+    res = ddog.output.SinkFactory(output=output).build_sink()
+    assert type(res) is exp_class and res.path == exp_path
+
+
+def test_sink_factory_build_sink_unknown_scheme():
+    """
+    Given an output file path with an unsupported URI scheme,
+    When I call the `build_sink` method of a `ddog.output.SinkFactory` object,
+    Then a `ValueError` should be raised.
+    """
+    with pytest.raises(ValueError):
+        ddog.output.SinkFactory(output='s3://bucket/results.csv').build_sink()
+
+
+def test_machine_readable_sinks_write(tmp_path):
+    """
+    Given a list of (team triple, player count) tuples,
+    When I pass it to the `write` method of `ddog.output.CsvSink` and `ddog.output.JsonLinesSink` objects writing
+    batches of 2 triples,
+    Then the files should hold one row per triple in decreasing player count order, the teams being sorted by name.
+    """
+    triples = [(frozenset(['A', 'B', 'C']), 4), (frozenset(['F', 'E', 'D']), 1), (frozenset(['G', 'H', 'I']), 10)]
+    with mock.patch('ddog.output.FORMAT_BATCH_SIZE', 2):
+        ddog.output.CsvSink(path=str(tmp_path / 'results.csv')).write(triples=triples)
+        ddog.output.JsonLinesSink(path=str(tmp_path / 'results.jsonl')).write(triples=triples)
+
+    with open(str(tmp_path / 'results.csv'), newline='') as file_obj:
+        assert list(csv.reader(file_obj)) == [['team-1', 'team-2', 'team-3', 'count'], ['G', 'H', 'I', '10'],
+                                              ['A', 'B', 'C', '4'], ['D', 'E', 'F', '1']]
+    with open(str(tmp_path / 'results.jsonl')) as file_obj:
+        assert [json.loads(line) for line in file_obj] == [{'teams': ['G', 'H', 'I'], 'count': 10},
+                                                           {'teams': ['A', 'B', 'C'], 'count': 4},
+                                                           {'teams': ['D', 'E', 'F'], 'count': 1}]
+
+
+def test_parquet_sink_write(tmp_path):
+    """
+    Given a `ddog.processing.CombinationCounts` object of three team triples,
+    When I pass it to the `write` method of a `ddog.output.ParquetSink` object limited to the top 2 triples,
+    Then the Parquet file should hold the two triples with the highest player counts.
+    """
+    pyarrow_parquet = pytest.importorskip('pyarrow.parquet')
+    path = str(tmp_path / 'results.parquet')
+    combination_counts = ddog.processing.CombinationCounts(team_names=np.array(['A', 'B', 'C', 'D'], dtype=object),
+                                                           combinations=np.array([[0, 1, 2], [1, 2, 3], [0, 1, 3]]),
+                                                           counts=np.array([3, 7, 5]))
+    ddog.output.ParquetSink(path=path, top=2).write(triples=combination_counts)
+    assert pyarrow_parquet.read_table(path).to_pydict() == {'team-1': ['B', 'A'], 'team-2': ['C', 'B'],
+                                                            'team-3': ['D', 'D'], 'count': [7, 5]}
+
+
+def test_parquet_sink_write_row_groups(tmp_path):
+    """
+    Given a `ddog.processing.CombinationCounts` object of three team triples, a stand-in `pyarrow` package and batches
+    of two rows,
+    When I pass it to the `write` method of a `ddog.output.ParquetSink` object,
+    Then a table should be written as a row group for each batch, with one column per team of the batch and a count
+    column.
+    """
+    pyarrow = mock.MagicMock()
+    writer = pyarrow.parquet.ParquetWriter.return_value.__enter__.return_value
+    combination_counts = ddog.processing.CombinationCounts(team_names=np.array(['A', 'B', 'C', 'D'], dtype=object),
+                                                           combinations=np.array([[0, 1, 2], [1, 2, 3], [0, 1, 3]]),
+                                                           counts=np.array([3, 7, 5]))
+    with mock.patch.dict('sys.modules', {'pyarrow': pyarrow, 'pyarrow.parquet': pyarrow.parquet}), \
+            mock.patch('ddog.output.iter_combination_batches',
+                       new=functools.partial(ddog.output.iter_combination_batches, batch_size=2)):
+        ddog.output.ParquetSink(path=str(tmp_path / 'results.parquet')).write(triples=combination_counts)
+
+    assert writer.write_table.call_count == 2
+    assert [call[0][0] for call in pyarrow.array.call_args_list] == [('B', 'A'), ('C', 'B'), ('D', 'D'), [7, 5],
+                                                                    ('A',), ('B',), ('C',), [3]]
@@ -1,6 +1,13 @@
+import collections
+import itertools
+import unittest.mock as mock
+
+import ddog.constants as csts
 import ddog.processing
 
+import numpy as np
 import pandas as pd
+import pytest
 
 
 def test_triple_counter_compute():
@@ -37,3 +44,375 @@ def test_triple_counter_compute_no_triples():
     res = triple_counter.compute(df=df)
     exp = list()
     assert res == exp
+
+
+def test_triple_counter_compute_categorical():
+    """
+    Given a `pandas.DataFrame` with categorical columns and missing league names where only a single team triple has a
+    player count above the given threshold,
+    When I pass it to the `ddog.processing.TripleCounter.compute` method,
+    Then I should be returned a list of (team triple, player count) of length one, teams without league name being
+    identified by their trigram only.
+    """
+    df = pd.DataFrame(data={
+        'league': [None, 'NL', 'NL', None, None, 'NL', 'NL', None, 'NL', 'NL'],
+        'team': ['A', 'B', 'C', 'A', 'A', 'B', 'C', 'A', 'B', 'C'],
+        'player-id': ['Bob', 'Bob', 'Bob', 'Ben', 'Joe', 'Joe', 'Joe', 'Pete', 'Pete', 'Pete']
+    }).astype('category')
+
+    triple_counter = ddog.processing.TripleCounter(min_player_count=2)
+    res = triple_counter.compute(df=df)
+    exp = [(frozenset(['A', 'B-NL', 'C-NL']), 3)]
+    assert res == exp
+
+
+def list_player_teams(df, min_team_count=3):
+    """ Lists the teams of each player of a `pandas.DataFrame` of player appearances who played for at least
+    `min_team_count` teams.
+    """
+    return ddog.processing.decode_player_teams(*ddog.processing.encode_player_teams(df=df,
+                                                                                   min_team_count=min_team_count))
+
+
+def test_triple_counter_factory_build_counter():
+    """
+    Given a `ddog.processing.TripleCounterFactory` object set with the NumPy engine,
+    When I call its `build_counter` method,
+    Then I should be returned a `ddog.processing.NumpyTripleCounter` object.
+    """
+    factory = ddog.processing.TripleCounterFactory(engine=csts.NUMPY_ENGINE_NAME, min_player_count=2)
+    assert isinstance(factory.build_counter(), ddog.processing.NumpyTripleCounter)
+
+
+def test_triple_counter_factory_build_counter_apriori():
+    """
+    Given a `ddog.processing.TripleCounterFactory` object set with the Apriori engine and a combination size of 4,
+    When I call its `build_counter` method,
+    Then I should be returned a `ddog.processing.ComboCounter` object counting combinations of 4 teams.
+    """
+    factory = ddog.processing.TripleCounterFactory(engine=csts.APRIORI_ENGINE_NAME, min_player_count=2, size=4)
+    counter = factory.build_counter()
+    assert isinstance(counter, ddog.processing.ComboCounter) and counter.size == 4
+
+
+def test_numpy_triple_counter_compute(build_random_appearances):
+    """
+    Given a random `pandas.DataFrame` of player appearances,
+    When I pass it to the `compute` method of a `ddog.processing.NumpyTripleCounter` object set with a small batch size,
+    Then I should be returned the same (team triple, player count) tuples as with a `ddog.processing.TripleCounter`
+    object.
+    """
+    df = build_random_appearances(seed=0)
+    exp = ddog.processing.TripleCounter(min_player_count=3).compute(df=df)
+    res = ddog.processing.NumpyTripleCounter(min_player_count=3, batch_size=100).compute(df=df)
+    assert len(exp) > 0
+    assert dict(res) == dict(exp) and len(res) == len(exp)
+
+
+def test_numpy_triple_counter_compute_no_triples():
+    """
+    Given a `pandas.DataFrame` where no player played for three teams,
+    When I pass it to the `compute` method of a `ddog.processing.NumpyTripleCounter` object,
+    Then I should be returned an empty list.
+    """
+    df = pd.DataFrame(data={'league': 'NL', 'team': ['A', 'B', 'A'], 'player-id': ['Bob', 'Bob', 'Joe']})
+    res = ddog.processing.NumpyTripleCounter(min_player_count=1).compute(df=df)
+    assert res == list()
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+@pytest.mark.parametrize('min_player_count', [1, 3, 5])
+def test_sparse_triple_counter_compute(workers, min_player_count, build_random_appearances):
+    """
+    Given a random `pandas.DataFrame` of player appearances,
+    When I pass it to the `compute` method of a `ddog.processing.SparseTripleCounter` object,
+    Then I should be returned the same (team triple, player count) tuples as with a `ddog.processing.TripleCounter`
+    object.
+    """
+    pytest.importorskip('scipy.sparse')
+    df = build_random_appearances(seed=4)
+    exp = ddog.processing.TripleCounter(min_player_count=min_player_count).compute(df=df)
+    res = ddog.processing.SparseTripleCounter(min_player_count=min_player_count, workers=workers).compute(df=df)
+    assert len(exp) > 0
+    assert dict(res) == dict(exp) and len(res) == len(exp)
+
+
+def test_sparse_triple_counter_compute_no_triples():
+    """
+    Given a `pandas.DataFrame` where only a single team triple is played by a single player,
+    When I pass it to the `compute` method of a `ddog.processing.SparseTripleCounter` object with a minimum player count
+    of 2,
+    Then I should be returned an empty list.
+    """
+    pytest.importorskip('scipy.sparse')
+    df = pd.DataFrame(data={'league': 'NL', 'team': ['A', 'B', 'C', 'A'], 'player-id': ['Bob', 'Bob', 'Bob', 'Joe']})
+    res = ddog.processing.SparseTripleCounter(min_player_count=2).compute(df=df)
+    assert res == list()
+
+
+@pytest.mark.parametrize('workers,prune', [(1, False), (3, True)])
+@pytest.mark.parametrize('error,delta', [(csts.DEFAULT_SKETCH_ERROR, csts.DEFAULT_SKETCH_DELTA), (0.05, 0.5)])
+def test_sketch_triple_counter_compute(workers, prune, error, delta, build_random_appearances):
+    """
+    Given a random `pandas.DataFrame` of player appearances,
+    When I pass it to the `compute` method of a `ddog.processing.SketchTripleCounter` object set with a small batch
+    size, with either tight or loose error bounds,
+    Then I should be returned the same (team triple, player count) tuples as with a `ddog.processing.TripleCounter`
+    object.
+    """
+    df = build_random_appearances(seed=5)
+    exp = ddog.processing.TripleCounter(min_player_count=3).compute(df=df)
+    res = ddog.processing.SketchTripleCounter(min_player_count=3, workers=workers, prune=prune, batch_size=100,
+                                              error=error, delta=delta).compute(df=df)
+    assert len(exp) > 0
+    assert dict(res) == dict(exp) and len(res) == len(exp)
+
+
+def test_sketch_triple_counter_sketch_shard():
+    """
+    Given the team codes of two players who played for the same 4 teams,
+    When I pass them to the `_sketch_shard` method of a `ddog.processing.SketchTripleCounter` object,
+    Then each row of the returned sketch should count the 8 triples of the players, the counters of each of the 4
+    triples adding up to at least 2.
+    """
+    counter = ddog.processing.SketchTripleCounter(min_player_count=2, error=0.01, delta=0.1)
+    team_counts, team_codes = np.array([4, 4]), np.array([0, 1, 2, 3, 0, 1, 2, 3])
+    sketch = counter._sketch_shard(team_counts=team_counts, team_codes=team_codes, n_teams=4)
+    assert sketch.shape == (counter.depth, counter.width) == (3, 512)
+    assert sketch.sum(axis=1).tolist() == [8] * counter.depth
+    keys = np.array([(a * 4 + b) * 4 + c for a, b, c in itertools.combinations(range(4), 3)])
+    assert all((sketch[row][counter._hash(keys=keys, row=row)] >= 2).all() for row in range(counter.depth))
+
+
+def test_split_shards():
+    """
+    Given an array of item weights,
+    When I pass it to the `ddog.processing.split_shards` function asking for 3 shards,
+    Then I should be returned contiguous slices covering all the items with balanced total weights.
+    """
+    weights = np.array([8, 1, 1, 1, 1, 1, 1, 1, 1, 8])
+    res = ddog.processing.split_shards(weights=weights, shard_count=3)
+    assert res == [slice(0, 1), slice(1, 9), slice(9, 10)]
+
+
+@pytest.mark.parametrize('counter_class', [ddog.processing.TripleCounter, ddog.processing.NumpyTripleCounter])
+def test_triple_counter_compute_parallel(counter_class, build_random_appearances):
+    """
+    Given a random `pandas.DataFrame` of player appearances,
+    When I pass it to the `compute` method of a triple counter object set with 3 workers,
+    Then I should be returned the same (team triple, player count) tuples as with a single worker.
+    """
+    df = build_random_appearances(seed=1)
+    exp = counter_class(min_player_count=3).compute(df=df)
+    res = counter_class(min_player_count=3, workers=3).compute(df=df)
+    assert len(exp) > 0
+    assert dict(res) == dict(exp) and len(res) == len(exp)
+
+
+def test_prune_encoded_teams():
+    """
+    Given encoded player teams where teams A, B and C form frequent pairs (played together by at least two players) and
+    team D only forms a frequent pair with team A,
+    When I pass them to the `_prune_encoded_teams` method of a `ddog.processing.TripleCounter` object with a minimum
+    player count of 2,
+    Then team D should be removed from every player, the players left with less than three teams discarded and the
+    four frequent pairs flagged.
+    """
+    player_teams = pd.Series([['A', 'B', 'C', 'D'], ['A', 'B', 'C'], ['A', 'D', 'E']], index=['Bob', 'Joe', 'Pete'])
+    offsets, team_codes, team_names = ddog.processing.encode_team_lists(player_teams=player_teams)
+    triple_counter = ddog.processing.TripleCounter(min_player_count=2)
+    offsets, team_codes, frequent = triple_counter._prune_encoded_teams(offsets=offsets, team_codes=team_codes,
+                                                                        n_teams=len(team_names))
+    res = ddog.processing.decode_player_teams(offsets=offsets, team_codes=team_codes, team_names=team_names)
+    assert res == [['A', 'B', 'C'], ['A', 'B', 'C']]
+    first_codes, second_codes = np.nonzero(np.triu(frequent))
+    assert {frozenset(pair) for pair in zip(team_names[first_codes], team_names[second_codes])} \
+        == {frozenset('AB'), frozenset('AC'), frozenset('BC'), frozenset('AD')}
+
+
+def test_encode_player_teams():
+    """
+    Given a `pandas.DataFrame` of player appearances with duplicated records, a record without league and a record
+    without player ID,
+    When I pass it to the `ddog.processing.encode_player_teams` function,
+    Then I should be returned the sorted and deduplicated team codes of each player who played for at least two teams,
+    together with the team IDs.
+    """
+    df = pd.DataFrame(data={'team': ['BOS', 'NYA', 'BOS', 'BL1', 'NYA', 'PIT', 'PIT'],
+                            'league': ['AL', 'AL', 'AL', None, 'AL', 'NL', 'NL'],
+                            'player-id': ['bob', 'bob', 'bob', 'joe', 'joe', 'pete', None]})
+    offsets, team_codes, team_names = ddog.processing.encode_player_teams(df=df, min_team_count=2)
+    assert offsets.tolist() == [0, 2, 4]
+    assert [team_names[team_codes[start:stop]].tolist() for start, stop in zip(offsets[:-1], offsets[1:])] \
+        == [['BOS-AL', 'NYA-AL'], ['NYA-AL', 'BL1']]
+    assert sorted(team_names) == ['BL1', 'BOS-AL', 'NYA-AL', 'PIT-NL']
+
+
+def test_iter_candidate_triples():
+    """
+    Given a team list where the pair (B, D) is the only infrequent one,
+    When I pass it to the `_iter_candidate_triples` method of a `ddog.processing.TripleCounter` object,
+    Then I should only be returned the triples which do not contain both teams B and D.
+    """
+    teams = ['A', 'B', 'C', 'D']
+    frequent_pairs = {frozenset(pair) for pair in ['AB', 'AC', 'AD', 'BC', 'CD']}
+    res = list(ddog.processing.TripleCounter._iter_candidate_triples(teams=teams, frequent_pairs=frequent_pairs))
+    assert res == [('A', 'B', 'C'), ('A', 'C', 'D')]
+
+
+@pytest.mark.parametrize('counter_class', [ddog.processing.TripleCounter, ddog.processing.NumpyTripleCounter])
+@pytest.mark.parametrize('min_player_count', [1, 3, 5])
+def test_triple_counter_compute_prune(counter_class, min_player_count, build_random_appearances):
+    """
+    Given a random `pandas.DataFrame` of player appearances,
+    When I pass it to the `compute` method of a triple counter object set to prune teams,
+    Then I should be returned the same (team triple, player count) tuples as without pruning.
+    """
+    df = build_random_appearances(seed=2)
+    exp = counter_class(min_player_count=min_player_count).compute(df=df)
+    res = counter_class(min_player_count=min_player_count, prune=True).compute(df=df)
+    assert len(exp) > 0
+    assert dict(res) == dict(exp) and len(res) == len(exp)
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 4])
+@pytest.mark.parametrize('min_player_count', [1, 4, 8])
+def test_combo_counter_compute(size, min_player_count, build_random_appearances):
+    """
+    Given a random `pandas.DataFrame` of player appearances and a combination size,
+    When I pass it to the `compute` method of a `ddog.processing.ComboCounter` object,
+    Then I should be returned the same (team combination, player count) tuples as a brute-force count of all the
+    combinations of the teams of each player.
+    """
+    df = build_random_appearances(seed=3)
+    player_teams = list_player_teams(df=df, min_team_count=size)
+    counts = collections.Counter(frozenset(combination) for teams in player_teams
+                                 for combination in itertools.combinations(teams, r=size))
+    exp = {combination: count for combination, count in counts.items() if count >= min_player_count}
+
+    res = ddog.processing.ComboCounter(size=size, min_player_count=min_player_count, workers=2).compute(df=df)
+    assert len(exp) > 0
+    assert dict(res) == exp and len(res) == len(exp)
+
+
+def test_combo_counter_compute_triples(build_random_appearances):
+    """
+    Given a random `pandas.DataFrame` of player appearances,
+    When I pass it to the `compute` method of a `ddog.processing.ComboCounter` object set to count team triples,
+    Then I should be returned the same (team triple, player count) tuples as the `ddog.processing.TripleCounter` one.
+    """
+    df = build_random_appearances(seed=4)
+    exp = ddog.processing.TripleCounter(min_player_count=5).compute(df=df)
+    res = ddog.processing.ComboCounter(size=3, min_player_count=5).compute(df=df)
+    assert len(exp) > 0
+    assert dict(res) == dict(exp) and len(res) == len(exp)
+
+
+def test_triple_count_state_update(tmp_path, build_random_appearances):
+    """
+    Given three random `pandas.DataFrame` of player appearances standing for adjacent year ranges, the later ones
+    introducing new teams,
+    When I add them one at a time to a `ddog.processing.TripleCountState` object, saving and reloading it in between,
+    Then its triples should be the same as the ones computed from scratch by a `ddog.processing.TripleCounter` object.
+    """
+    path = str(tmp_path / 'state.npz')
+    dfs = [build_random_appearances(seed=5, n_teams=8), build_random_appearances(seed=6, n_teams=12),
+           build_random_appearances(seed=7, n_teams=70)]
+    ranges = [(1900, 1909), (1910, 1919), (1890, 1899)]
+    for i, (df, (min_year, max_year)) in enumerate(zip(dfs, ranges)):
+        state = ddog.processing.TripleCountState(path=path)
+        requested_years = [year for requested_range in ranges[:i + 1] for year in requested_range]
+        assert state.get_missing_ranges(min_year=min(requested_years), max_year=max(requested_years),
+                                        checksums=dict()) == [(min_year, max_year)]
+        state.update(df=df, min_year=min_year, max_year=max_year, checksums=dict())
+        state.save()
+
+    state = ddog.processing.TripleCountState(path=path)
+    assert (state.min_year, state.max_year) == (1890, 1919)
+    for min_player_count in [1, 4]:
+        exp = ddog.processing.TripleCounter(min_player_count=min_player_count).compute(df=pd.concat(dfs))
+        res = state.get_triples(min_player_count=min_player_count)
+        assert len(exp) > 0
+        assert dict(res) == dict(exp) and len(res) == len(exp)
+
+
+def test_triple_count_state_get_missing_ranges(tmp_path, build_random_appearances):
+    """
+    Given a `ddog.processing.TripleCountState` object covering the 1900-1910 range,
+    When I call its `get_missing_ranges` method,
+    Then I should be returned the ranges surrounding the covered one if the requested range includes it, and the whole
+    requested range (the state being emptied) if it does not or if the file of a covered year changed (or has an
+    unknown content).
+    """
+    state = ddog.processing.TripleCountState(path=str(tmp_path / 'state.npz'))
+    state.update(df=build_random_appearances(seed=8), min_year=1900, max_year=1910, checksums={1905: 'abc'})
+    assert state.get_missing_ranges(min_year=1890, max_year=1920, checksums={1905: 'abc'}) \
+        == [(1890, 1899), (1911, 1920)]
+    assert state.get_missing_ranges(min_year=1900, max_year=1910, checksums=dict()) == list()
+
+    assert state.get_missing_ranges(min_year=1900, max_year=1910, checksums={1905: 'def'}) == [(1900, 1910)]
+    assert state.min_year is None and len(state.keys) == 0
+
+    state.update(df=build_random_appearances(seed=8), min_year=1900, max_year=1910, checksums=dict())
+    assert state.get_missing_ranges(min_year=1905, max_year=1920, checksums=dict()) == [(1905, 1920)]
+    assert state.min_year is None
+
+    state.update(df=build_random_appearances(seed=8), min_year=1900, max_year=1910, checksums={1905: 'abc'})
+    assert state.get_missing_ranges(min_year=1900, max_year=1910, checksums={1905: None}) == [(1900, 1910)]
+    assert state.min_year is None
+
+
+@mock.patch('logging.warning')
+def test_triple_count_state_corrupted(mock_warning, tmp_path):
+    """
+    Given a corrupted state file,
+    When I instantiate a `ddog.processing.TripleCountState` object with its path,
+    Then a warning should be logged and the state should be empty.
+    """
+    path = tmp_path / 'state.npz'
+    path.write_bytes(b'corrupted')
+    state = ddog.processing.TripleCountState(path=str(path))
+    assert mock_warning.call_count == 1
+    assert state.min_year is None and state.get_triples(min_player_count=0) == list()
+
+
+def test_merge_counts():
+    """
+    Given sorted counts and sorted delta counts holding new keys, existing keys and a key the count of which cancels
+    out,
+    When I pass them to the `ddog.processing.merge_counts` function,
+    Then I should be returned the sorted merged counts without the cancelled key.
+    """
+    keys, counts = ddog.processing.merge_counts(keys=np.array([2, 5, 9]), counts=np.array([1, 3, 2]),
+                                                delta_keys=np.array([1, 5, 9, 12]),
+                                                delta_counts=np.array([4, -3, 1, 1]))
+    assert keys.tolist() == [1, 2, 9, 12]
+    assert counts.tolist() == [4, 1, 3, 1]
+
+
+def test_player_teams_accumulator(build_random_appearances):
+    """
+    Given two random `pandas.DataFrame` of player appearances, dictionary-encoded as by `ddog.source.read_encoded_file`,
+    When I add them one at a time to a `ddog.processing.PlayerTeamsAccumulator` object and count the triples of its
+    encoded player teams with a `ddog.processing.TripleCounter` object,
+    Then its player teams should be the same as the ones listed from the concatenated DataFrames, and so should be the
+    triples.
+    """
+    dfs = [build_random_appearances(seed=9, n_teams=8), build_random_appearances(seed=10, n_teams=70)]
+    accumulator = ddog.processing.PlayerTeamsAccumulator()
+    for df in dfs:
+        encoded_columns = dict()
+        for column in ['team', 'league', 'player-id']:
+            codes, categories = pd.factorize(df[column])
+            encoded_columns[column] = (codes.astype(np.int32), np.asarray(categories, dtype=str))
+        accumulator.add(encoded_columns=encoded_columns)
+
+    exp = list_player_teams(df=pd.concat(dfs))
+    res = accumulator.get_encoded_teams(min_team_count=3)
+    assert sorted(sorted(teams) for teams in ddog.processing.decode_player_teams(*res)) \
+        == sorted(sorted(teams) for teams in exp)
+    assert len(accumulator.get_encoded_teams(min_team_count=100)[0]) == 1
+
+    counter = ddog.processing.TripleCounter(min_player_count=2)
+    assert dict(counter.count_encoded(*res)) == dict(counter.compute(df=pd.concat(dfs)))
+
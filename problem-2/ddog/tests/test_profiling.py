@@ -0,0 +1,98 @@
+import json
+import pstats
+import tracemalloc
+import unittest.mock as mock
+
+import ddog.profiling
+
+
+def test_stage_recorder_stage():
+    """
+    Given a `ddog.profiling.StageRecorder` object,
+    When I record a stage nesting another one, adding counters within and outside of the stages,
+    Then the records of both stages should be listed in the order in which they were entered, the nested stage being
+    named after the enclosing one, each with its own counters, a wall time at least as large as its CPU time share and
+    a peak memory at least as large as the one of the nested stage.
+    """
+    recorder = ddog.profiling.StageRecorder()
+    recorder.count(rows=5)
+    with recorder.stage(name='load') as record:
+        recorder.count(rows=10)
+        with recorder.stage(name='parse'):
+            recorder.count(files=2)
+            recorder.count(files=1)
+        recorder.count(rows=2)
+
+    assert [stage['stage'] for stage in recorder.stages] == ['load', 'load/parse']
+    load_record, parse_record = recorder.stages
+    assert load_record is record
+    assert load_record['rows'] == 12 and 'files' not in load_record
+    assert parse_record['files'] == 3 and 'rows' not in parse_record
+    assert load_record['wall_time'] >= parse_record['wall_time'] >= 0
+    assert load_record['peak_rss'] >= parse_record['peak_rss'] > 0
+
+
+@mock.patch('ddog.profiling.resource', new=None)
+@mock.patch('sys.platform', new='win32')
+def test_stage_recorder_stage_without_resource():
+    """
+    Given a `ddog.profiling.StageRecorder` object on a platform where resident set sizes cannot be measured (no
+    `resource` module and no */proc* file system, Ex: Windows),
+    When I record a stage, first without and then with memory allocations traced,
+    Then the peak memory of the first stage and of the process should be `None` and the one of the second stage should
+    fall back to the peak traced memory.
+    """
+    recorder = ddog.profiling.StageRecorder()
+    with recorder.stage(name='load'):
+        pass
+    tracemalloc.start()
+    try:
+        with recorder.stage(name='count'):
+            data = list(range(10000))
+    finally:
+        tracemalloc.stop()
+
+    assert recorder.stages[0]['peak_rss'] is None
+    assert recorder.stages[1]['peak_rss'] > 0 and len(data) == 10000
+    summary = recorder.get_summary()
+    assert summary['children_peak_rss'] is None
+    assert summary['peak_rss'] == recorder.stages[1]['peak_rss']
+
+
+@mock.patch('ddog.profiling.RECORDER', new_callable=ddog.profiling.StageRecorder)
+def test_write_summary(_, tmp_path):
+    """
+    Given the module's `ddog.profiling.StageRecorder` object with a recorded stage,
+    When I call the `ddog.profiling.write_summary` function with the path of a JSON file,
+    Then the file should hold the records of the stages and the peak memory of the process.
+    """
+    with ddog.profiling.stage(name='count'):
+        ddog.profiling.count(combinations=3)
+    path = str(tmp_path / 'summary.json')
+    ddog.profiling.write_summary(path=path)
+
+    with open(path) as file_obj:
+        summary = json.load(file_obj)
+    assert [(stage['stage'], stage['combinations']) for stage in summary['stages']] == [('count', 3)]
+    assert summary['peak_rss'] > 0
+
+
+@mock.patch('ddog.profiling.RECORDER', new_callable=ddog.profiling.StageRecorder)
+def test_profile(_, tmp_path):
+    """
+    Given a path,
+    When I run code within the `ddog.profiling.profile` context manager,
+    Then a cProfile statistics file should be written to the path together with a text report, and memory allocations
+    should no longer be traced.
+    """
+    path = str(tmp_path / 'run.prof')
+    with ddog.profiling.profile(path=path):
+        with ddog.profiling.stage(name='count'):
+            sorted(range(1000), key=str)
+
+    assert pstats.Stats(path).total_calls > 0
+    with open(path + '.txt') as file_obj:
+        report = file_obj.read()
+    assert report.startswith('Peak traced memory')
+    assert 'Top allocation sites' in report
+    assert not tracemalloc.is_tracing()
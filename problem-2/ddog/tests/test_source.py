@@ -1,6 +1,17 @@
+import gzip
+import hashlib
+import http.server
+import os
 import re
+import socketserver
+import threading
 import unittest.mock as mock
 
+import numpy as np
+import pandas as pd
+import pytest
+
+import ddog.constants as csts
 import ddog.source
 
 
@@ -88,3 +99,486 @@ def test_get_missing_years(mock_listdir):
     exp = {2008, 2009, 2010}
     assert res == exp
 
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """ Request handler of the local stand-in HTTP server. Serves the `files` class attribute (mapping URL paths to
+    file contents) using the `{year}/{year}-0,000` layout of the actual source and fails the first requests listed in
+    the `failures` class attribute (mapping URL paths to the number of requests to be answered with a 503). Paths listed
+    in the `truncations` class attribute are always answered with a truncated body. Each file is served with an ETag
+    header (the SHA-256 checksum of its content) against which conditional requests are answered.
+    """
+    protocol_version = 'HTTP/1.1'
+    files = dict()
+    failures = dict()
+    truncations = set()
+    client_ports = set()
+
+    def do_GET(self):
+        self.client_ports.add(self.client_address[1])
+        if self.path in self.truncations:
+            body = self.files[self.path]
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body) + 10))
+            self.end_headers()
+            self.wfile.write(body)
+            self.close_connection = True
+        elif self.failures.get(self.path, 0):
+            self.failures[self.path] -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path in self.files:
+            body = self.files[self.path]
+            etag = '"{}"'.format(hashlib.sha256(body).hexdigest())
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    """ Starts a local stand-in HTTP server serving baseball-statistics files for years 2000 to 2004 and yields its
+    formatted source URL.
+    """
+    StandInHandler.files = {'/{year:d}/{year:d}-0,000'.format(year=year): '{year:d},BOS,AL,bob\n'.format(year=year)
+                            .encode() for year in range(2000, 2005)}
+    StandInHandler.failures = dict()
+    StandInHandler.truncations = set()
+    StandInHandler.client_ports = set()
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:{port:d}/{{year:d}}/{{year:d}}-0,000'.format(port=server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def build_downloader_config(formatted_url):
+    """ Builds a minimal configuration object for `ddog.source.BaseballFilesDownloader` objects.
+    """
+    return {csts.DEFAULT_CONF_SECTION: {csts.CONF_TMP_FILE_FMT_NAME: 'baseball-{year:d}.csv',
+                                        csts.CONF_FMT_SOURCE_URL: formatted_url,
+                                        csts.CONF_DOWNLOAD_WORKERS: '4',
+                                        csts.CONF_DOWNLOAD_MAX_RETRIES: '2',
+                                        csts.CONF_DOWNLOAD_BACKOFF_FACTOR: '0',
+                                        csts.CONF_DOWNLOAD_TIMEOUT: '5',
+                                        csts.CONF_DOWNLOAD_CHUNK_SIZE: '4',
+                                        csts.CONF_MANIFEST_FILE_NAME: 'manifest.json',
+                                        csts.CONF_STORAGE_CODEC: csts.NO_CODEC_NAME}}
+
+
+def test_downloader_download(stand_in_server, tmp_path):
+    """
+    Given a local stand-in HTTP server serving files for years 2000 to 2004 and failing once the first request for year
+    2001 with a transient error,
+    When I call the `download` method of a `ddog.source.BaseballFilesDownloader` object for years 2000 to 2005,
+    Then the files of years 2000 to 2004 should be written to the local directory with the served content and the
+    missing year 2005 should be skipped.
+    """
+    StandInHandler.failures['/2001/2001-0,000'] = 1
+    config = build_downloader_config(formatted_url=stand_in_server)
+    downloader = ddog.source.BaseballFilesDownloader(tmp_dir_path=str(tmp_path), config=config)
+    downloader.download(years=range(2000, 2006))
+    assert sorted(os.listdir(str(tmp_path))) == ['baseball-{:d}.csv'.format(year) for year in range(2000, 2005)] \
+        + ['manifest.json']
+    assert (tmp_path / 'baseball-2001.csv').read_bytes() == b'2001,BOS,AL,bob\n'
+
+
+def test_downloader_download_give_up(stand_in_server, tmp_path):
+    """
+    Given a local stand-in HTTP server failing the requests for year 2000 more times than the allowed number of retries,
+    When I call the `download` method of a `ddog.source.BaseballFilesDownloader` object for year 2000,
+    Then no file should be written to the local directory.
+    """
+    StandInHandler.failures['/2000/2000-0,000'] = 3
+    config = build_downloader_config(formatted_url=stand_in_server)
+    downloader = ddog.source.BaseballFilesDownloader(tmp_dir_path=str(tmp_path), config=config)
+    downloader.download(years=[2000])
+    assert os.listdir(str(tmp_path)) == list()
+
+
+def test_downloader_download_manifest(stand_in_server, tmp_path):
+    """
+    Given a local stand-in HTTP server serving files for years 2000 to 2004,
+    When I call the `download` method of a `ddog.source.BaseballFilesDownloader` object for year 2000,
+    Then the manifest file should record the name, size, modification time and SHA-256 checksum of the downloaded file.
+    """
+    config = build_downloader_config(formatted_url=stand_in_server)
+    downloader = ddog.source.BaseballFilesDownloader(tmp_dir_path=str(tmp_path), config=config)
+    downloader.download(years=[2000])
+    manifest = ddog.source.DownloadManifest(path=str(tmp_path / 'manifest.json'))
+    sha256 = hashlib.sha256(b'2000,BOS,AL,bob\n').hexdigest()
+    exp = {'file_name': 'baseball-2000.csv',
+           'size': 16,
+           'sha256': sha256,
+           'codec': csts.NO_CODEC_NAME,
+           'etag': '"{}"'.format(sha256),
+           'last_modified': None}
+    res = manifest.get(year=2000)
+    assert res.pop('last_used') > 0
+    assert res.pop('mtime_ns') == os.stat(str(tmp_path / 'baseball-2000.csv')).st_mtime_ns
+    assert res == exp
+
+
+def test_downloader_download_conditional(stand_in_server, tmp_path):
+    """
+    Given a local stand-in HTTP server serving files for years 2000 to 2004 and a local directory where these files
+    have already been downloaded,
+    When the file of year 2000 is modified on the server and I call the `download` method of a
+    `ddog.source.BaseballFilesDownloader` object for years 2000 and 2001 again,
+    Then the file of year 2000 should be downloaded again while the file of year 2001 should be left untouched.
+    """
+    config = build_downloader_config(formatted_url=stand_in_server)
+    downloader = ddog.source.BaseballFilesDownloader(tmp_dir_path=str(tmp_path), config=config)
+    downloader.download(years=[2000, 2001])
+    StandInHandler.files['/2000/2000-0,000'] = b'2000,NYA,AL,joe\n'
+    mtime_2001 = os.stat(str(tmp_path / 'baseball-2001.csv')).st_mtime_ns
+    with mock.patch.object(ddog.source.BaseballFilesDownloader, '_write_response',
+                           wraps=downloader._write_response) as mock_write_response:
+        downloader.download(years=[2000, 2001])
+    assert mock_write_response.call_count == 1
+    assert (tmp_path / 'baseball-2000.csv').read_bytes() == b'2000,NYA,AL,joe\n'
+    assert os.stat(str(tmp_path / 'baseball-2001.csv')).st_mtime_ns == mtime_2001
+
+
+def test_downloader_download_truncated(stand_in_server, tmp_path):
+    """
+    Given a local stand-in HTTP server always sending a truncated body for year 2000,
+    When I call the `download` method of a `ddog.source.BaseballFilesDownloader` object for year 2000,
+    Then neither the file nor any temporary file nor any manifest entry should be written to the local directory.
+    """
+    StandInHandler.truncations.add('/2000/2000-0,000')
+    config = build_downloader_config(formatted_url=stand_in_server)
+    downloader = ddog.source.BaseballFilesDownloader(tmp_dir_path=str(tmp_path), config=config)
+    downloader.download(years=[2000])
+    assert os.listdir(str(tmp_path)) == list()
+
+
+@pytest.mark.parametrize('codec', [csts.GZIP_CODEC_NAME, csts.ZSTD_CODEC_NAME])
+def test_downloader_download_compressed(stand_in_server, tmp_path, codec):
+    """
+    Given a local stand-in HTTP server serving files for years 2000 to 2004 and a local directory where the file of
+    year 2000 has already been downloaded uncompressed,
+    When I call the `download` method of a `ddog.source.BaseballFilesDownloader` object storing files with a codec for
+    years 2000 and 2001 after the file of year 2000 was modified on the server,
+    Then both files should be stored compressed (their name ending with the extension of the codec) and decompress to
+    the served content, the uncompressed file of year 2000 should be removed and the manifest should record the size of
+    the compressed files and the checksum of the served content.
+    """
+    if codec == csts.ZSTD_CODEC_NAME:
+        pytest.importorskip('zstandard')
+    config = build_downloader_config(formatted_url=stand_in_server)
+    ddog.source.BaseballFilesDownloader(tmp_dir_path=str(tmp_path), config=config).download(years=[2000])
+    StandInHandler.files['/2000/2000-0,000'] = b'2000,NYA,AL,joe\n'
+    config[csts.DEFAULT_CONF_SECTION][csts.CONF_STORAGE_CODEC] = codec
+    ddog.source.BaseballFilesDownloader(tmp_dir_path=str(tmp_path), config=config).download(years=[2000, 2001])
+
+    extension = ddog.source.CODEC_EXTENSIONS[codec]
+    assert sorted(os.listdir(str(tmp_path))) == ['baseball-2000.csv' + extension, 'baseball-2001.csv' + extension,
+                                                 'manifest.json']
+    with ddog.source.open_stored_file(file_name=str(tmp_path / ('baseball-2000.csv' + extension))) as file_obj:
+        assert file_obj.read() == b'2000,NYA,AL,joe\n'
+    entry = ddog.source.DownloadManifest(path=str(tmp_path / 'manifest.json')).get(year=2000)
+    assert entry['file_name'] == 'baseball-2000.csv' + extension and entry['codec'] == codec
+    assert entry['size'] == os.path.getsize(str(tmp_path / entry['file_name']))
+    assert entry['sha256'] == hashlib.sha256(b'2000,NYA,AL,joe\n').hexdigest()
+
+
+def test_downloader_zstd_missing_package(tmp_path):
+    """
+    Given a configuration storing files compressed with zstd, the `zstandard` package not being installed,
+    When I initialize a `ddog.source.BaseballFilesDownloader` object,
+    Then an `ImportError` should be raised before any file is downloaded.
+    """
+    config = build_downloader_config(formatted_url='http://127.0.0.1:1/{year:d}')
+    config[csts.DEFAULT_CONF_SECTION][csts.CONF_STORAGE_CODEC] = csts.ZSTD_CODEC_NAME
+    with mock.patch.dict('sys.modules', {'zstandard': None}), pytest.raises(ImportError):
+        ddog.source.BaseballFilesDownloader(tmp_dir_path=str(tmp_path), config=config)
+
+
+def test_open_atomic_file(tmp_path):
+    """
+    Given an existing file,
+    When I rewrite it with the `ddog.source.open_atomic_file` context manager, once successfully and once raising an
+    exception while writing,
+    Then the file should hold the new content after the first write, be left untouched by the failed one, and no
+    temporary file should be left in its directory.
+    """
+    path = tmp_path / 'state.bin'
+    path.write_bytes(b'old')
+    with ddog.source.open_atomic_file(path=str(path)) as file_obj:
+        file_obj.write(b'new')
+    assert path.read_bytes() == b'new'
+
+    with pytest.raises(RuntimeError), ddog.source.open_atomic_file(path=str(path)) as file_obj:
+        file_obj.write(b'partial')
+        raise RuntimeError
+    assert path.read_bytes() == b'new'
+    assert os.listdir(str(tmp_path)) == ['state.bin']
+
+
+@pytest.mark.parametrize('file_name, exp', [('baseball-2000.csv', ('baseball-2000.csv', csts.NO_CODEC_NAME)),
+                                            ('baseball-2000.csv.gz', ('baseball-2000.csv', csts.GZIP_CODEC_NAME)),
+                                            ('baseball-2000.csv.zst', ('baseball-2000.csv', csts.ZSTD_CODEC_NAME))])
+def test_split_codec_extension(file_name, exp):
+    """
+    Given the name of a baseball-statistics file, stored uncompressed or compressed with gzip or zstd,
+    When I pass it to the `ddog.source.split_codec_extension` function,
+    Then I should be returned its name without the extension of its codec and the name of its codec.
+    """
+    assert ddog.source.split_codec_extension(file_name=file_name) == exp
+
+
+def test_get_missing_years_invalid_manifest(tmp_path):
+    """
+    Given a temporary directory containing baseball-statistics files for years 2000 and 2001, the first one matching
+    its manifest entry and the second one being truncated,
+    When I call the `_get_missing_years` method of a `ddog.source.BaseballFilesLoader` object for years 2000 to 2001,
+    Then I should be returned a set containing the year of the truncated file.
+    """
+    manifest = ddog.source.DownloadManifest(path=str(tmp_path / 'manifest.json'))
+    for year in (2000, 2001):
+        (tmp_path / 'baseball-{:d}.csv'.format(year)).write_bytes(b'0123456789'[:10 - 5 * (year - 2000)])
+        manifest.record(year=year, file_name='baseball-{:d}.csv'.format(year), size=10, sha256='')
+    mock_loader = mock.Mock(min_year=2000,
+                            max_year=2001,
+                            tmp_dir_path=str(tmp_path),
+                            regex=re.compile('baseball-([0-9]{4})\\.csv'),
+                            manifest=manifest)
+    res = ddog.source.BaseballFilesLoader._get_missing_years(self=mock_loader)
+    assert res == {2001}
+
+
+@pytest.mark.parametrize('content, valid', [(b'2000,BOS,AL,bob\n', True), (b'2000,BOS,AL,joe\n', False)])
+def test_manifest_is_valid_modified(tmp_path, content, valid):
+    """
+    Given a manifest file with an entry for year 2000 and its file, rewritten afterwards (thus with another modification
+    time) with either the same content or a corrupted content of the same size,
+    When I call the `is_valid` method of a `ddog.source.DownloadManifest` object reading it,
+    Then the file should only be valid if its content still matches the recorded checksum, in which case its new
+    modification time should be recorded, and the checksum of an invalid file should be returned as `None` by the
+    `get_checksums` method when asked for valid files only.
+    """
+    path = tmp_path / 'baseball-2000.csv'
+    path.write_bytes(b'2000,BOS,AL,bob\n')
+    manifest = ddog.source.DownloadManifest(path=str(tmp_path / 'manifest.json'))
+    manifest.record(year=2000, file_name='baseball-2000.csv', size=16,
+                    sha256=hashlib.sha256(b'2000,BOS,AL,bob\n').hexdigest())
+    path.write_bytes(content)
+    os.utime(str(path), ns=(0, 0))
+    assert manifest.is_valid(year=2000, path=str(path)) is valid
+    assert (manifest.get(year=2000)['mtime_ns'] == 0) is valid
+    assert (manifest.get_checksums(valid_only=True)[2000] is not None) is valid
+
+
+def test_manifest_get_checksums(tmp_path):
+    """
+    Given a manifest file with entries for years 2000 and 2001,
+    When I call the `get_checksums` method of a `ddog.source.DownloadManifest` object reading it,
+    Then I should be returned a dictionary mapping each year (as an integer) to the checksum of its file.
+    """
+    path = str(tmp_path / 'manifest.json')
+    for year in (2000, 2001):
+        ddog.source.DownloadManifest(path=path).record(year=year, file_name='baseball-{:d}.csv'.format(year), size=10,
+                                                       sha256='checksum-{:d}'.format(year))
+    res = ddog.source.DownloadManifest(path=path).get_checksums()
+    assert res == {2000: 'checksum-2000', 2001: 'checksum-2001'}
+
+
+def test_downloader_download_keep_alive(stand_in_server, tmp_path):
+    """
+    Given a local stand-in HTTP server serving files for years 2000 to 2004,
+    When I call the `download` method of a `ddog.source.BaseballFilesDownloader` object set with a single worker,
+    Then all the files should be downloaded through a single connection.
+    """
+    config = build_downloader_config(formatted_url=stand_in_server)
+    downloader = ddog.source.BaseballFilesDownloader(tmp_dir_path=str(tmp_path), config=config, workers=1)
+    downloader.download(years=range(2000, 2005))
+    assert len(os.listdir(str(tmp_path))) == 6
+    assert len(StandInHandler.client_ports) == 1
+
+
+def test_evict_files(tmp_path):
+    """
+    Given a temporary directory containing baseball-statistics files of 10 bytes each for years 2000 to 2003, year 2000
+    being the least recently used,
+    When I call the `_evict_files` method of a `ddog.source.BaseballFilesLoader` object requesting year 2003 and
+    limited to 20 bytes,
+    Then the files of years 2000 and 2001 (and their parsed cache files) should be removed from the directory and from
+    the manifest.
+    """
+    manifest = ddog.source.DownloadManifest(path=str(tmp_path / 'manifest.json'))
+    for year in (2003, 2000, 2001, 2002):
+        (tmp_path / 'baseball-{:d}.csv'.format(year)).write_bytes(b'0123456789')
+        (tmp_path / 'baseball-{:d}.npz'.format(year)).write_bytes(b'')
+        manifest.record(year=year, file_name='baseball-{:d}.csv'.format(year), size=10, sha256='')
+    manifest.touch(years=[2002])
+    mock_loader = mock.Mock(min_year=2003, max_year=2003, tmp_dir_path=str(tmp_path), manifest=manifest,
+                            max_cache_size=20, parsed_cache_formatted_name='baseball-{year:d}.npz',
+                            derived_file_names=list())
+    ddog.source.BaseballFilesLoader._evict_files(self=mock_loader)
+    assert sorted(os.listdir(str(tmp_path))) == ['baseball-2002.csv', 'baseball-2002.npz', 'baseball-2003.csv',
+                                                 'baseball-2003.npz', 'manifest.json']
+    assert sorted(manifest.entries) == ['2002', '2003']
+
+
+def test_evict_files_derived_files(tmp_path):
+    """
+    Given a temporary directory containing baseball-statistics files and parsed cache files of 10 bytes each for years
+    2000 to 2003 (year 2000 being the least recently used) and a state file of 10 bytes,
+    When I call the `_evict_files` method of a `ddog.source.BaseballFilesLoader` object requesting year 2003 and
+    limited to 50 bytes,
+    Then the parsed cache files and the state file should count towards the limit, so that the files of years 2000 and
+    2001 should be removed while the state file should be kept.
+    """
+    manifest = ddog.source.DownloadManifest(path=str(tmp_path / 'manifest.json'))
+    for year in (2003, 2000, 2001, 2002):
+        (tmp_path / 'baseball-{:d}.csv'.format(year)).write_bytes(b'0123456789')
+        (tmp_path / 'baseball-{:d}.npz'.format(year)).write_bytes(b'0123456789')
+        manifest.record(year=year, file_name='baseball-{:d}.csv'.format(year), size=10, sha256='')
+    (tmp_path / 'triple-state.npz').write_bytes(b'0123456789')
+    manifest.touch(years=[2002])
+    mock_loader = mock.Mock(min_year=2003, max_year=2003, tmp_dir_path=str(tmp_path), manifest=manifest,
+                            max_cache_size=50, parsed_cache_formatted_name='baseball-{year:d}.npz',
+                            derived_file_names=['triple-state.npz', 'team-index.npz'])
+    ddog.source.BaseballFilesLoader._evict_files(self=mock_loader)
+    assert sorted(os.listdir(str(tmp_path))) == ['baseball-2002.csv', 'baseball-2002.npz', 'baseball-2003.csv',
+                                                 'baseball-2003.npz', 'manifest.json', 'triple-state.npz']
+
+
+def test_loader_load(tmp_path):
+    """
+    Given a temporary directory containing valid baseball-statistics files for years 2000 and 2001,
+    When I call the `load` method of a `ddog.source.BaseballFilesLoader` object set with two load workers,
+    Then I should be returned a single DataFrame gathering the content of both files in year order, with categorical
+    'team', 'league' and 'player-id' columns, and a parsed cache file should be written for each year.
+    """
+    manifest = ddog.source.DownloadManifest(path=str(tmp_path / 'manifest.json'))
+    contents = {2000: b'2000,BOS,AL,bob,1\n2000,BL1,,joe,2\n', 2001: b'2001,PIT,NL,bob,3\n'}
+    for year, content in contents.items():
+        (tmp_path / 'baseball-{:d}.csv'.format(year)).write_bytes(content)
+        manifest.record(year=year, file_name='baseball-{:d}.csv'.format(year), size=len(content), sha256='')
+    config = {csts.DEFAULT_CONF_SECTION: {csts.CONF_TMP_FILE_FMT_NAME: 'baseball-{year:d}.csv',
+                                          csts.CONF_PARSED_CACHE_FMT_NAME: 'baseball-{year:d}.npz',
+                                          csts.CONF_TMP_FILE_REGEX: 'baseball-([0-9]{4})\\.csv',
+                                          csts.CONF_MANIFEST_FILE_NAME: 'manifest.json',
+                                          csts.CONF_MAX_CACHE_SIZE: '0',
+                                          csts.CONF_LOAD_WORKERS: '2'}}
+    loader = ddog.source.BaseballFilesLoader(tmp_dir_path=str(tmp_path), config=config, min_year=2000, max_year=2001)
+    res = loader.load()
+    assert res.team.tolist() == ['BOS', 'BL1', 'PIT']
+    assert res['player-id'].tolist() == ['bob', 'joe', 'bob']
+    assert res.league.isna().tolist() == [False, True, False]
+    assert all(isinstance(dtype, pd.CategoricalDtype) for dtype in res.dtypes)
+    assert os.path.exists(str(tmp_path / 'baseball-2000.npz')) and os.path.exists(str(tmp_path / 'baseball-2001.npz'))
+
+
+def test_loader_load_compressed(stand_in_server, tmp_path):
+    """
+    Given a local stand-in HTTP server serving files for years 2000 to 2004 and a temporary directory already containing
+    a valid gzip-compressed file for year 2000,
+    When I call the `load` method of a `ddog.source.BaseballFilesLoader` object storing files compressed with gzip for
+    years 2000 to 2002,
+    Then the compressed file of year 2000 should not be considered missing and I should be returned the content of the
+    three files, the missing ones being downloaded compressed.
+    """
+    manifest = ddog.source.DownloadManifest(path=str(tmp_path / 'manifest.json'))
+    with gzip.open(str(tmp_path / 'baseball-2000.csv.gz'), 'wb') as file_obj:
+        file_obj.write(b'2000,PIT,NL,joe\n')
+    manifest.record(year=2000, file_name='baseball-2000.csv.gz', sha256='',
+                    size=os.path.getsize(str(tmp_path / 'baseball-2000.csv.gz')))
+    config = build_downloader_config(formatted_url=stand_in_server)
+    config[csts.DEFAULT_CONF_SECTION].update({csts.CONF_PARSED_CACHE_FMT_NAME: 'baseball-{year:d}.npz',
+                                              csts.CONF_TMP_FILE_REGEX: 'baseball-([0-9]{4})\\.csv',
+                                              csts.CONF_MAX_CACHE_SIZE: '0',
+                                              csts.CONF_LOAD_WORKERS: '1',
+                                              csts.CONF_STORAGE_CODEC: csts.GZIP_CODEC_NAME})
+    loader = ddog.source.BaseballFilesLoader(tmp_dir_path=str(tmp_path), config=config, min_year=2000, max_year=2002)
+    assert loader._get_missing_years() == {2001, 2002}
+    res = loader.load()
+    assert res.team.tolist() == ['PIT', 'BOS', 'BOS'] and res['player-id'].tolist() == ['joe', 'bob', 'bob']
+    assert os.path.exists(str(tmp_path / 'baseball-2002.csv.gz'))
+
+
+def test_loader_iter_encoded_files(stand_in_server, tmp_path):
+    """
+    Given a local stand-in HTTP server serving files for years 2000 to 2004 and a temporary directory already containing
+    a valid file for year 2000,
+    When I iterate over the `iter_encoded_files` method of a `ddog.source.BaseballFilesLoader` object for years 2000 to
+    2003,
+    Then I should be generated the encoded columns of each year exactly once, the file of year 2000 being read from the
+    temporary directory and the other ones downloaded.
+    """
+    manifest = ddog.source.DownloadManifest(path=str(tmp_path / 'manifest.json'))
+    (tmp_path / 'baseball-2000.csv').write_bytes(b'2000,PIT,NL,joe\n')
+    manifest.record(year=2000, file_name='baseball-2000.csv', size=16, sha256='')
+    config = build_downloader_config(formatted_url=stand_in_server)
+    config[csts.DEFAULT_CONF_SECTION].update({csts.CONF_PARSED_CACHE_FMT_NAME: 'baseball-{year:d}.npz',
+                                              csts.CONF_TMP_FILE_REGEX: 'baseball-([0-9]{4})\\.csv',
+                                              csts.CONF_MAX_CACHE_SIZE: '0',
+                                              csts.CONF_LOAD_WORKERS: '1'})
+    loader = ddog.source.BaseballFilesLoader(tmp_dir_path=str(tmp_path), config=config, min_year=2000, max_year=2003)
+    res = dict(loader.iter_encoded_files())
+    assert sorted(res) == [2000, 2001, 2002, 2003]
+    assert res[2000]['team'][1].tolist() == ['PIT'] and res[2002]['team'][1].tolist() == ['BOS']
+    assert not os.path.exists(str(tmp_path / 'baseball-2004.csv'))
+
+
+@mock.patch('ddog.source.read_baseball_file', wraps=ddog.source.read_baseball_file)
+def test_read_encoded_file(mock_read_baseball_file, tmp_path):
+    """
+    Given a baseball-statistics CSV file,
+    When I call the `ddog.source.read_encoded_file` function twice, then once more after the CSV file was modified,
+    Then the CSV file should only be parsed on the first and third calls and the returned encoded columns should match
+    the content of the CSV file.
+    """
+    file_name, cache_file_name = str(tmp_path / 'baseball-2000.csv'), str(tmp_path / 'baseball-2000.npz')
+    (tmp_path / 'baseball-2000.csv').write_bytes(b'2000,BOS,AL,bob\n2000,BL1,,bob\n')
+    ddog.source.read_encoded_file(file_name=file_name, cache_file_name=cache_file_name)
+    res = ddog.source.read_encoded_file(file_name=file_name, cache_file_name=cache_file_name)
+    assert mock_read_baseball_file.call_count == 1
+    assert res['team'][1][res['team'][0]].tolist() == ['BOS', 'BL1']
+    assert res['league'][0].tolist() == [0, -1]
+    assert res['player-id'][0].tolist() == [0, 0]
+
+    (tmp_path / 'baseball-2000.csv').write_bytes(b'2000,PIT,NL,joe\n')
+    res = ddog.source.read_encoded_file(file_name=file_name, cache_file_name=cache_file_name)
+    assert mock_read_baseball_file.call_count == 2
+    assert res['team'][1][res['team'][0]].tolist() == ['PIT']
+
+
+def test_concat_encoded_files():
+    """
+    Given two sets of dictionary-encoded columns with different dictionaries, the 'league' column of the second one
+    only holding missing values,
+    When I pass them to the `ddog.source.concat_encoded_files` function,
+    Then I should be returned a DataFrame with categorical columns holding the decoded values of both sets.
+    """
+    encoded_files = [
+        {'team': (np.array([0, 1]), np.array(['BOS', 'PIT'])),
+         'league': (np.array([0, -1]), np.array(['AL'])),
+         'player-id': (np.array([0, 0]), np.array(['bob']))},
+        {'team': (np.array([0]), np.array(['BOS'])),
+         'league': (np.array([-1]), np.array([], dtype=str)),
+         'player-id': (np.array([0]), np.array(['joe']))}
+    ]
+    res = ddog.source.concat_encoded_files(encoded_files=encoded_files)
+    assert res.team.tolist() == ['BOS', 'PIT', 'BOS']
+    assert res.league.isna().tolist() == [False, True, True]
+    assert res['player-id'].tolist() == ['bob', 'bob', 'joe']
+    assert 'year' not in res.columns
+
+    res = ddog.source.concat_encoded_files(encoded_files=encoded_files, years=[2000, 2001])
+    assert res.year.tolist() == [2000, 2000, 2001]
@@ -1,12 +1,324 @@
 import configparser
+import functools
 import logging
+import os
+import re
 import sys
 
 import ddog.cli
 import ddog.constants as csts
 import ddog.output
-import ddog.source
-import ddog.processing
+import ddog.profiling
+
+# The modules depending on NumPy and pandas (ddog.index, ddog.processing and ddog.source) are imported by the functions
+# needing them, so that printing the help or rejecting invalid arguments does not pay for their import
+
+
+def build_loader(config, args, tmp_dir_path, min_year, max_year):
+    """ Builds the loader of the baseball-statistics files of a year range.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        args (dict): Dictionary mapping the parsed CLI argument names and values.
+        tmp_dir_path (str): Path of the temporary directory.
+        min_year (int): Year of the first file to load.
+        max_year (int): Year of the last file to load.
+
+    Returns:
+        ddog.source.BaseballFilesLoader: The loader.
+    """
+    import ddog.source
+
+    return ddog.source.BaseballFilesLoader(tmp_dir_path=tmp_dir_path,
+                                           config=config,
+                                           min_year=min_year,
+                                           max_year=max_year,
+                                           download_workers=args[csts.CLI_DOWNLOAD_WORKERS_ARG],
+                                           refresh=args[csts.CLI_REFRESH_ARG])
+
+
+def get_checksums(config, tmp_dir_path):
+    """ Reads the checksums of the files of the temporary directory from its manifest. The checksum of a file which does
+    not match its manifest entry is not trusted (`None`) and the years whose file is missing (Ex: evicted) are left out
+    (Cf. `ddog.source.DownloadManifest.get_checksums`).
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        tmp_dir_path (str): Path of the temporary directory.
+
+    Returns:
+        dict: Dictionary mapping years to the checksum of their file.
+    """
+    import ddog.source
+
+    manifest_path = os.path.join(tmp_dir_path, config[csts.DEFAULT_CONF_SECTION][csts.CONF_MANIFEST_FILE_NAME])
+    return ddog.source.DownloadManifest(path=manifest_path).get_checksums(valid_only=True)
+
+
+def get_signature(config, tmp_dir_path):
+    """ Builds the signature of the baseball-statistics files (compressed or not) of the temporary directory, which
+    changes whenever a file is added, removed or modified.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        tmp_dir_path (str): Path of the temporary directory.
+
+    Returns:
+        list[(str, int, int)]: Sorted list of the (name, size, modification time) of the files.
+    """
+    import ddog.source
+
+    regex = re.compile(config[csts.DEFAULT_CONF_SECTION][csts.CONF_TMP_FILE_REGEX])
+    with os.scandir(tmp_dir_path) as entries:
+        return sorted((entry.name, entry.stat().st_size, entry.stat().st_mtime_ns) for entry in entries
+                      if regex.fullmatch(ddog.source.split_codec_extension(file_name=entry.name)[0]))
+
+
+def count(config, args, tmp_dir_path):
+    """ Counts the team combinations of the requested year range from scratch with the requested engine.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        args (dict): Dictionary mapping the parsed CLI argument names and values.
+        tmp_dir_path (str): Path of the temporary directory.
+
+    Returns:
+        list[(frozenset, int)]: List of (team combination, player count) reaching the minimum player count.
+    """
+    import ddog.processing
+
+    files_loader = build_loader(config=config, args=args, tmp_dir_path=tmp_dir_path,
+                                min_year=args[csts.CLI_MIN_YEAR_ARG], max_year=args[csts.CLI_MAX_YEAR_ARG])
+    df = files_loader.load()
+
+    counter_factory = ddog.processing.TripleCounterFactory(engine=args[csts.CLI_ENGINE_ARG],
+                                                           min_player_count=args[csts.CLI_MIN_PLAYERS_ARG],
+                                                           workers=args[csts.CLI_WORKERS_ARG],
+                                                           prune=args[csts.CLI_PRUNE_ARG],
+                                                           size=args[csts.CLI_SIZE_ARG],
+                                                           sketch_error=args[csts.CLI_SKETCH_ERROR_ARG],
+                                                           sketch_delta=args[csts.CLI_SKETCH_DELTA_ARG])
+    triple_counter = counter_factory.build_counter()
+    return triple_counter.compute(df=df)
+
+
+def count_streaming(config, args, tmp_dir_path):
+    """ Counts the team combinations of the requested year range from scratch with the requested engine, each file
+    being parsed as soon as it is available and folded into the team set of each player before being discarded.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        args (dict): Dictionary mapping the parsed CLI argument names and values.
+        tmp_dir_path (str): Path of the temporary directory.
+
+    Returns:
+        list[(frozenset, int)]: List of (team combination, player count) reaching the minimum player count.
+    """
+    import ddog.processing
+
+    files_loader = build_loader(config=config, args=args, tmp_dir_path=tmp_dir_path,
+                                min_year=args[csts.CLI_MIN_YEAR_ARG], max_year=args[csts.CLI_MAX_YEAR_ARG])
+    accumulator = ddog.processing.PlayerTeamsAccumulator()
+    with ddog.profiling.stage(name='stream'):
+        for year, encoded_columns in files_loader.iter_encoded_files():
+            accumulator.add(encoded_columns=encoded_columns)
+            logging.debug('Added file for year {year:d} to the team sets of {players:d} players'
+                          .format(year=year, players=len(accumulator.player_ids)))
+
+    counter_factory = ddog.processing.TripleCounterFactory(engine=args[csts.CLI_ENGINE_ARG],
+                                                           min_player_count=args[csts.CLI_MIN_PLAYERS_ARG],
+                                                           workers=args[csts.CLI_WORKERS_ARG],
+                                                           prune=args[csts.CLI_PRUNE_ARG],
+                                                           size=args[csts.CLI_SIZE_ARG],
+                                                           sketch_error=args[csts.CLI_SKETCH_ERROR_ARG],
+                                                           sketch_delta=args[csts.CLI_SKETCH_DELTA_ARG])
+    triple_counter = counter_factory.build_counter()
+    with ddog.profiling.stage(name='pre-aggregation'):
+        encoded_teams = accumulator.get_encoded_teams(min_team_count=args[csts.CLI_SIZE_ARG])
+        ddog.profiling.count(players=len(encoded_teams[0]) - 1)
+    return triple_counter.count_encoded(*encoded_teams)
+
+
+def count_incrementally(config, args, tmp_dir_path):
+    """ Counts the team triples of the requested year range from the persisted triple count state.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        args (dict): Dictionary mapping the parsed CLI argument names and values.
+        tmp_dir_path (str): Path of the temporary directory.
+
+    Returns:
+        list[(frozenset, int)]: List of (team triple, player count) reaching the minimum player count.
+    """
+    import ddog.processing
+
+    state_path = os.path.join(tmp_dir_path, config[csts.DEFAULT_CONF_SECTION][csts.CONF_STATE_FILE_NAME])
+    state = ddog.processing.TripleCountState(path=state_path)
+    with ddog.profiling.stage(name='load'):
+        # Files are downloaded (or revalidated) first, so that the checksums compared to the state are the ones of the
+        # files about to be counted
+        build_loader(config=config, args=args, tmp_dir_path=tmp_dir_path, min_year=args[csts.CLI_MIN_YEAR_ARG],
+                     max_year=args[csts.CLI_MAX_YEAR_ARG]).download()
+    missing_ranges = state.get_missing_ranges(min_year=args[csts.CLI_MIN_YEAR_ARG],
+                                              max_year=args[csts.CLI_MAX_YEAR_ARG],
+                                              checksums=get_checksums(config=config, tmp_dir_path=tmp_dir_path))
+    for min_year, max_year in missing_ranges:
+        files_loader = build_loader(config=config, args=dict(args, **{csts.CLI_REFRESH_ARG: False}),
+                                    tmp_dir_path=tmp_dir_path, min_year=min_year, max_year=max_year)
+        df = files_loader.load()
+        with ddog.profiling.stage(name='update'):
+            state.update(df=df, min_year=min_year, max_year=max_year,
+                         checksums=files_loader.manifest.get_checksums())
+    state.save()
+    return state.get_triples(min_player_count=args[csts.CLI_MIN_PLAYERS_ARG])
+
+
+def count_cached(config, args, tmp_dir_path, count_func):
+    """ Returns the team combinations of the requested year range from the result cache of the temporary directory if
+    it holds the results of the same input files counted with a lower or equal minimum player count, otherwise counts
+    them with `count_func` and caches them. The cache is not read when the files are revalidated against the source.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        args (dict): Dictionary mapping the parsed CLI argument names and values.
+        tmp_dir_path (str): Path of the temporary directory.
+        count_func (function): Function counting the team combinations (Ex: `count`), taking the same arguments.
+
+    Returns:
+        list[(frozenset, int)]: List of (team combination, player count) reaching the minimum player count.
+    """
+    import ddog.cache
+
+    cache_path = os.path.join(tmp_dir_path, config[csts.DEFAULT_CONF_SECTION][csts.CONF_RESULT_CACHE_DIR_NAME])
+    cache = ddog.cache.ResultCache(path=cache_path,
+                                   max_size=int(config[csts.DEFAULT_CONF_SECTION][csts.CONF_MAX_RESULT_CACHE_SIZE]))
+
+    def get_key():
+        return ddog.cache.get_result_key(min_year=args[csts.CLI_MIN_YEAR_ARG], max_year=args[csts.CLI_MAX_YEAR_ARG],
+                                         size=args[csts.CLI_SIZE_ARG],
+                                         checksums=get_checksums(config=config, tmp_dir_path=tmp_dir_path))
+
+    if not args[csts.CLI_REFRESH_ARG]:
+        with ddog.profiling.stage(name='cache'):
+            key = get_key()
+            triple_counts = None if key is None else cache.get(key=key, min_player_count=args[csts.CLI_MIN_PLAYERS_ARG])
+        if triple_counts is not None:
+            return triple_counts
+
+    triple_counts = count_func(config=config, args=args, tmp_dir_path=tmp_dir_path)
+    key = get_key()
+    if key is not None:
+        cache.put(key=key, min_player_count=args[csts.CLI_MIN_PLAYERS_ARG], combinations=triple_counts,
+                  size=args[csts.CLI_SIZE_ARG])
+    return triple_counts
+
+
+def get_index(config, args, tmp_dir_path):
+    """ Reads the team index of the requested year range persisted by a previous run if it is up to date, otherwise
+    builds (and persists) it.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        args (dict): Dictionary mapping the parsed CLI argument names and values.
+        tmp_dir_path (str): Path of the temporary directory.
+
+    Returns:
+        ddog.index.TeamIndex: The team index of the requested year range.
+    """
+    import ddog.index
+
+    min_year, max_year = args[csts.CLI_MIN_YEAR_ARG], args[csts.CLI_MAX_YEAR_ARG]
+    index_path = os.path.join(tmp_dir_path, config[csts.DEFAULT_CONF_SECTION][csts.CONF_INDEX_FILE_NAME])
+    index = ddog.index.TeamIndex.read(path=index_path)
+    if args[csts.CLI_REFRESH_ARG] or index is None \
+            or not index.matches(min_year=min_year, max_year=max_year,
+                                 checksums=get_checksums(config=config, tmp_dir_path=tmp_dir_path)):
+        files_loader = build_loader(config=config, args=args, tmp_dir_path=tmp_dir_path, min_year=min_year,
+                                    max_year=max_year)
+        df = files_loader.load(with_years=True)
+        with ddog.profiling.stage(name='index'):
+            index = ddog.index.TeamIndex.build(df=df, min_year=min_year, max_year=max_year,
+                                               checksums=files_loader.manifest.get_checksums())
+            ddog.profiling.count(rows=len(df), players=index.player_count)
+        index.save(path=index_path)
+    return index
+
+
+def serve(config, args, tmp_dir_path):
+    """ Answers team combination and team triple queries from the team index of the requested year range, kept in
+    memory and reloaded whenever the baseball-statistics files of the temporary directory change.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        args (dict): Dictionary mapping the parsed CLI argument names and values.
+        tmp_dir_path (str): Path of the temporary directory.
+    """
+    import ddog.index
+
+    index = ddog.index.IndexService(load=functools.partial(get_index, config=config, args=args,
+                                                           tmp_dir_path=tmp_dir_path),
+                                    get_signature=functools.partial(get_signature, config=config,
+                                                                    tmp_dir_path=tmp_dir_path),
+                                    min_player_count=args[csts.CLI_MIN_PLAYERS_ARG])
+    if args[csts.CLI_SERVE_ARG] == csts.STDIN_SERVE_NAME:
+        ddog.index.serve_stream(index=index, input_stream=sys.stdin, output_stream=sys.stdout)
+    elif args[csts.CLI_SERVE_ARG].startswith(csts.HTTP_SERVE_PREFIX):
+        ddog.index.serve_http(index=index, url=args[csts.CLI_SERVE_ARG])
+    else:
+        ddog.index.serve_socket(index=index, path=args[csts.CLI_SERVE_ARG])
+
+
+def sweep(config, args, tmp_dir_path):
+    """ Counts the team triples of each rolling year window of the requested year range in a single pass over the
+    team index, and writes the results of each window to the requested sink.
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        args (dict): Dictionary mapping the parsed CLI argument names and values.
+        tmp_dir_path (str): Path of the temporary directory.
+    """
+    import ddog.index
+
+    index = get_index(config=config, args=args, tmp_dir_path=tmp_dir_path)
+    window = args[csts.CLI_SWEEP_ARG]
+    ranges = [(min_year, min_year + window - 1)
+              for min_year in range(args[csts.CLI_MIN_YEAR_ARG], args[csts.CLI_MAX_YEAR_ARG] - window + 2)]
+    counter = ddog.index.YearRangeTripleCounter(index=index, min_player_count=args[csts.CLI_MIN_PLAYERS_ARG])
+    for (min_year, max_year), triple_counts in counter.sweep(ranges=ranges):
+        logging.info('Team triples over {min_year:d}-{max_year:d}:'.format(min_year=min_year, max_year=max_year))
+        output = ddog.output.build_window_output(output=args[csts.CLI_SINK_ARG], min_year=min_year, max_year=max_year)
+        ddog.output.SinkFactory(output=output, top=args[csts.CLI_TOP_ARG]).build_sink().write(triples=triple_counts)
+
+
+def run_jobs(config, args, tmp_dir_path, jobs):
+    """ Counts the team triples of a batch of jobs from the team index of the union of their year ranges, loaded and
+    indexed once, and writes the results of each job to its own sink. Jobs are run in year range order so that the
+    rolling-window counter only processes the changes between consecutive ranges, and the counts of a range are reused
+    by all the jobs over it (whatever their minimum player counts).
+
+    Args:
+        config (configparser.ConfigParser): Configuration object.
+        args (dict): Dictionary mapping the parsed CLI argument names and values.
+        tmp_dir_path (str): Path of the temporary directory.
+        jobs (list[dict]): List of jobs (Cf. `ddog.cli.CliArgParser.read_jobs`).
+    """
+    import ddog.index
+
+    min_year = min(job[csts.CLI_MIN_YEAR_ARG] for job in jobs)
+    max_year = max(job[csts.CLI_MAX_YEAR_ARG] for job in jobs)
+    index_args = dict(args, **{csts.CLI_MIN_YEAR_ARG: min_year, csts.CLI_MAX_YEAR_ARG: max_year})
+    index = get_index(config=config, args=index_args, tmp_dir_path=tmp_dir_path)
+    counter = ddog.index.YearRangeTripleCounter(index=index, min_player_count=0)
+    for number, job in sorted(enumerate(jobs, start=1),
+                              key=lambda item: (item[1][csts.CLI_MIN_YEAR_ARG], item[1][csts.CLI_MAX_YEAR_ARG])):
+        logging.info('Job #{number:d}: team triples over {min_year:d}-{max_year:d} with at least {players:d} players'
+                     .format(number=number, min_year=job[csts.CLI_MIN_YEAR_ARG], max_year=job[csts.CLI_MAX_YEAR_ARG],
+                             players=job[csts.CLI_MIN_PLAYERS_ARG]))
+        with ddog.profiling.stage(name='job'):
+            counter.move(min_year=job[csts.CLI_MIN_YEAR_ARG], max_year=job[csts.CLI_MAX_YEAR_ARG])
+            counter.min_player_count = job[csts.CLI_MIN_PLAYERS_ARG]
+            sink = ddog.output.SinkFactory(output=job[csts.CLI_SINK_ARG], top=job[csts.CLI_TOP_ARG]).build_sink()
+            sink.write(triples=counter.get_triples())
 
 
 if __name__ == '__main__':
@@ -18,18 +330,37 @@ if __name__ == '__main__':
 
     parser = ddog.cli.CliArgParser(config=config)
     args = parser.parse_args(args=sys.argv[1:])
+    jobs = None
+    if args[csts.CLI_JOBS_ARG] is not None:
+        jobs = parser.read_jobs(path=args[csts.CLI_JOBS_ARG], args=args)
 
-    path, remove = args[csts.CLI_TMP_DIR_ARG], not args[csts.CLI_KEEP_FILES_ARG]
-    with ddog.source.TempDir(path=path, remove=remove) as tmp_dir_path:
-        files_loader = ddog.source.BaseballFilesLoader(tmp_dir_path=tmp_dir_path,
-                                                       config=config,
-                                                       min_year=args[csts.CLI_MIN_YEAR_ARG],
-                                                       max_year=args[csts.CLI_MAX_YEAR_ARG])
-        df = files_loader.load()
+    import ddog.source
 
-        triple_counter = ddog.processing.TripleCounter(min_player_count=args[csts.CLI_MIN_PLAYERS_ARG])
-        triple_counts = triple_counter.compute(df=df)
+    path, remove = args[csts.CLI_TMP_DIR_ARG], not args[csts.CLI_KEEP_FILES_ARG]
+    with ddog.profiling.profile(path=args[csts.CLI_PROFILE_ARG]), \
+            ddog.source.TempDir(path=path, remove=remove) as tmp_dir_path:
+        if args[csts.CLI_SERVE_ARG] is not None:
+            serve(config=config, args=args, tmp_dir_path=tmp_dir_path)
+        elif args[csts.CLI_SWEEP_ARG] is not None:
+            sweep(config=config, args=args, tmp_dir_path=tmp_dir_path)
+        elif jobs is not None:
+            run_jobs(config=config, args=args, tmp_dir_path=tmp_dir_path, jobs=jobs)
+        else:
+            if args[csts.CLI_INCREMENTAL_ARG]:
+                count_func = count_incrementally
+            elif args[csts.CLI_STREAM_ARG]:
+                count_func = count_streaming
+            else:
+                count_func = count
+            # The results are only cached if the temporary directory is kept
+            if args[csts.CLI_KEEP_FILES_ARG] and not args[csts.CLI_NO_RESULT_CACHE_ARG]:
+                triple_counts = count_cached(config=config, args=args, tmp_dir_path=tmp_dir_path,
+                                             count_func=count_func)
+            else:
+                triple_counts = count_func(config=config, args=args, tmp_dir_path=tmp_dir_path)
 
-        sink_factory = ddog.output.SinkFactory(output=args[csts.CLI_SINK_ARG])
-        sink = sink_factory.build_sink()
-        sink.write(triples=triple_counts)
+            sink_factory = ddog.output.SinkFactory(output=args[csts.CLI_SINK_ARG], size=args[csts.CLI_SIZE_ARG],
+                                                   top=args[csts.CLI_TOP_ARG])
+            sink = sink_factory.build_sink()
+            sink.write(triples=triple_counts)
+    ddog.profiling.write_summary(path=args[csts.CLI_SUMMARY_ARG])